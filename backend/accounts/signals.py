@@ -0,0 +1,31 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from core.invalidation import invalidate
+
+from .models import CustomUser
+
+
+@receiver(post_save, sender=Token)
+@receiver(post_delete, sender=Token)
+def invalidate_token(sender, instance, using, **kwargs):
+    invalidate("tokens", [instance.key], using=using)
+
+
+@receiver(post_save, sender=CustomUser)
+def invalidate_user_tokens(sender, instance, using, **kwargs):
+    # Deleting a user cascades to its tokens, which evicts them above.
+    keys = (
+        Token.objects.using(using).filter(user=instance).values_list("key", flat=True)
+    )
+    invalidate("tokens", keys, using=using)
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def invalidate_categories(sender, using, update_fields=None, **kwargs):
+    # Category listings embed the username of every blog's author; logins
+    # only touch last_login.
+    if update_fields is None or "username" in update_fields:
+        invalidate("categories", using=using)
@@ -1,7 +1,10 @@
 from rest_framework import viewsets, status
-from rest_framework.authentication import TokenAuthentication
 from rest_framework.response import Response
 
+from blogs.purges import schedule_purge
+from blogs.serializers import PurgeQuerySerializer, PurgeTaskSerializer
+from core.authentication import CachedTokenAuthentication
+
 from .models import CustomUser
 from .permissions import AdminOrOwnerAccessPermission
 from .serializers import UserSerializer, CreateUserSerializer, UpdateUserSerializer
@@ -10,7 +13,7 @@ from .serializers import UserSerializer, CreateUserSerializer, UpdateUserSeriali
 class UserViewSet(viewsets.ModelViewSet):
     queryset = CustomUser.objects.all()
     serializer_class = UserSerializer
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [AdminOrOwnerAccessPermission]
 
     def get_serializer_class(self):
@@ -41,6 +44,17 @@ class UserViewSet(viewsets.ModelViewSet):
             user.save()
         return Response(serializer.data)
 
+    def destroy(self, request, *args, **kwargs):
+        query = PurgeQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        if not query.validated_data["background"]:
+            return super().destroy(request, *args, **kwargs)
+        instance = self.get_object()
+        self.perform_destroy(instance)
+        # Deletes the deactivated user with their blogs, likes and reactions.
+        task = schedule_purge(instance, requested_by=request.user)
+        return Response(PurgeTaskSerializer(task).data, status=status.HTTP_202_ACCEPTED)
+
     def perform_destroy(self, instance):
         instance.is_active = False
         instance.set_unusable_password()
@@ -0,0 +1,237 @@
+"""Cold storage of the comments of blogs nobody has commented on for a while.
+
+``archive_comments`` moves every comment of an inactive blog, together with
+its replies, reactions and tags, into one ``ArchivedComment`` row
+and deletes the originals, so the hot comment, reply and reaction tables and
+their indexes only carry recent discussions. Archived comments are still
+served by the comment detail endpoint through ``archived_comment``.
+"""
+
+from datetime import timedelta
+
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from core.invalidation import invalidate
+
+from .bulk import delete_ids
+from .models import ArchivedComment, Comment, Reaction, ReactionQuerySet, Reply, Tag
+
+ARCHIVE_AFTER_DAYS = 365
+ARCHIVE_BATCH_SIZE = 500
+
+REPLY_FIELDS = ["id", "author_id", "text", "created_at", "updated_at"]
+REACTION_FIELDS = ["id", "author_id", "blog_id", "reaction_type", "given_at"]
+
+
+def archivable_comments(before):
+    """Comments of blogs without any comment or reply since ``before``."""
+    recent_comments = Comment.objects.filter(
+        blog=OuterRef("blog"), created_at__gte=before
+    )
+    recent_replies = Reply.objects.filter(
+        comment__blog=OuterRef("blog"), created_at__gte=before
+    )
+    return Comment.objects.filter(created_at__lt=before).exclude(
+        Exists(recent_comments) | Exists(recent_replies)
+    )
+
+
+def row_bytes(cursor, model, column, ids):
+    cursor.execute(
+        f"SELECT coalesce(sum(pg_column_size(t.*)), 0) "
+        f"FROM {model._meta.db_table} AS t WHERE {column} = ANY(%s)",
+        [ids],
+    )
+    return cursor.fetchone()[0]
+
+
+def archive_batch(before, batch_size=ARCHIVE_BATCH_SIZE, using=DEFAULT_DB_ALIAS):
+    """Archive one batch of comments.
+
+    Returns ``(comments, replies, reactions, raw bytes, archived bytes)``.
+    """
+    with transaction.atomic(using=using):
+        comments = list(
+            archivable_comments(before)
+            .using(using)
+            .select_for_update(skip_locked=True, of=("self",))
+            .order_by("id")[:batch_size]
+        )
+        if not comments:
+            return 0, 0, 0, 0, 0
+        ids = [comment.pk for comment in comments]
+        replies = {pk: [] for pk in ids}
+        for reply in (
+            Reply.objects.using(using)
+            .filter(comment__in=ids)
+            .order_by("id")
+            .values("comment_id", *REPLY_FIELDS)
+        ):
+            replies[reply.pop("comment_id")].append(reply)
+        reactions = {pk: [] for pk in ids}
+        for reaction in (
+            Reaction.objects.using(using)
+            .filter(comment__in=ids)
+            .order_by("id")
+            .values("comment_id", *REACTION_FIELDS)
+        ):
+            reactions[reaction.pop("comment_id")].append(reaction)
+        tags = {pk: [] for pk in ids}
+        tagged = []
+        for pk, comment_id, tag_id in (
+            Tag.comments.through.objects.using(using)
+            .filter(comment__in=ids)
+            .order_by("tag_id")
+            .values_list("id", "comment_id", "tag_id")
+        ):
+            tags[comment_id].append(tag_id)
+            tagged.append(pk)
+
+        with connections[using].cursor() as cursor:
+            raw = (
+                row_bytes(cursor, Comment, "id", ids)
+                + row_bytes(cursor, Reply, "comment_id", ids)
+                + row_bytes(cursor, Reaction, "comment_id", ids)
+            )
+        archived = ArchivedComment.objects.using(using).bulk_create(
+            [
+                ArchivedComment(
+                    id=comment.pk,
+                    blog_id=comment.blog_id,
+                    author_id=comment.author_id,
+                    created_at=comment.created_at,
+                    payload=ArchivedComment.pack(
+                        {
+                            "text": comment.text,
+                            "updated_at": comment.updated_at,
+                            "replies": replies[comment.pk],
+                            "tags": tags[comment.pk],
+                        }
+                    ),
+                    reactions=reactions[comment.pk],
+                )
+                for comment in comments
+            ]
+        )
+        # The rows live on in the archive, so they are deleted without the
+        # per-row signals that would log them as deleted in the change feed
+        # and announce them on the blog's stream. Dependents go first.
+        for model, model_ids in (
+            (Reaction, [r["id"] for rows in reactions.values() for r in rows]),
+            (Reply, [r["id"] for rows in replies.values() for r in rows]),
+            (Tag.comments.through, tagged),
+            (Comment, ids),
+        ):
+            delete_ids(model, model_ids, using=using, log_changes=False)
+        if tagged:
+            invalidate("tags", using=using)
+    return (
+        len(comments),
+        sum(map(len, replies.values())),
+        sum(map(len, reactions.values())),
+        raw,
+        sum(len(archive.payload) for archive in archived),
+    )
+
+
+def archive_comments(
+    days=ARCHIVE_AFTER_DAYS, batch_size=ARCHIVE_BATCH_SIZE, using=DEFAULT_DB_ALIAS
+):
+    """Archive the comments of blogs inactive for ``days`` in batches.
+
+    Every batch commits on its own, so an interrupted run loses nothing and
+    the next one resumes where it stopped.
+    """
+    before = timezone.now() - timedelta(days=days)
+    totals = [0] * 5
+    while True:
+        batch = archive_batch(before, batch_size, using=using)
+        if not batch[0]:
+            return tuple(totals)
+        totals = [total + count for total, count in zip(totals, batch)]
+
+
+def table_sizes(using=DEFAULT_DB_ALIAS):
+    """Total on-disk size of the tables archiving shrinks, indexes included."""
+    tables = [model._meta.db_table for model in (Comment, Reply, Reaction)]
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            "SELECT coalesce(sum(pg_total_relation_size(to_regclass(name))), 0) "
+            "FROM unnest(%s::text[]) AS name",
+            [tables],
+        )
+        return cursor.fetchone()[0]
+
+
+def vacuum(using=DEFAULT_DB_ALIAS):
+    """Make the space of archived rows reusable; cannot run in a transaction."""
+    with connections[using].cursor() as cursor:
+        for model in (Comment, Reply, Reaction):
+            cursor.execute(f"VACUUM ANALYZE {model._meta.db_table}")
+
+
+def prefetched(manager, instances):
+    """``manager``'s queryset answered by ``instances`` instead of a query."""
+    queryset = manager.all()
+    queryset._result_cache = instances
+    queryset._prefetch_done = True
+    return queryset
+
+
+def archived_comment(pk, queryset=None, using=DEFAULT_DB_ALIAS):
+    """Unsaved ``Comment`` rebuilt from the archive and its reaction summary.
+
+    The archive is looked up in ``queryset`` when given, so views can apply
+    the filters of their comment queryset. The comment's replies and
+    reactions are rebuilt as unsaved rows too. Returns ``(None, None)`` when
+    ``pk`` was never archived or is filtered out.
+    """
+    if queryset is None:
+        queryset = ArchivedComment.objects.all()
+    try:
+        archive = queryset.using(using).get(pk=pk)
+    except (ArchivedComment.DoesNotExist, ValueError, TypeError):
+        return None, None
+    data = archive.unpack()
+    comment = Comment(
+        id=archive.pk,
+        blog_id=archive.blog_id,
+        author_id=archive.author_id,
+        text=data["text"],
+        created_at=archive.created_at,
+        updated_at=parse_datetime(data["updated_at"]),
+    )
+    replies = [
+        Reply(
+            comment=comment,
+            **{
+                **reply,
+                "created_at": parse_datetime(reply["created_at"]),
+                "updated_at": parse_datetime(reply["updated_at"]),
+            },
+        )
+        for reply in data["replies"]
+    ]
+    reactions = [
+        # Archives made before blog_id was kept only reacted to the comment.
+        Reaction(
+            comment=comment,
+            **{
+                "blog_id": None,
+                **reaction,
+                "given_at": parse_datetime(reaction["given_at"]),
+            },
+        )
+        for reaction in data["reactions"]
+    ]
+    comment._prefetched_objects_cache = {
+        "replies": prefetched(comment.replies, replies),
+        "reactions": prefetched(comment.reactions, reactions),
+    }
+    summary = ReactionQuerySet._empty_summaries([archive.pk])[archive.pk]
+    for reaction in reactions:
+        summary[reaction.reaction_type] += 1
+    return comment, summary
@@ -0,0 +1,212 @@
+"""Async versions of the read-only blog, comment and category endpoints.
+
+DRF views are synchronous, so these are plain Django async views that reuse
+the serializers, permissions and page sizes of the viewsets in ``views.py``.
+Everything a serializer touches is loaded up front with the async ORM, so
+rendering does not hit the database.
+"""
+
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.db.models import Prefetch
+from django.http import JsonResponse
+from rest_framework import exceptions
+from rest_framework.authentication import get_authorization_header
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from core.authentication import authenticate_token
+
+from .archive import archived_comment
+from .engagement import flush_pending_of
+from .models import ArchivedComment, Blog, Category, Comment, Reaction
+from .pagination import BlogsPageNumberPagination, CategoryPageNumberPagination
+from .permissions import IsAuthorOrAdmin, StaffAllReadOnlyUser
+from .serializers import (
+    BlogWithReactionSummarySerializer,
+    CategorySerializer,
+    CommentSerializer,
+)
+
+
+def error_response(exc):
+    response = JsonResponse({"detail": str(exc.detail)}, status=exc.status_code)
+    if isinstance(exc, exceptions.NotAuthenticated):
+        response["WWW-Authenticate"] = "Token"
+    if isinstance(exc, exceptions.MethodNotAllowed):
+        response["Allow"] = "GET"
+    return response
+
+
+def async_api_view(view):
+    """Serve GET only and turn DRF API exceptions into JSON error responses."""
+
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        try:
+            if request.method != "GET":
+                raise exceptions.MethodNotAllowed(request.method)
+            data = await view(request, *args, **kwargs)
+        except exceptions.APIException as exc:
+            return error_response(exc)
+        return JsonResponse(data, encoder=JSONEncoder, safe=False)
+
+    return wrapper
+
+
+async def authenticate(request):
+    """Token authentication of the viewsets; sets ``request.user``."""
+    auth = get_authorization_header(request).split()
+    if not auth or auth[0].lower() != b"token":
+        raise exceptions.NotAuthenticated()
+    if len(auth) != 2:
+        raise exceptions.AuthenticationFailed("Invalid token header.")
+    try:
+        key = auth[1].decode()
+    except UnicodeError:
+        raise exceptions.AuthenticationFailed("Invalid token.")
+    request.user = await authenticate_token(key)
+
+
+async def check_permissions(request, permission):
+    await authenticate(request)
+    if not permission.has_permission(request, None):
+        raise exceptions.PermissionDenied()
+    # Like the viewsets' PendingEngagementMixin, so likes and reactions the
+    # user queued are counted in what they read.
+    await sync_to_async(flush_pending_of)(request.user)
+
+
+async def get_object(request, permission, queryset, pk):
+    try:
+        obj = await queryset.aget(pk=pk)
+    except (queryset.model.DoesNotExist, ValueError):
+        raise exceptions.NotFound()
+    if not permission.has_object_permission(request, None, obj):
+        raise exceptions.PermissionDenied()
+    return obj
+
+
+async def paginate(request, queryset, page_size):
+    try:
+        page = int(request.GET.get("page", 1))
+    except ValueError:
+        page = 0
+    count = await queryset.acount()
+    pages = max(1, -(-count // page_size))
+    if not 1 <= page <= pages:
+        raise exceptions.NotFound("Invalid page.")
+    offset = (page - 1) * page_size
+    items = [item async for item in queryset[offset : offset + page_size]]
+
+    url = request.build_absolute_uri()
+    previous = None
+    if page == 2:
+        previous = remove_query_param(url, "page")
+    elif page > 2:
+        previous = replace_query_param(url, "page", page - 1)
+    return {
+        "count": count,
+        "next": replace_query_param(url, "page", page + 1) if page < pages else None,
+        "previous": previous,
+    }, items
+
+
+@async_api_view
+async def blog_list(request):
+    await check_permissions(request, IsAuthorOrAdmin())
+    queryset = (
+        Blog.objects.filter(is_hidden=False).select_related("category").order_by("pk")
+    )
+    page, blogs = await paginate(request, queryset, BlogsPageNumberPagination.page_size)
+    summaries = await Reaction.objects.asummaries("blog", [blog.pk for blog in blogs])
+    serializer = BlogWithReactionSummarySerializer(
+        blogs, many=True, context={"blog_reaction_summaries": summaries}
+    )
+    return {**page, "results": serializer.data}
+
+
+@async_api_view
+async def blog_detail(request, pk):
+    permission = IsAuthorOrAdmin()
+    await check_permissions(request, permission)
+    blog = await get_object(
+        request,
+        permission,
+        Blog.objects.filter(is_hidden=False).select_related("category"),
+        pk,
+    )
+    summaries = await Reaction.objects.asummaries("blog", [blog.pk])
+    serializer = BlogWithReactionSummarySerializer(
+        blog, context={"blog_reaction_summaries": summaries}
+    )
+    return serializer.data
+
+
+@async_api_view
+async def comment_list(request):
+    await check_permissions(request, IsAuthorOrAdmin())
+    comments = [
+        comment
+        async for comment in Comment.objects.filter(blog__is_hidden=False)
+        .order_by("pk")
+        .aiterator()
+    ]
+    summaries = await Reaction.objects.asummaries(
+        "comment", [comment.pk for comment in comments]
+    )
+    serializer = CommentSerializer(
+        comments, many=True, context={"comment_reaction_summaries": summaries}
+    )
+    return serializer.data
+
+
+@async_api_view
+async def comment_detail(request, pk):
+    permission = IsAuthorOrAdmin()
+    await check_permissions(request, permission)
+    try:
+        comment = await get_object(
+            request, permission, Comment.objects.filter(blog__is_hidden=False), pk
+        )
+    except exceptions.NotFound:
+        comment, summary = await sync_to_async(archived_comment)(
+            pk, ArchivedComment.objects.filter(blog__is_hidden=False)
+        )
+        if comment is None:
+            raise
+        if not permission.has_object_permission(request, None, comment):
+            raise exceptions.PermissionDenied()
+        summaries = {comment.pk: summary}
+    else:
+        summaries = await Reaction.objects.asummaries("comment", [comment.pk])
+    serializer = CommentSerializer(
+        comment, context={"comment_reaction_summaries": summaries}
+    )
+    return serializer.data
+
+
+def category_queryset():
+    blogs = Blog.objects.select_related("author").order_by("pk")
+    return Category.objects.prefetch_related(Prefetch("blogs", queryset=blogs))
+
+
+@async_api_view
+async def category_list(request):
+    await check_permissions(request, StaffAllReadOnlyUser())
+    page, categories = await paginate(
+        request,
+        category_queryset().order_by("id"),
+        CategoryPageNumberPagination.page_size,
+    )
+    serializer = CategorySerializer(categories, many=True)
+    return {**page, "results": serializer.data}
+
+
+@async_api_view
+async def category_detail(request, pk):
+    permission = StaffAllReadOnlyUser()
+    await check_permissions(request, permission)
+    category = await get_object(request, permission, category_queryset(), pk)
+    return CategorySerializer(category).data
@@ -0,0 +1,240 @@
+from django.db import DEFAULT_DB_ALIAS, connection, connections, transaction
+from django.db.models import Q
+
+from core.invalidation import invalidate
+
+from .changes import MODEL_NAMES, record_changes
+from .engagement import adjust_like_counts, insert_likes, upsert_reactions
+from .models import Blog, Comment, Like, Reaction, Tag, ChangeLog
+from .streams import publish_reactions
+
+CREATED = "created"
+EXISTS = "exists"
+ASSIGNED = "assigned"
+UPDATED = "updated"
+DELETED = "deleted"
+NOT_FOUND = "not_found"
+
+
+def existing_ids(model, ids, **filters):
+    if not ids:
+        return set()
+    queryset = model.objects.filter(pk__in=set(ids), **filters)
+    return set(queryset.values_list("pk", flat=True))
+
+
+def delete_ids(model, ids, columns=("id",), using=DEFAULT_DB_ALIAS, log_changes=True):
+    """Delete rows with one ``DELETE ... WHERE id = ANY`` statement.
+
+    ``QuerySet.delete()`` would collect the rows and send a signal per object
+    because of the change-log receivers. Callers make sure the rows have no
+    dependents left, so one statement is enough; it returns ``columns`` of the
+    rows it actually deleted, which callers use to adjust counters, and the
+    change log of tracked models is written here unless ``log_changes`` is
+    false.
+    """
+    if not ids:
+        return []
+    table = model._meta.db_table
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {table} WHERE id = ANY(%s) RETURNING {', '.join(columns)}",
+            [list(ids)],
+        )
+        deleted = cursor.fetchall()
+    if log_changes and model in MODEL_NAMES:
+        record_changes(
+            model, [row[0] for row in deleted], ChangeLog.Actions.DELETED, using=using
+        )
+    return deleted
+
+
+@transaction.atomic
+def bulk_like(author, blog_ids):
+    found = existing_ids(Blog, blog_ids, is_hidden=False)
+    inserted = insert_likes(
+        [(author.pk, pk) for pk in dict.fromkeys(blog_ids) if pk in found]
+    )
+    created = {blog_id for _, _, blog_id in inserted}
+
+    results = []
+    for pk in blog_ids:
+        if pk not in found:
+            status = NOT_FOUND
+        elif pk in created:
+            status = CREATED
+            created.discard(pk)
+        else:
+            status = EXISTS
+        results.append({"blog": pk, "status": status})
+    return results
+
+
+@transaction.atomic
+def bulk_unlike(author, blog_ids):
+    likes = Like.objects.filter(author=author, blog_id__in=set(blog_ids))
+    rows = delete_ids(Like, list(likes.values_list("pk", flat=True)), ("id", "blog_id"))
+    # Only rows this statement deleted count; a concurrent unlike may have
+    # removed the same like already.
+    deleted = {blog_id for _, blog_id in rows}
+    adjust_like_counts(dict.fromkeys(deleted, -1))
+    return [
+        {"blog": pk, "status": DELETED if pk in deleted else NOT_FOUND}
+        for pk in blog_ids
+    ]
+
+
+@transaction.atomic
+def bulk_react(author, items):
+    blogs = existing_ids(Blog, [item["blog"] for item in items], is_hidden=False)
+    comments = existing_ids(
+        Comment,
+        [item["comment"] for item in items if item.get("comment")],
+        blog__is_hidden=False,
+    )
+
+    valid = [
+        item
+        for item in items
+        if item["blog"] in blogs
+        and (not item.get("comment") or item["comment"] in comments)
+    ]
+    upserted = upsert_reactions(
+        [
+            (author.pk, item["blog"], item.get("comment"), item["reaction_type"])
+            for item in valid
+        ]
+    )
+
+    results = []
+    reported = set()
+    for item in items:
+        result = dict(item)
+        key = (author.pk, item["blog"], item.get("comment"))
+        if key not in upserted:
+            result["status"] = NOT_FOUND
+        else:
+            pk, created = upserted[key]
+            result["id"] = pk
+            result["status"] = CREATED if created and key not in reported else UPDATED
+            reported.add(key)
+        results.append(result)
+    return results
+
+
+@transaction.atomic
+def bulk_unreact(user, reaction_ids):
+    queryset = Reaction.objects.filter(pk__in=set(reaction_ids))
+    if not user.is_staff:
+        queryset = queryset.filter(author=user)
+    rows = delete_ids(
+        Reaction,
+        list(queryset.values_list("pk", flat=True)),
+        ("id", "blog_id", "comment_id", "reaction_type"),
+    )
+    found = {
+        pk: (blog_id, comment_id, kind, -1) for pk, blog_id, comment_id, kind in rows
+    }
+    publish_reactions(found.values())
+    return [
+        {"id": pk, "status": DELETED if pk in found else NOT_FOUND}
+        for pk in reaction_ids
+    ]
+
+
+def _assignment_target(item):
+    if item.get("blog"):
+        return "blog", Tag.blogs.through
+    return "comment", Tag.comments.through
+
+
+def insert_assignments(through, field, pairs):
+    """Insert ``(tag_id, target_id)`` pairs, skipping existing assignments.
+
+    Returns the set of pairs that were actually inserted.
+    """
+    if not pairs:
+        return set()
+    tags, targets = zip(*pairs)
+    table = through._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO {table} (tag_id, {field}_id)
+            SELECT DISTINCT * FROM unnest(%s::bigint[], %s::bigint[])
+            ON CONFLICT (tag_id, {field}_id) DO NOTHING
+            RETURNING tag_id, {field}_id
+            """,
+            [list(tags), list(targets)],
+        )
+        return set(cursor.fetchall())
+
+
+@transaction.atomic
+def bulk_tag(items):
+    tags = existing_ids(Tag, [item["tag"] for item in items])
+    blogs = existing_ids(
+        Blog, [item["blog"] for item in items if item.get("blog")], is_hidden=False
+    )
+    comments = existing_ids(
+        Comment,
+        [item["comment"] for item in items if item.get("comment")],
+        blog__is_hidden=False,
+    )
+    found = {"blog": blogs, "comment": comments}
+
+    pairs = {}
+    for item in items:
+        field, through = _assignment_target(item)
+        if item["tag"] in tags and item[field] in found[field]:
+            pairs.setdefault((field, through), []).append((item["tag"], item[field]))
+    # Assignments that already exist are skipped by the unique constraint.
+    inserted = {
+        field: insert_assignments(through, field, rows)
+        for (field, through), rows in pairs.items()
+    }
+    invalidate("tags")
+
+    results = []
+    for item in items:
+        field, _ = _assignment_target(item)
+        result = dict(item)
+        key = (item["tag"], item[field])
+        if item["tag"] not in tags or item[field] not in found[field]:
+            result["status"] = NOT_FOUND
+        elif key in inserted[field]:
+            result["status"] = ASSIGNED
+            inserted[field].discard(key)
+        else:
+            result["status"] = EXISTS
+        results.append(result)
+    return results
+
+
+@transaction.atomic
+def bulk_untag(items):
+    conditions = {Tag.blogs.through: Q(), Tag.comments.through: Q()}
+    for item in items:
+        field, through = _assignment_target(item)
+        conditions[through] |= Q(tag_id=item["tag"], **{f"{field}_id": item[field]})
+
+    deleted = set()
+    for through, condition in conditions.items():
+        if not condition:
+            continue
+        field = "blog_id" if through is Tag.blogs.through else "comment_id"
+        rows = list(
+            through.objects.filter(condition).values_list("pk", "tag_id", field)
+        )
+        through.objects.filter(pk__in=[pk for pk, _, _ in rows]).delete()
+        deleted.update((through, tag, target) for _, tag, target in rows)
+    invalidate("tags")
+
+    results = []
+    for item in items:
+        field, through = _assignment_target(item)
+        result = dict(item)
+        key = (through, item["tag"], item[field])
+        result["status"] = DELETED if key in deleted else NOT_FOUND
+        results.append(result)
+    return results
@@ -0,0 +1,116 @@
+from django.db import connections, router, transaction
+
+from .models import Blog, Comment, Reply, Like, Reaction, ChangeLog
+
+TRACKED_MODELS = {
+    "blog": (
+        Blog,
+        [
+            "id",
+            "author_id",
+            "category_id",
+            "title",
+            "description",
+            "is_public",
+            "posted_at",
+            "slug",
+        ],
+    ),
+    "comment": (
+        Comment,
+        ["id", "author_id", "blog_id", "text", "created_at", "updated_at"],
+    ),
+    "reply": (
+        Reply,
+        ["id", "author_id", "comment_id", "text", "created_at", "updated_at"],
+    ),
+    "like": (Like, ["id", "author_id", "blog_id", "created_at"]),
+    "reaction": (
+        Reaction,
+        ["id", "author_id", "blog_id", "comment_id", "reaction_type", "given_at"],
+    ),
+}
+
+MODEL_NAMES = {model: name for name, (model, _) in TRACKED_MODELS.items()}
+
+
+# Numbers the committed entries that have no position yet. The advisory lock
+# makes sequencing transactions commit one after another, so positions become
+# visible in increasing order and an entry written by a transaction that is
+# still open is numbered after everything read so far.
+SEQUENCE_SQL = """
+SELECT pg_advisory_xact_lock(hashtext('blogs_changelog_seq'));
+UPDATE blogs_changelog SET seq = numbered.seq
+FROM (
+    SELECT id, nextval('blogs_changelog_seq') AS seq
+    FROM (SELECT id FROM blogs_changelog WHERE seq IS NULL ORDER BY id) AS pending
+) AS numbered
+WHERE blogs_changelog.id = numbered.id;
+"""
+
+
+def record_changes(model, ids, action, using=None):
+    """Log changes in the writing transaction.
+
+    The entries commit or roll back with the change itself; they get their
+    feed position from ``sequence_changes`` once committed.
+    """
+    entries = [
+        ChangeLog(model=MODEL_NAMES[model], object_id=pk, action=action) for pk in ids
+    ]
+    if entries:
+        ChangeLog.objects.db_manager(using).bulk_create(entries)
+
+
+def sequence_changes(using=None):
+    """Give committed entries their feed position, in commit order."""
+    using = using or router.db_for_write(ChangeLog)
+    with transaction.atomic(using=using), connections[using].cursor() as cursor:
+        cursor.execute(SEQUENCE_SQL)
+
+
+def changes_since(since, limit):
+    """Return up to ``limit`` changes after the ``since`` cursor with row data.
+
+    Only the latest change of each object in the page is returned; rows that
+    no longer exist are reported as deletion tombstones.
+    """
+    sequence_changes()
+    entries = list(ChangeLog.objects.filter(seq__gt=since).order_by("seq")[: limit + 1])
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+
+    latest = {}
+    for entry in entries:
+        latest.pop((entry.model, entry.object_id), None)
+        latest[(entry.model, entry.object_id)] = entry
+
+    ids_by_model = {}
+    for entry in latest.values():
+        if entry.action != ChangeLog.Actions.DELETED:
+            ids_by_model.setdefault(entry.model, []).append(entry.object_id)
+
+    rows = {}
+    for name, ids in ids_by_model.items():
+        model, fields = TRACKED_MODELS[name]
+        for row in model.objects.filter(pk__in=ids).values(*fields):
+            rows[(name, row["id"])] = row
+
+    results = []
+    for key, entry in latest.items():
+        data = rows.get(key)
+        results.append(
+            {
+                "seq": entry.seq,
+                "model": entry.model,
+                "id": entry.object_id,
+                "action": entry.action if data else ChangeLog.Actions.DELETED,
+                "changed_at": entry.changed_at,
+                "data": data,
+            }
+        )
+    return {
+        "results": results,
+        "cursor": entries[-1].seq if entries else since,
+        "has_more": has_more,
+    }
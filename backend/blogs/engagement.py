@@ -0,0 +1,360 @@
+from collections import Counter
+
+from django.conf import settings
+from django.db import connection, router, transaction
+from django.db.models import Case, F, IntegerField, Value, When
+from django.db.models.functions import Greatest
+
+from .changes import record_changes
+from .models import Blog, Comment, Like, Reaction, PendingEngagement, ChangeLog
+from .partitions import partitioned
+from .streams import publish_reactions
+
+FLUSH_BATCH_SIZE = 500
+
+
+def buffering_enabled():
+    return getattr(settings, "BLOGS_BUFFERED_ENGAGEMENT", False)
+
+
+def flush_pending_of(user):
+    """Flush ``user``'s queued likes and reactions before they read.
+
+    The queue is checked on the primary without locks; most reads have
+    nothing queued and skip the locking flush. A replica could miss fresh
+    writes.
+    """
+    if not buffering_enabled() or not user.is_authenticated:
+        return
+    using = router.db_for_write(PendingEngagement)
+    if PendingEngagement.objects.using(using).filter(author=user).exists():
+        flush_pending(author=user)
+
+
+def adjust_like_counts(deltas):
+    """Apply ``{blog_id: delta}`` to ``Blog.likes_count`` in one UPDATE."""
+    deltas = {pk: delta for pk, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    change = Case(
+        *[When(pk=pk, then=Value(delta)) for pk, delta in deltas.items()],
+        output_field=IntegerField(),
+    )
+    Blog.objects.filter(pk__in=deltas).update(
+        likes_count=Greatest(F("likes_count") + change, Value(0))
+    )
+
+
+def fetch_locked(cursor, model, author_ids, sql, params):
+    """Run ``sql`` while holding the locks of these authors' ``model`` rows.
+
+    Check-then-insert writes of the same author are serialized this way. The
+    locks are taken in key order, so concurrent batches cannot deadlock, and
+    are held until the transaction ends.
+    """
+    with transaction.atomic():
+        cursor.execute(
+            """
+            SELECT pg_advisory_xact_lock(key) FROM (
+                SELECT DISTINCT hashtext(%s || ':' || author_id) AS key
+                FROM unnest(%s::bigint[]) AS author_id ORDER BY key
+            ) AS keys
+            """,
+            [model._meta.db_table, list(author_ids)],
+        )
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+
+
+def insert_likes(pairs):
+    """Insert ``(author_id, blog_id)`` pairs, skipping existing likes.
+
+    Runs one ``INSERT ... ON CONFLICT DO NOTHING`` and returns the
+    ``(id, author_id, blog_id)`` rows that were actually inserted.
+    """
+    if not pairs:
+        return []
+    authors, blogs = zip(*pairs)
+    table = Like._meta.db_table
+    if partitioned(Like):
+        # Partitions cannot enforce unique_like_per_author; check for the
+        # like while holding its author's lock instead.
+        conflict = f"""
+            WHERE NOT EXISTS (
+                SELECT 1 FROM {table} AS existing
+                WHERE existing.author_id = pairs.author_id
+                  AND existing.blog_id = pairs.blog_id
+            )
+        """
+    else:
+        conflict = "ON CONFLICT (author_id, blog_id) DO NOTHING"
+    sql = f"""
+        INSERT INTO {table} (author_id, blog_id, created_at)
+        SELECT author_id, blog_id, now()
+        FROM (
+            SELECT DISTINCT * FROM unnest(%s::bigint[], %s::bigint[])
+                AS pairs(author_id, blog_id)
+        ) AS pairs
+        {conflict}
+        RETURNING id, author_id, blog_id
+    """
+    params = [list(authors), list(blogs)]
+    with connection.cursor() as cursor:
+        if partitioned(Like):
+            inserted = fetch_locked(cursor, Like, authors, sql, params)
+        else:
+            cursor.execute(sql, params)
+            inserted = cursor.fetchall()
+    record_changes(Like, [row[0] for row in inserted], ChangeLog.Actions.CREATED)
+    adjust_like_counts(Counter(row[2] for row in inserted))
+    return inserted
+
+
+def upsert_reactions(rows):
+    """Insert reactions or change the type of the author's existing ones.
+
+    ``rows`` are ``(author_id, blog_id, comment_id, reaction_type)`` tuples;
+    the last row wins when the same target appears twice. Returns
+    ``{(author_id, blog_id, comment_id): (id, created)}``.
+
+    The type each reaction had before is read in the same statement, under
+    the authors' locks, so the published count changes match the write.
+    """
+    latest = {row[:3]: row[3] for row in rows}
+    upserted = {}
+    # Reactions on a comment and on the blog itself have separate unique
+    # constraints, so each group needs its own conflict target.
+    groups = {
+        "(author_id, blog_id, comment_id)": [
+            key + (kind,) for key, kind in latest.items() if key[2] is not None
+        ],
+        "(author_id, blog_id) WHERE comment_id IS NULL": [
+            key + (kind,) for key, kind in latest.items() if key[2] is None
+        ],
+    }
+    with connection.cursor() as cursor:
+        if partitioned(Reaction):
+            upserted = check_and_upsert_reactions(cursor, latest)
+        else:
+            table = Reaction._meta.db_table
+            for conflict_target, group in groups.items():
+                if not group:
+                    continue
+                authors, blogs, comments, kinds = zip(*group)
+                returned = fetch_locked(
+                    cursor,
+                    Reaction,
+                    authors,
+                    f"""
+                    WITH rows AS (
+                        SELECT * FROM unnest(
+                            %s::bigint[], %s::bigint[], %s::bigint[], %s::varchar[]
+                        ) AS rows(author_id, blog_id, comment_id, reaction_type)
+                    ), previous AS (
+                        SELECT existing.id, existing.reaction_type FROM rows
+                        JOIN {table} AS existing ON existing.author_id = rows.author_id
+                         AND existing.blog_id = rows.blog_id
+                         AND existing.comment_id IS NOT DISTINCT FROM rows.comment_id
+                    ), upserted AS (
+                        INSERT INTO {table}
+                            (author_id, blog_id, comment_id, reaction_type, given_at)
+                        SELECT author_id, blog_id, comment_id, reaction_type, now()
+                        FROM rows
+                        ON CONFLICT {conflict_target}
+                        DO UPDATE SET reaction_type = EXCLUDED.reaction_type
+                        RETURNING id, author_id, blog_id, comment_id, xmax = 0 AS created
+                    )
+                    SELECT upserted.*, previous.reaction_type
+                    FROM upserted LEFT JOIN previous ON previous.id = upserted.id
+                    """,
+                    [list(authors), list(blogs), list(comments), list(kinds)],
+                )
+                for pk, author_id, blog_id, comment_id, created, previous in returned:
+                    key = (author_id, blog_id, comment_id)
+                    upserted[key] = (pk, created, previous)
+
+    results = {key: (pk, created) for key, (pk, created, _) in upserted.items()}
+    for created, action in [
+        (True, ChangeLog.Actions.CREATED),
+        (False, ChangeLog.Actions.UPDATED),
+    ]:
+        ids = [pk for pk, was_created in results.values() if was_created is created]
+        record_changes(Reaction, ids, action)
+    changes = []
+    for key, (_, _, previous) in upserted.items():
+        _, blog_id, comment_id = key
+        changes.append((blog_id, comment_id, latest[key], 1))
+        if previous is not None:
+            changes.append((blog_id, comment_id, previous, -1))
+    publish_reactions(changes)
+    return results
+
+
+def check_and_upsert_reactions(cursor, latest):
+    """``upsert_reactions`` for a partitioned table without unique constraints.
+
+    Updates the reactions that exist and inserts the rest in one statement
+    while holding the authors' locks. Returns
+    ``{(author_id, blog_id, comment_id): (id, created, previous type)}``.
+    """
+    if not latest:
+        return {}
+    table = Reaction._meta.db_table
+    authors, blogs, comments = zip(*latest)
+    rows = fetch_locked(
+        cursor,
+        Reaction,
+        authors,
+        f"""
+        WITH rows AS (
+            SELECT * FROM unnest(
+                %s::bigint[], %s::bigint[], %s::bigint[], %s::varchar[]
+            ) AS rows(author_id, blog_id, comment_id, reaction_type)
+        ), matches AS (
+            SELECT existing.id, rows.reaction_type, existing.reaction_type AS previous
+            FROM rows
+            JOIN {table} AS existing ON existing.author_id = rows.author_id
+             AND existing.blog_id IS NOT DISTINCT FROM rows.blog_id
+             AND existing.comment_id IS NOT DISTINCT FROM rows.comment_id
+        ), updated AS (
+            UPDATE {table} AS reaction SET reaction_type = matches.reaction_type
+            FROM matches WHERE reaction.id = matches.id
+            RETURNING reaction.id, reaction.author_id, reaction.blog_id,
+                reaction.comment_id, false, matches.previous
+        ), inserted AS (
+            INSERT INTO {table}
+                (author_id, blog_id, comment_id, reaction_type, given_at)
+            SELECT author_id, blog_id, comment_id, reaction_type, now()
+            FROM rows
+            WHERE NOT EXISTS (
+                SELECT 1 FROM {table} AS existing
+                WHERE existing.author_id = rows.author_id
+                  AND existing.blog_id IS NOT DISTINCT FROM rows.blog_id
+                  AND existing.comment_id IS NOT DISTINCT FROM rows.comment_id
+            )
+            RETURNING id, author_id, blog_id, comment_id, true, NULL::varchar
+        )
+        SELECT * FROM updated UNION ALL SELECT * FROM inserted
+        """,
+        [list(authors), list(blogs), list(comments), list(latest.values())],
+    )
+    return {
+        (author_id, blog_id, comment_id): (pk, created, previous)
+        for pk, author_id, blog_id, comment_id, created, previous in rows
+    }
+
+
+def upsert_like(author, blog):
+    insert_likes([(author.pk, blog.pk)])
+    return Like.objects.get(author=author, blog=blog)
+
+
+def upsert_reaction(author, blog, comment, reaction_type):
+    key = (author.pk, blog.pk, comment.pk if comment else None)
+    pk, _ = upsert_reactions([key + (reaction_type,)])[key]
+    return Reaction.objects.get(pk=pk)
+
+
+def enqueue_like(author, blog):
+    return PendingEngagement.objects.create(
+        kind=PendingEngagement.Kinds.LIKE, author=author, blog=blog
+    )
+
+
+def enqueue_reaction(author, blog, comment, reaction_type):
+    return PendingEngagement.objects.create(
+        kind=PendingEngagement.Kinds.REACTION,
+        author=author,
+        blog=blog,
+        comment=comment,
+        reaction_type=reaction_type,
+    )
+
+
+@transaction.atomic
+def flush_pending(batch_size=FLUSH_BATCH_SIZE, author=None):
+    """Move one batch of queued likes and reactions into their tables.
+
+    Workers skip rows claimed by another flush. A flush for a single author
+    (read-your-own-writes) waits for them instead, so once it returns all of
+    that author's earlier writes are visible.
+    """
+    queryset = PendingEngagement.objects.order_by("pk")
+    if author is not None:
+        queryset = queryset.filter(author=author).select_for_update()
+    else:
+        queryset = queryset.select_for_update(skip_locked=True)
+    batch = list(queryset[:batch_size])
+    if not batch:
+        return 0
+
+    blogs = set(
+        Blog.objects.filter(pk__in={item.blog_id for item in batch}).values_list(
+            "pk", flat=True
+        )
+    )
+    comment_ids = {item.comment_id for item in batch if item.comment_id}
+    comments = set(
+        Comment.objects.filter(pk__in=comment_ids).values_list("pk", flat=True)
+    )
+
+    likes = []
+    reactions = []
+    for item in batch:
+        # Targets deleted while the write was queued are dropped.
+        if item.blog_id not in blogs or (
+            item.comment_id and item.comment_id not in comments
+        ):
+            continue
+        if item.kind == PendingEngagement.Kinds.LIKE:
+            likes.append((item.author_id, item.blog_id))
+        else:
+            reactions.append(
+                (item.author_id, item.blog_id, item.comment_id, item.reaction_type)
+            )
+
+    insert_likes(likes)
+    upsert_reactions(reactions)
+    PendingEngagement.objects.filter(pk__in=[item.pk for item in batch]).delete()
+    return len(batch)
+
+
+DEDUPE_LIKES_SQL = f"""
+    DELETE FROM {Like._meta.db_table} AS duplicate
+    USING {Like._meta.db_table} AS kept
+    WHERE duplicate.author_id BETWEEN %s AND %s
+      AND kept.author_id = duplicate.author_id
+      AND kept.blog_id = duplicate.blog_id
+      AND kept.id < duplicate.id
+    RETURNING duplicate.id, duplicate.blog_id
+"""
+
+# The newest reaction carries the type the author picked last, keep that one.
+# Reactions detached from both their blog and comment are left alone.
+DEDUPE_REACTIONS_SQL = f"""
+    DELETE FROM {Reaction._meta.db_table} AS duplicate
+    USING {Reaction._meta.db_table} AS kept
+    WHERE duplicate.author_id BETWEEN %s AND %s
+      AND (duplicate.blog_id IS NOT NULL OR duplicate.comment_id IS NOT NULL)
+      AND kept.author_id = duplicate.author_id
+      AND kept.blog_id IS NOT DISTINCT FROM duplicate.blog_id
+      AND kept.comment_id IS NOT DISTINCT FROM duplicate.comment_id
+      AND kept.id > duplicate.id
+    RETURNING duplicate.id
+"""
+
+
+@transaction.atomic
+def dedupe_authors(first_author_id, last_author_id):
+    """Delete duplicate likes and reactions of an author id range."""
+    with connection.cursor() as cursor:
+        cursor.execute(DEDUPE_LIKES_SQL, [first_author_id, last_author_id])
+        likes = cursor.fetchall()
+        cursor.execute(DEDUPE_REACTIONS_SQL, [first_author_id, last_author_id])
+        reactions = [row[0] for row in cursor.fetchall()]
+    record_changes(Like, [row[0] for row in likes], ChangeLog.Actions.DELETED)
+    record_changes(Reaction, reactions, ChangeLog.Actions.DELETED)
+    adjust_like_counts(
+        {blog_id: -n for blog_id, n in Counter(row[1] for row in likes).items()}
+    )
+    return len(likes), len(reactions)
@@ -0,0 +1,117 @@
+import csv
+import json
+import zlib
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import Blog, Comment, Reaction
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+EXPORT_CHUNK_SIZE = 2000
+
+
+class Export:
+    def __init__(self, model, fields, since_field, visible=None):
+        self.model = model
+        self.fields = fields
+        self.since_field = since_field
+        # Lookups that leave out rows of blogs queued for purge.
+        self.visible = visible or {}
+
+    def rows(self, since=None, chunk_size=EXPORT_CHUNK_SIZE):
+        queryset = self.model.objects.filter(**self.visible).order_by("pk")
+        if since is not None:
+            queryset = queryset.filter(**{f"{self.since_field}__gte": since})
+        # On PostgreSQL iterator() streams through a server-side cursor, so
+        # only one chunk of rows is held in memory at any time.
+        return queryset.values_list(*self.fields).iterator(chunk_size=chunk_size)
+
+
+EXPORTS = {
+    "blog": Export(
+        Blog,
+        [
+            "id",
+            "author_id",
+            "category_id",
+            "title",
+            "description",
+            "is_public",
+            "posted_at",
+            "slug",
+        ],
+        since_field="posted_at",
+        visible={"is_hidden": False},
+    ),
+    "comment": Export(
+        Comment,
+        ["id", "author_id", "blog_id", "text", "created_at", "updated_at"],
+        since_field="updated_at",
+        visible={"blog__is_hidden": False},
+    ),
+    "reaction": Export(
+        Reaction,
+        ["id", "author_id", "blog_id", "comment_id", "reaction_type", "given_at"],
+        since_field="given_at",
+        visible={"blog__is_hidden": False},
+    ),
+}
+
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def ndjson_lines(fields, rows):
+    for row in rows:
+        yield json.dumps(dict(zip(fields, row)), cls=DjangoJSONEncoder) + "\n"
+
+
+def csv_lines(fields, rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(fields)
+    for row in rows:
+        yield writer.writerow(
+            [
+                value.isoformat() if hasattr(value, "isoformat") else value
+                for value in row
+            ]
+        )
+
+
+def encode(lines):
+    for line in lines:
+        yield line.encode()
+
+
+def gzip_stream(chunks, min_flush_size=64 * 1024):
+    # wbits=31 writes a gzip header and trailer around the deflate stream.
+    compressor = zlib.compressobj(wbits=31)
+    pending = 0
+    for chunk in chunks:
+        pending += len(chunk)
+        data = compressor.compress(chunk)
+        if pending >= min_flush_size:
+            data += compressor.flush(zlib.Z_SYNC_FLUSH)
+            pending = 0
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_stream(resource, output="ndjson", since=None, compress=False):
+    export = EXPORTS[resource]
+    rows = export.rows(since=since)
+    if output == "csv":
+        lines = csv_lines(export.fields, rows)
+    else:
+        lines = ndjson_lines(export.fields, rows)
+    stream = encode(lines)
+    if compress:
+        stream = gzip_stream(stream)
+    return stream
@@ -86,6 +86,7 @@ class ReplyFactory(DjangoModelFactory):
 class LikeFactory(DjangoModelFactory):
     class Meta:
         model = Like
+        django_get_or_create = ("author", "blog")
 
     author = factory.Iterator(CustomUser.objects.all())
     blog = factory.Iterator(Blog.objects.all())
@@ -95,6 +96,7 @@ class LikeFactory(DjangoModelFactory):
 class ReactionFactory(DjangoModelFactory):
     class Meta:
         model = Reaction
+        django_get_or_create = ("author", "blog", "comment")
 
     author = factory.Iterator(CustomUser.objects.all())
     blog = factory.Iterator(Blog.objects.all())
@@ -0,0 +1,100 @@
+from collections.abc import Mapping
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.utils.translation import gettext_lazy as _
+from rest_framework import serializers
+from rest_framework.relations import MANY_RELATION_KWARGS, ManyRelatedField
+
+
+class BatchedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """``PrimaryKeyRelatedField`` that resolves ids with one ``IN`` query.
+
+    Resolved objects are cached in the serializer context, which lives for the
+    request, so every field reading the same queryset shares one lookup.
+    """
+
+    default_error_messages = {
+        "does_not_exist_many": _('Invalid pks "{pk_values}" - objects do not exist.'),
+    }
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_kwargs = {"child_relation": cls(*args, **kwargs)}
+        for key in kwargs:
+            if key in MANY_RELATION_KWARGS:
+                list_kwargs[key] = kwargs[key]
+        return BatchedManyRelatedField(**list_kwargs)
+
+    def get_cache(self):
+        if not hasattr(self, "_cache_key"):
+            queryset = self.get_queryset()
+            self._cache_key = (queryset.model._meta.label, str(queryset.query))
+        related_objects = self.context.setdefault("related_objects", {})
+        return related_objects.setdefault(self._cache_key, {})
+
+    def to_pk(self, data):
+        if self.pk_field is not None:
+            data = self.pk_field.to_internal_value(data)
+        if isinstance(data, bool):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        try:
+            return self.get_queryset().model._meta.pk.to_python(data)
+        except (TypeError, ValueError, DjangoValidationError):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+
+    def resolve(self, pks):
+        cache = self.get_cache()
+        missing = {pk for pk in pks if pk not in cache}
+        if missing:
+            cache.update(dict.fromkeys(missing))
+            cache.update(self.get_queryset().in_bulk(missing))
+        return {pk: cache[pk] for pk in pks}
+
+    def prefetch(self, values):
+        pks = []
+        for value in values:
+            try:
+                pks.append(self.to_pk(value))
+            except serializers.ValidationError:
+                continue
+        self.resolve(pks)
+
+    def to_internal_value(self, data):
+        pk = self.to_pk(data)
+        obj = self.resolve([pk])[pk]
+        if obj is None:
+            self.fail("does_not_exist", pk_value=data)
+        return obj
+
+
+class BatchedManyRelatedField(ManyRelatedField):
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, "__iter__"):
+            self.fail("not_a_list", input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail("empty")
+
+        pks = [self.child_relation.to_pk(item) for item in data]
+        objects = self.child_relation.resolve(pks)
+        missing = [pk for pk in dict.fromkeys(pks) if objects[pk] is None]
+        if missing:
+            self.child_relation.fail(
+                "does_not_exist_many", pk_values=", ".join(map(str, missing))
+            )
+        return [objects[pk] for pk in pks]
+
+
+class BatchedRelatedListSerializer(serializers.ListSerializer):
+    """Resolves batched related fields of all list items before validation."""
+
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            items = [item for item in data if isinstance(item, Mapping)]
+            for field in self.child.fields.values():
+                if isinstance(field, BatchedPrimaryKeyRelatedField):
+                    field.prefetch(
+                        item[field.field_name]
+                        for item in items
+                        if item.get(field.field_name) not in (None, "")
+                    )
+        return super().to_internal_value(data)
@@ -1,5 +1,6 @@
 from rest_framework import filters
 
+from .serializers import TimeRangeQuerySerializer
 
 # class CategoryFilter(filters.FilterSet):
 #     name = filters.CharFilter(field_name="name", lookup_expr="iexact")
@@ -14,3 +15,21 @@ class CategoryFilter(filters.SearchFilter):
         if request.query_params.get("name"):
             return ["name"]
         return super().get_search_fields(view, request)
+
+
+class TimeRangeFilter(filters.BaseFilterBackend):
+    """Keeps rows whose ``view.time_field`` is within ``?since=`` and ``?until=``.
+
+    On tables partitioned by that field PostgreSQL then only scans the
+    partitions of the range.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        serializer = TimeRangeQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        bounds = serializer.validated_data
+        if "since" in bounds:
+            queryset = queryset.filter(**{f"{view.time_field}__gte": bounds["since"]})
+        if "until" in bounds:
+            queryset = queryset.filter(**{f"{view.time_field}__lt": bounds["until"]})
+        return queryset
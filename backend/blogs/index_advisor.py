@@ -0,0 +1,209 @@
+import json
+import re
+
+from django.apps import apps
+from django.db import connection, transaction
+
+ADVISED_STATEMENTS = ("SELECT", "UPDATE", "DELETE", "WITH")
+MIN_TABLE_ROWS = 10000
+
+LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+IN_LIST_RE = re.compile(r"IN \((?:\?, )*\?\)")
+# Filters in EXPLAIN output look like "((blog_id = 5) AND (created_at > ...))".
+CONDITION_RE = re.compile(r"\((?:\w+\.)?\"?(\w+)\"? (=|<>|<=|>=|<|>|~~)")
+SORT_PASSTHROUGH = {"Sort", "Incremental Sort", "Gather", "Gather Merge", "Materialize"}
+
+
+def shape(sql):
+    """Replace literals so statements differing only in values group together."""
+    shaped = LITERAL_RE.sub("?", sql.strip())
+    return IN_LIST_RE.sub("IN (...)", shaped)
+
+
+def load_queries(lines):
+    """Parse JSON lines of ``{"sql": ..., "params": [...]}`` captured queries."""
+    queries = []
+    for line in lines:
+        line = line.strip()
+        if line:
+            entry = json.loads(line)
+            queries.append((entry["sql"], entry.get("params") or []))
+    return queries
+
+
+def distinct_shapes(queries):
+    """Keep the first example of every advisable statement shape."""
+    shapes = {}
+    for sql, params in queries:
+        if sql.lstrip().upper().startswith(ADVISED_STATEMENTS):
+            shapes.setdefault(shape(sql), (sql, params))
+    return shapes
+
+
+def explain(sql, params):
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params or None)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]["Plan"]
+
+
+def table_rows(tables):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT relname, reltuples FROM pg_class WHERE relname = ANY(%s)",
+            [list(tables)],
+        )
+        return {name: max(rows, 0) for name, rows in cursor.fetchall()}
+
+
+def scans(node, sort_keys=()):
+    """Yield ``(scan node, sort keys applied above it)`` for every table scan."""
+    node_type = node["Node Type"]
+    if node_type in ("Sort", "Incremental Sort"):
+        sort_keys = node.get("Sort Key", [])
+    if node.get("Relation Name"):
+        yield node, sort_keys
+    for child in node.get("Plans", []):
+        yield from scans(child, sort_keys if node_type in SORT_PASSTHROUGH else ())
+
+
+def _sort_columns(node, sort_keys):
+    alias = node.get("Alias", node["Relation Name"])
+    columns = []
+    for key in sort_keys:
+        key = key.removesuffix(" DESC").strip('"')
+        table, _, column = key.rpartition(".")
+        if table and table.strip('"') != alias:
+            # The sort spans several tables; an index on one cannot serve it.
+            return []
+        if not re.fullmatch(r"\w+", column.strip('"')):
+            return []
+        columns.append(column.strip('"'))
+    return columns
+
+
+def index_columns(node, sort_keys):
+    """Equality columns first, then range columns, then the sort order."""
+    if node["Node Type"] != "Seq Scan" and not sort_keys:
+        return []
+    equality = []
+    ranges = []
+    conditions = " ".join(
+        node.get(key, "") for key in ("Index Cond", "Recheck Cond", "Filter")
+    )
+    for column, operator in CONDITION_RE.findall(conditions):
+        target = equality if operator == "=" else ranges
+        if column not in equality + ranges:
+            target.append(column)
+    columns = equality + ranges
+    for column in _sort_columns(node, sort_keys):
+        if column not in columns:
+            columns.append(column)
+    return columns
+
+
+def model_fields(table, columns):
+    """Map a table and its columns to a model and its field names."""
+    for model in apps.get_models():
+        if model._meta.db_table == table:
+            by_column = {field.column: field.name for field in model._meta.fields}
+            if all(column in by_column for column in columns):
+                return model, [by_column[column] for column in columns]
+    return None, []
+
+
+def is_indexed(table, columns):
+    """Whether an existing index already leads with ``columns``."""
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, table)
+    return any(
+        constraint["index"] and constraint["columns"][: len(columns)] == columns
+        for constraint in constraints.values()
+    )
+
+
+def index_name(model, fields):
+    # Django limits index names to 30 characters.
+    return "_".join([model._meta.model_name, *fields])[:26] + "_idx"
+
+
+def hypopg_available():
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'hypopg'")
+        return cursor.fetchone() is not None
+
+
+def cost_with_index(sql, params, table, columns, build=False):
+    """Estimate the statement cost once an index on ``columns`` exists.
+
+    Uses a hypothetical index when the hypopg extension is installed. With
+    ``build`` the index is really created inside a transaction that is rolled
+    back, which locks the table against writes while it builds.
+    """
+    quoted = ", ".join(connection.ops.quote_name(column) for column in columns)
+    statement = f"CREATE INDEX ON {connection.ops.quote_name(table)} ({quoted})"
+    if hypopg_available():
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT * FROM hypopg_create_index(%s)", [statement])
+            try:
+                return explain(sql, params)["Total Cost"]
+            finally:
+                cursor.execute("SELECT hypopg_reset()")
+    if not build:
+        return None
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(statement)
+        cost = explain(sql, params)["Total Cost"]
+        transaction.set_rollback(True)
+    return cost
+
+
+def advise(queries, min_rows=MIN_TABLE_ROWS, build=False):
+    """Return index candidates for the captured ``(sql, params)`` queries.
+
+    Each distinct statement shape is explained once; sequential scans and
+    sorts on tables with at least ``min_rows`` estimated rows are turned into
+    a candidate index on the filtered and sorted columns.
+    """
+    plans = []
+    for sql_shape, (sql, params) in distinct_shapes(queries).items():
+        plans.append((sql_shape, sql, params, explain(sql, params)))
+    rows = table_rows(
+        {node["Relation Name"] for *_, plan in plans for node, _ in scans(plan)}
+    )
+
+    candidates = {}
+    for sql_shape, sql, params, plan in plans:
+        for node, sort_keys in scans(plan):
+            table = node["Relation Name"]
+            if rows.get(table, 0) < min_rows:
+                continue
+            columns = index_columns(node, sort_keys)
+            model, fields = model_fields(table, columns)
+            if model is None or not fields or is_indexed(table, columns):
+                continue
+            key = (model, tuple(fields))
+            if key in candidates:
+                candidates[key]["queries"].append(sql_shape)
+                continue
+            cost = plan["Total Cost"]
+            candidates[key] = {
+                "model": model,
+                "fields": fields,
+                "name": index_name(model, fields),
+                "table_rows": int(rows[table]),
+                "node": node["Node Type"],
+                "cost": cost,
+                "cost_with_index": cost_with_index(sql, params, table, columns, build),
+                "queries": [sql_shape],
+            }
+    return sorted(candidates.values(), key=_savings, reverse=True)
+
+
+def _savings(candidate):
+    if candidate["cost_with_index"] is None:
+        return 0
+    return candidate["cost"] - candidate["cost_with_index"]
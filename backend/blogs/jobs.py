@@ -0,0 +1,75 @@
+"""Background jobs of the blogs app; see ``core.jobs``."""
+
+from django.conf import settings
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from core.jobs import job
+
+from .archive import archive_comments
+from .engagement import buffering_enabled, flush_pending
+from .models import Blog, Like
+from .partitions import ensure_partitions
+from .purges import run_purges
+from .rollups import rollup_engagement
+from .stats import refresh_stats
+
+
+@job("blogs.flush_engagement", every=10)
+def flush_engagement_job():
+    if buffering_enabled():
+        while flush_pending():
+            pass
+
+
+@job("blogs.rollup_engagement", every=60)
+def rollup_engagement_job():
+    rollup_engagement()
+
+
+@job("blogs.refresh_stats", every=300)
+def refresh_stats_job():
+    refresh_stats()
+
+
+@job("blogs.ensure_partitions", every=86400)
+def ensure_partitions_job():
+    for table in getattr(settings, "BLOGS_PARTITIONED_TABLES", ()):
+        ensure_partitions(table)
+
+
+# Off unless given an interval in JOBS_SCHEDULE.
+@job("blogs.archive_comments")
+def archive_comments_job(days=None):
+    archive_comments(**({"days": days} if days else {}))
+
+
+# Queued by schedule_purge; the schedule picks up purges left behind.
+@job("blogs.run_purges", every=600)
+def run_purges_job():
+    run_purges()
+
+
+@job("blogs.repair_like_counts")
+def repair_like_counts(chunk_size=1000):
+    """Recount ``Blog.likes_count`` from the likes, a primary key chunk at a time."""
+    likes = (
+        Like.objects.filter(blog=OuterRef("pk"))
+        .order_by()
+        .values("blog")
+        .annotate(count=Count("id"))
+        .values("count")
+    )
+    last_pk = 0
+    while True:
+        pks = list(
+            Blog.objects.filter(pk__gt=last_pk)
+            .order_by("pk")
+            .values_list("pk", flat=True)[:chunk_size]
+        )
+        if not pks:
+            return
+        Blog.objects.filter(pk__in=pks).update(
+            likes_count=Coalesce(Subquery(likes), Value(0))
+        )
+        last_pk = pks[-1]
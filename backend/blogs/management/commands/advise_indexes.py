@@ -0,0 +1,94 @@
+import sys
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from rest_framework.authtoken.models import Token
+
+from blogs.index_advisor import MIN_TABLE_ROWS, advise, load_queries
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Explain captured queries and propose Meta.indexes entries for "
+        "sequential scans and sorts on large tables."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--file",
+            help='JSON lines of {"sql": ..., "params": [...]}, "-" for stdin',
+        )
+        parser.add_argument(
+            "--url",
+            action="append",
+            default=[],
+            help="API path to request and capture queries from (repeatable)",
+        )
+        parser.add_argument("--user", help="Username to authenticate --url requests")
+        parser.add_argument("--host", default="localhost")
+        parser.add_argument("--min-rows", type=int, default=MIN_TABLE_ROWS)
+        parser.add_argument(
+            "--build-indexes",
+            action="store_true",
+            help="Without hypopg, build each candidate in a rolled back "
+            "transaction to estimate its cost (locks the table for writes)",
+        )
+
+    def handle(self, *args, **options):
+        if not options["file"] and not options["url"]:
+            raise CommandError("Pass --file and/or --url.")
+        queries = []
+        if options["file"] == "-":
+            queries += load_queries(sys.stdin)
+        elif options["file"]:
+            with open(options["file"]) as source:
+                queries += load_queries(source)
+        if options["url"]:
+            queries += self.capture(options["url"], options["user"], options["host"])
+
+        candidates = advise(
+            queries, min_rows=options["min_rows"], build=options["build_indexes"]
+        )
+        if not candidates:
+            self.stdout.write("No index candidates found.")
+        for candidate in candidates:
+            self.write_candidate(candidate)
+
+    def capture(self, urls, username, host):
+        queries = []
+
+        def record(execute, sql, params, many, context):
+            if not many:
+                queries.append((sql, list(params or [])))
+            return execute(sql, params, many, context)
+
+        headers = {}
+        if username:
+            user = User.objects.get(username=username)
+            token, _ = Token.objects.get_or_create(user=user)
+            headers["HTTP_AUTHORIZATION"] = f"Token {token.key}"
+        client = Client(SERVER_NAME=host)
+        with connection.execute_wrapper(record):
+            for url in urls:
+                response = client.get(url, **headers)
+                self.stderr.write(f"{url}: {response.status_code}")
+        return queries
+
+    def write_candidate(self, candidate):
+        model = candidate["model"]
+        cost = f"{candidate['cost']:.1f}"
+        if candidate["cost_with_index"] is not None:
+            reduction = 1 - candidate["cost_with_index"] / (candidate["cost"] or 1)
+            cost += f" -> {candidate['cost_with_index']:.1f} (-{reduction:.0%})"
+        fields = ", ".join(f'"{field}"' for field in candidate["fields"])
+        self.stdout.write(
+            f"{model.__name__} ({model._meta.db_table}, ~{candidate['table_rows']} "
+            f"rows): {candidate['node']}, cost {cost}\n"
+            f'    models.Index(fields=[{fields}], name="{candidate["name"]}"),\n'
+            f"    used by {len(candidate['queries'])} statement(s), e.g. "
+            f"{candidate['queries'][0][:200]}"
+        )
@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+
+from blogs.archive import (
+    ARCHIVE_AFTER_DAYS,
+    ARCHIVE_BATCH_SIZE,
+    archive_comments,
+    table_sizes,
+    vacuum,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Move the comments, replies and reactions of blogs without recent "
+        "comments into compressed cold storage."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=ARCHIVE_AFTER_DAYS,
+            help="Archive blogs without comments or replies for this many days",
+        )
+        parser.add_argument("--batch-size", type=int, default=ARCHIVE_BATCH_SIZE)
+        parser.add_argument(
+            "--vacuum",
+            action="store_true",
+            help="VACUUM the emptied tables and report their size change",
+        )
+
+    def handle(self, *args, **options):
+        size = table_sizes()
+        comments, replies, reactions, raw, archived = archive_comments(
+            days=options["days"], batch_size=options["batch_size"]
+        )
+        self.stdout.write(
+            f"Archived {comments} comments, {replies} replies and "
+            f"{reactions} reactions: {raw} bytes of rows stored in "
+            f"{archived} bytes."
+        )
+        if options["vacuum"]:
+            vacuum()
+            self.stdout.write(
+                f"Tables went from {size} to {table_sizes()} bytes on disk."
+            )
@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+
+from blogs.changes import record_changes
+from blogs.models import Blog, ChangeLog
+
+
+class Command(BaseCommand):
+    help = (
+        "Regenerate empty and duplicate blog slugs in primary key chunks; the "
+        "oldest blog keeps a shared slug."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size", type=int, default=1000, help="Blogs per transaction"
+        )
+
+    def handle(self, *args, **options):
+        fixed = 0
+        last_pk = 0
+        while True:
+            pks = list(
+                Blog.objects.filter(pk__gt=last_pk)
+                .order_by("pk")
+                .values_list("pk", flat=True)[: options["chunk_size"]]
+            )
+            if not pks:
+                break
+            fixed += self.fix_slugs(pks)
+            last_pk = pks[-1]
+        self.stdout.write(f"Regenerated {fixed} slugs.")
+
+    @transaction.atomic
+    def fix_slugs(self, pks):
+        older_duplicate = Blog.objects.filter(
+            slug=OuterRef("slug"), pk__lt=OuterRef("pk")
+        )
+        blogs = list(
+            Blog.objects.filter(pk__in=pks)
+            .filter(Q(slug="") | Exists(older_duplicate))
+            .only("pk", "title")
+        )
+        reserved = set()
+        for blog in blogs:
+            blog.slug = Blog.unique_slug(blog.title, reserved)
+            reserved.add(blog.slug)
+        Blog.objects.bulk_update(blogs, ["slug"])
+        record_changes(Blog, [blog.pk for blog in blogs], ChangeLog.Actions.UPDATED)
+        return len(blogs)
@@ -0,0 +1,35 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db.models import Max, Min
+
+from blogs.engagement import dedupe_authors
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete duplicate likes and reactions in author id chunks, keeping the "
+        "first like and the latest reaction of each author."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size", type=int, default=1000, help="Authors per transaction"
+        )
+
+    def handle(self, *args, **options):
+        bounds = User.objects.aggregate(first=Min("pk"), last=Max("pk"))
+        if bounds["first"] is None:
+            return
+        likes = reactions = 0
+        start = bounds["first"]
+        while start <= bounds["last"]:
+            end = start + options["chunk_size"] - 1
+            deleted_likes, deleted_reactions = dedupe_authors(start, end)
+            likes += deleted_likes
+            reactions += deleted_reactions
+            start = end + 1
+        self.stdout.write(
+            f"Deleted {likes} duplicate likes and {reactions} duplicate reactions."
+        )
@@ -0,0 +1,46 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from blogs.exports import EXPORTS, EXPORT_FORMATS, export_stream
+
+
+class Command(BaseCommand):
+    help = "Stream blogs, comments or reactions as NDJSON or CSV."
+
+    def add_arguments(self, parser):
+        parser.add_argument("resource", choices=list(EXPORTS))
+        parser.add_argument("--output", choices=list(EXPORT_FORMATS), default="ndjson")
+        parser.add_argument(
+            "--since", help="Only export rows changed at or after this ISO datetime"
+        )
+        parser.add_argument("--gzip", action="store_true", help="Compress the output")
+        parser.add_argument(
+            "--file", help="Write to this path instead of standard output"
+        )
+
+    def handle(self, *args, **options):
+        since = None
+        if options["since"]:
+            since = parse_datetime(options["since"])
+            if since is None:
+                raise CommandError(f"Invalid --since value: {options['since']}")
+            if timezone.is_naive(since):
+                since = timezone.make_aware(since)
+
+        stream = export_stream(
+            options["resource"],
+            output=options["output"],
+            since=since,
+            compress=options["gzip"],
+        )
+        if options["file"]:
+            with open(options["file"], "wb") as target:
+                for chunk in stream:
+                    target.write(chunk)
+        else:
+            for chunk in stream:
+                sys.stdout.buffer.write(chunk)
+            sys.stdout.buffer.flush()
@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from blogs.engagement import FLUSH_BATCH_SIZE, flush_pending
+
+
+class Command(BaseCommand):
+    help = "Flush queued likes and reactions into their tables in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=FLUSH_BATCH_SIZE)
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=1.0,
+            help="Seconds to sleep when the queue is empty",
+        )
+        parser.add_argument(
+            "--once", action="store_true", help="Drain the queue and exit"
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            flushed = flush_pending(batch_size=options["batch_size"])
+            if flushed:
+                self.stdout.write(f"Flushed {flushed} queued writes.")
+                continue
+            if options["once"]:
+                break
+            time.sleep(options["interval"])
@@ -0,0 +1,51 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from blogs.partitions import (
+    PARTITION_KEYS,
+    UNDETACHABLE,
+    convert,
+    detach_partitions,
+    ensure_partitions,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Create upcoming monthly partitions of the tables in "
+        "BLOGS_PARTITIONED_TABLES and detach old ones."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--convert",
+            action="store_true",
+            help="Partition tables that are not partitioned yet "
+            "(copies them under an exclusive lock)",
+        )
+        parser.add_argument("--months-ahead", type=int, default=3)
+        parser.add_argument(
+            "--keep-months",
+            type=int,
+            help="Detach partitions older than this many months",
+        )
+
+    def handle(self, *args, **options):
+        tables = list(getattr(settings, "BLOGS_PARTITIONED_TABLES", ()))
+        unknown = set(tables) - set(PARTITION_KEYS)
+        if unknown:
+            raise CommandError(f"Cannot partition {', '.join(sorted(unknown))}.")
+        undetachable = set(tables) & UNDETACHABLE
+        if options["keep_months"] is not None and undetachable:
+            raise CommandError(
+                f"Cannot detach partitions of {', '.join(sorted(undetachable))}; "
+                "use archive_comments to move old comments out."
+            )
+        for table in tables:
+            if options["convert"] and convert(table, options["months_ahead"]):
+                self.stdout.write(f"Partitioned {table}.")
+            for name in ensure_partitions(table, options["months_ahead"]):
+                self.stdout.write(f"Created {name}.")
+            if options["keep_months"] is not None:
+                for name in detach_partitions(table, options["keep_months"]):
+                    self.stdout.write(f"Detached {name}.")
@@ -0,0 +1,34 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from blogs.stats import refresh_stats
+
+
+class Command(BaseCommand):
+    help = "Refresh the materialized category and author statistics."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=300.0,
+            help="Seconds to sleep between refreshes",
+        )
+        parser.add_argument("--once", action="store_true", help="Refresh and exit")
+        parser.add_argument(
+            "--blocking",
+            action="store_true",
+            help="Lock the views while refreshing (faster, blocks readers)",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            started = time.monotonic()
+            refresh_stats(concurrently=not options["blocking"])
+            self.stdout.write(
+                f"Refreshed statistics in {time.monotonic() - started:.2f}s."
+            )
+            if options["once"]:
+                break
+            time.sleep(options["interval"])
@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from blogs.rollups import ROLLUP_BATCH_SIZE, rollup_engagement
+
+
+class Command(BaseCommand):
+    help = "Fold new likes, reactions, comments and replies into daily rollups."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=ROLLUP_BATCH_SIZE)
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=60.0,
+            help="Seconds to sleep between runs",
+        )
+        parser.add_argument(
+            "--once", action="store_true", help="Catch up once and exit"
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            folded = rollup_engagement(batch_size=options["batch_size"])
+            if folded:
+                self.stdout.write(f"Folded {folded} rows into daily rollups.")
+            if options["once"]:
+                break
+            time.sleep(options["interval"])
@@ -0,0 +1,35 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from blogs.purges import PURGE_BATCH_SIZE, purge_batch
+
+
+class Command(BaseCommand):
+    help = "Delete blogs and users queued for a background purge in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=PURGE_BATCH_SIZE)
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=10.0,
+            help="Seconds to sleep when no purge is waiting",
+        )
+        parser.add_argument(
+            "--once", action="store_true", help="Finish waiting purges and exit"
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            task = purge_batch(batch_size=options["batch_size"])
+            if task is None:
+                if options["once"]:
+                    break
+                time.sleep(options["interval"])
+                continue
+            deleted = ", ".join(
+                f"{count} {label}" for label, count in sorted(task.progress.items())
+            )
+            state = "Finished" if task.finished_at else "Progress of"
+            self.stdout.write(f"{state} {task}: {deleted or 'nothing deleted'}.")
@@ -0,0 +1,50 @@
+# Generated by Django 4.1.7 on 2026-10-19 07:58
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+import django.db.models.deletion
+
+
+def backfill_likes_count(apps, schema_editor):
+    Blog = apps.get_model('blogs', 'Blog')
+    Like = apps.get_model('blogs', 'Like')
+    likes = (
+        Like.objects.filter(blog=models.OuterRef('pk'))
+        .order_by()
+        .values('blog')
+        .annotate(count=models.Count('id'))
+        .values('count')
+    )
+    Blog.objects.update(
+        likes_count=Coalesce(models.Subquery(likes), 0)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('blogs', '0010_changelog'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blog',
+            name='likes_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_likes_count, migrations.RunPython.noop),
+        migrations.CreateModel(
+            name='PendingEngagement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('like', 'Like'), ('reaction', 'Reaction')], max_length=10)),
+                ('reaction_type', models.CharField(blank=True, max_length=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('author', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('blog', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='blogs.blog')),
+                ('comment', models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='blogs.comment')),
+            ],
+        ),
+    ]
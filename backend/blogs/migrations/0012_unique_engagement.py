@@ -0,0 +1,108 @@
+# Generated by Django 4.1.7 on 2026-10-19 08:01
+
+from django.db import migrations, models, transaction
+
+
+# Authors whose duplicates are deleted per transaction.
+DEDUPE_CHUNK_SIZE = 1000
+
+DEDUPE_SQL = [
+    # Keep the first like of every author/blog pair and take the deleted
+    # duplicates off the counts backfilled by 0011.
+    '''
+    WITH deleted AS (
+        DELETE FROM blogs_like AS duplicate USING blogs_like AS kept
+        WHERE duplicate.author_id BETWEEN %s AND %s
+          AND kept.author_id = duplicate.author_id
+          AND kept.blog_id = duplicate.blog_id
+          AND kept.id < duplicate.id
+        RETURNING duplicate.blog_id
+    )
+    UPDATE blogs_blog SET likes_count = GREATEST(likes_count - removed.count, 0)
+    FROM (SELECT blog_id, count(*) FROM deleted GROUP BY blog_id) AS removed
+    WHERE blogs_blog.id = removed.blog_id
+    ''',
+    # Keep the latest reaction of every author/target pair. Reactions detached
+    # from both their blog and comment are not duplicates of each other.
+    '''
+    DELETE FROM blogs_reaction AS duplicate USING blogs_reaction AS kept
+    WHERE duplicate.author_id BETWEEN %s AND %s
+      AND (duplicate.blog_id IS NOT NULL OR duplicate.comment_id IS NOT NULL)
+      AND kept.author_id = duplicate.author_id
+      AND kept.blog_id IS NOT DISTINCT FROM duplicate.blog_id
+      AND kept.comment_id IS NOT DISTINCT FROM duplicate.comment_id
+      AND kept.id > duplicate.id
+    ''',
+]
+
+
+def dedupe(apps, schema_editor):
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        cursor.execute(
+            '''
+            SELECT min(author_id), max(author_id) FROM (
+                SELECT author_id FROM blogs_like
+                UNION ALL SELECT author_id FROM blogs_reaction
+            ) AS authors
+            '''
+        )
+        first, last = cursor.fetchone()
+    if first is None:
+        return
+    # The migration is not atomic; every chunk commits on its own.
+    for start in range(first, last + 1, DEDUPE_CHUNK_SIZE):
+        end = start + DEDUPE_CHUNK_SIZE - 1
+        with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+            for sql in DEDUPE_SQL:
+                cursor.execute(sql, [start, end])
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction.
+    atomic = False
+
+    dependencies = [
+        ('blogs', '0011_buffered_engagement'),
+    ]
+
+    operations = [
+        migrations.RunPython(dedupe, migrations.RunPython.noop),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddConstraint(
+                    model_name='like',
+                    constraint=models.UniqueConstraint(fields=('author', 'blog'), name='unique_like_per_author'),
+                ),
+                migrations.AddConstraint(
+                    model_name='reaction',
+                    constraint=models.UniqueConstraint(fields=('author', 'blog', 'comment'), name='unique_reaction_per_target'),
+                ),
+                migrations.AddConstraint(
+                    model_name='reaction',
+                    constraint=models.UniqueConstraint(condition=models.Q(('comment__isnull', True)), fields=('author', 'blog'), name='unique_blog_reaction_per_author'),
+                ),
+            ],
+            database_operations=[
+                migrations.RunSQL(
+                    [
+                        'CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS unique_like_per_author ON blogs_like (author_id, blog_id)',
+                        'ALTER TABLE blogs_like ADD CONSTRAINT unique_like_per_author UNIQUE USING INDEX unique_like_per_author',
+                    ],
+                    ['ALTER TABLE blogs_like DROP CONSTRAINT unique_like_per_author'],
+                ),
+                migrations.RunSQL(
+                    [
+                        'CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS unique_reaction_per_target ON blogs_reaction (author_id, blog_id, comment_id)',
+                        'ALTER TABLE blogs_reaction ADD CONSTRAINT unique_reaction_per_target UNIQUE USING INDEX unique_reaction_per_target',
+                    ],
+                    ['ALTER TABLE blogs_reaction DROP CONSTRAINT unique_reaction_per_target'],
+                ),
+                migrations.RunSQL(
+                    'CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS unique_blog_reaction_per_author ON blogs_reaction (author_id, blog_id) WHERE comment_id IS NULL',
+                    'DROP INDEX CONCURRENTLY IF EXISTS unique_blog_reaction_per_author',
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.1.7 on 2026-10-19 08:04
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('blogs', '0012_unique_engagement'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='blog',
+            index=models.Index(fields=['slug'], name='blog_slug_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='blog',
+            index=models.Index(condition=models.Q(('is_public', True)), fields=['-posted_at'], name='blog_public_recent_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='comment',
+            index=models.Index(fields=['blog', 'created_at'], name='comment_blog_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='reaction',
+            index=models.Index(fields=['blog', 'reaction_type'], include=('id',), name='reaction_blog_type_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='reaction',
+            index=models.Index(condition=models.Q(('comment__isnull', False)), fields=['comment', 'reaction_type'], include=('id',), name='reaction_comment_type_idx'),
+        ),
+    ]
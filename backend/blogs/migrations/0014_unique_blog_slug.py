@@ -0,0 +1,56 @@
+# Generated by Django 4.1.7 on 2026-10-19 08:05
+
+from django.contrib.postgres.operations import RemoveIndexConcurrently
+from django.db import migrations, models
+
+
+# Safety net for small databases; run the backfill_slugs command first on
+# large ones so this only has to touch rows written in between.
+DEDUPE_SLUGS_SQL = '''
+    UPDATE blogs_blog SET slug = coalesce(nullif(blogs_blog.slug, ''), 'blog') || '-' || blogs_blog.id
+    FROM (
+        SELECT id, row_number() OVER (PARTITION BY slug ORDER BY id) AS position
+        FROM blogs_blog
+    ) AS ranked
+    WHERE ranked.id = blogs_blog.id AND (ranked.position > 1 OR blogs_blog.slug = '')
+'''
+
+
+def dedupe_slugs(apps, schema_editor):
+    # A renamed slug may collide with an existing '<slug>-<n>'; the next pass
+    # renames the later of the two again until no duplicates are left.
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(DEDUPE_SLUGS_SQL)
+        while cursor.rowcount:
+            cursor.execute(DEDUPE_SLUGS_SQL)
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('blogs', '0013_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(dedupe_slugs, migrations.RunPython.noop),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddConstraint(
+                    model_name='blog',
+                    constraint=models.UniqueConstraint(fields=('slug',), name='unique_blog_slug', opclasses=['varchar_pattern_ops']),
+                ),
+            ],
+            database_operations=[
+                migrations.RunSQL(
+                    'CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS unique_blog_slug ON blogs_blog (slug varchar_pattern_ops)',
+                    'DROP INDEX CONCURRENTLY IF EXISTS unique_blog_slug',
+                ),
+            ],
+        ),
+        RemoveIndexConcurrently(
+            model_name='blog',
+            name='blog_slug_idx',
+        ),
+    ]
@@ -0,0 +1,117 @@
+# Generated by Django 4.1.7 on 2026-10-19 08:35
+
+from django.db import migrations, models
+
+
+# Blogs count on the day they were posted, everything else on the day it was
+# made. Reactions to a comment count towards the blog of the comment.
+CATEGORY_STATS_SQL = '''
+CREATE MATERIALIZED VIEW blogs_category_daily_stats AS
+SELECT
+    row_number() OVER (ORDER BY category_id, day) AS id,
+    category_id,
+    day,
+    count(*) FILTER (WHERE kind = 'blog') AS blogs,
+    count(*) FILTER (WHERE kind = 'comment') AS comments,
+    count(*) FILTER (WHERE kind = 'like') AS likes,
+    count(*) FILTER (WHERE kind = 'reaction') AS reactions
+FROM (
+    SELECT blog.category_id, (blog.posted_at AT TIME ZONE 'UTC')::date AS day, 'blog' AS kind
+    FROM blogs_blog AS blog
+    UNION ALL
+    SELECT blog.category_id, (comment.created_at AT TIME ZONE 'UTC')::date, 'comment'
+    FROM blogs_comment AS comment
+    JOIN blogs_blog AS blog ON blog.id = comment.blog_id
+    UNION ALL
+    SELECT blog.category_id, (liked.created_at AT TIME ZONE 'UTC')::date, 'like'
+    FROM blogs_like AS liked
+    JOIN blogs_blog AS blog ON blog.id = liked.blog_id
+    UNION ALL
+    SELECT blog.category_id, (reaction.given_at AT TIME ZONE 'UTC')::date, 'reaction'
+    FROM blogs_reaction AS reaction
+    LEFT JOIN blogs_comment AS comment ON comment.id = reaction.comment_id
+    JOIN blogs_blog AS blog ON blog.id = coalesce(reaction.blog_id, comment.blog_id)
+) AS activity
+WHERE category_id IS NOT NULL
+GROUP BY category_id, day
+'''
+
+AUTHOR_STATS_SQL = '''
+CREATE MATERIALIZED VIEW blogs_author_daily_stats AS
+SELECT
+    row_number() OVER (ORDER BY author_id, day) AS id,
+    author_id,
+    day,
+    count(*) FILTER (WHERE kind = 'blog') AS blogs,
+    count(*) FILTER (WHERE kind = 'comment') AS comments,
+    count(*) FILTER (WHERE kind = 'like') AS likes,
+    count(*) FILTER (WHERE kind = 'reaction') AS reactions
+FROM (
+    SELECT author_id, (posted_at AT TIME ZONE 'UTC')::date AS day, 'blog' AS kind
+    FROM blogs_blog
+    UNION ALL
+    SELECT author_id, (created_at AT TIME ZONE 'UTC')::date, 'comment'
+    FROM blogs_comment
+    UNION ALL
+    SELECT author_id, (created_at AT TIME ZONE 'UTC')::date, 'like'
+    FROM blogs_like
+    UNION ALL
+    SELECT author_id, (given_at AT TIME ZONE 'UTC')::date, 'reaction'
+    FROM blogs_reaction
+) AS activity
+WHERE author_id IS NOT NULL
+GROUP BY author_id, day
+'''
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blogs', '0014_unique_blog_slug'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthorDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('blogs', models.BigIntegerField()),
+                ('comments', models.BigIntegerField()),
+                ('likes', models.BigIntegerField()),
+                ('reactions', models.BigIntegerField()),
+            ],
+            options={
+                'db_table': 'blogs_author_daily_stats',
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='CategoryDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('blogs', models.BigIntegerField()),
+                ('comments', models.BigIntegerField()),
+                ('likes', models.BigIntegerField()),
+                ('reactions', models.BigIntegerField()),
+            ],
+            options={
+                'db_table': 'blogs_category_daily_stats',
+                'managed': False,
+            },
+        ),
+        # REFRESH ... CONCURRENTLY needs a unique index covering every row.
+        migrations.RunSQL(
+            [
+                CATEGORY_STATS_SQL,
+                'CREATE UNIQUE INDEX blogs_category_daily_stats_key ON blogs_category_daily_stats (category_id, day)',
+                AUTHOR_STATS_SQL,
+                'CREATE UNIQUE INDEX blogs_author_daily_stats_key ON blogs_author_daily_stats (author_id, day)',
+            ],
+            [
+                'DROP MATERIALIZED VIEW IF EXISTS blogs_category_daily_stats',
+                'DROP MATERIALIZED VIEW IF EXISTS blogs_author_daily_stats',
+            ],
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.1.7 on 2026-10-19 08:52
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blogs', '0015_daily_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RollupWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('position', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='BlogDailyEngagement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('likes', models.PositiveIntegerField(default=0)),
+                ('reactions', models.PositiveIntegerField(default=0)),
+                ('comments', models.PositiveIntegerField(default=0)),
+                ('replies', models.PositiveIntegerField(default=0)),
+                ('blog', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_engagement', to='blogs.blog')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='blogdailyengagement',
+            constraint=models.UniqueConstraint(fields=('blog', 'day'), name='unique_blog_daily_engagement'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.1.7 on 2026-10-19 10:25
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('blogs', '0017_archived_comment'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blog',
+            name='is_hidden',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.CreateModel(
+            name='PurgeTask',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('target', models.CharField(choices=[('blog', 'Blog'), ('user', 'User')], max_length=10)),
+                ('object_id', models.BigIntegerField()),
+                ('progress', models.JSONField(default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('finished_at', models.DateTimeField(null=True)),
+                ('requested_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='purgetask',
+            constraint=models.UniqueConstraint(condition=models.Q(('finished_at__isnull', True)), fields=('target', 'object_id'), name='unique_pending_purge'),
+        ),
+    ]
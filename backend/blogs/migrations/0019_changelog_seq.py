@@ -0,0 +1,34 @@
+# Generated by Django 4.1.7 on 2026-10-19 11:05
+
+from django.db import migrations, models
+
+# Entries logged so far keep their id as feed position, so cursors handed
+# out before this migration stay valid.
+CREATE_SEQUENCE_SQL = """
+CREATE SEQUENCE blogs_changelog_seq;
+UPDATE blogs_changelog SET seq = id;
+SELECT setval('blogs_changelog_seq', COALESCE(MAX(seq), 0) + 1, false)
+FROM blogs_changelog;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blogs', '0018_purge_task'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='changelog',
+            name='seq',
+            field=models.BigIntegerField(null=True, unique=True),
+        ),
+        migrations.AddIndex(
+            model_name='changelog',
+            index=models.Index(condition=models.Q(('seq__isnull', True)), fields=['id'], name='changelog_unsequenced_idx'),
+        ),
+        migrations.RunSQL(
+            CREATE_SEQUENCE_SQL, 'DROP SEQUENCE blogs_changelog_seq;'
+        ),
+    ]
@@ -0,0 +1,114 @@
+# Generated by Django 4.1.7 on 2026-10-19 12:40
+
+from importlib import import_module
+
+from django.db import migrations, models
+
+daily_stats = import_module('blogs.migrations.0015_daily_stats')
+
+
+# Existing blogs only have the time of their last save.
+BACKFILL_SQL = 'UPDATE blogs_blog SET created_at = posted_at WHERE created_at IS NULL'
+
+# As in 0015, but blogs count on the day they were created.
+CATEGORY_STATS_SQL = '''
+CREATE MATERIALIZED VIEW blogs_category_daily_stats AS
+SELECT
+    row_number() OVER (ORDER BY category_id, day) AS id,
+    category_id,
+    day,
+    count(*) FILTER (WHERE kind = 'blog') AS blogs,
+    count(*) FILTER (WHERE kind = 'comment') AS comments,
+    count(*) FILTER (WHERE kind = 'like') AS likes,
+    count(*) FILTER (WHERE kind = 'reaction') AS reactions
+FROM (
+    SELECT blog.category_id, (blog.created_at AT TIME ZONE 'UTC')::date AS day, 'blog' AS kind
+    FROM blogs_blog AS blog
+    UNION ALL
+    SELECT blog.category_id, (comment.created_at AT TIME ZONE 'UTC')::date, 'comment'
+    FROM blogs_comment AS comment
+    JOIN blogs_blog AS blog ON blog.id = comment.blog_id
+    UNION ALL
+    SELECT blog.category_id, (liked.created_at AT TIME ZONE 'UTC')::date, 'like'
+    FROM blogs_like AS liked
+    JOIN blogs_blog AS blog ON blog.id = liked.blog_id
+    UNION ALL
+    SELECT blog.category_id, (reaction.given_at AT TIME ZONE 'UTC')::date, 'reaction'
+    FROM blogs_reaction AS reaction
+    LEFT JOIN blogs_comment AS comment ON comment.id = reaction.comment_id
+    JOIN blogs_blog AS blog ON blog.id = coalesce(reaction.blog_id, comment.blog_id)
+) AS activity
+WHERE category_id IS NOT NULL
+GROUP BY category_id, day
+'''
+
+AUTHOR_STATS_SQL = '''
+CREATE MATERIALIZED VIEW blogs_author_daily_stats AS
+SELECT
+    row_number() OVER (ORDER BY author_id, day) AS id,
+    author_id,
+    day,
+    count(*) FILTER (WHERE kind = 'blog') AS blogs,
+    count(*) FILTER (WHERE kind = 'comment') AS comments,
+    count(*) FILTER (WHERE kind = 'like') AS likes,
+    count(*) FILTER (WHERE kind = 'reaction') AS reactions
+FROM (
+    SELECT author_id, (created_at AT TIME ZONE 'UTC')::date AS day, 'blog' AS kind
+    FROM blogs_blog
+    UNION ALL
+    SELECT author_id, (created_at AT TIME ZONE 'UTC')::date, 'comment'
+    FROM blogs_comment
+    UNION ALL
+    SELECT author_id, (created_at AT TIME ZONE 'UTC')::date, 'like'
+    FROM blogs_like
+    UNION ALL
+    SELECT author_id, (given_at AT TIME ZONE 'UTC')::date, 'reaction'
+    FROM blogs_reaction
+) AS activity
+WHERE author_id IS NOT NULL
+GROUP BY author_id, day
+'''
+
+
+
+DROP_STATS_SQL = [
+    'DROP MATERIALIZED VIEW IF EXISTS blogs_category_daily_stats',
+    'DROP MATERIALIZED VIEW IF EXISTS blogs_author_daily_stats',
+]
+
+
+def create_stats_sql(category_sql, author_sql):
+    return [
+        category_sql,
+        'CREATE UNIQUE INDEX blogs_category_daily_stats_key ON blogs_category_daily_stats (category_id, day)',
+        author_sql,
+        'CREATE UNIQUE INDEX blogs_author_daily_stats_key ON blogs_author_daily_stats (author_id, day)',
+    ]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blogs', '0019_changelog_seq'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            DROP_STATS_SQL,
+            create_stats_sql(daily_stats.CATEGORY_STATS_SQL, daily_stats.AUTHOR_STATS_SQL),
+        ),
+        migrations.AddField(
+            model_name='blog',
+            name='created_at',
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.RunSQL(BACKFILL_SQL, migrations.RunSQL.noop),
+        migrations.AlterField(
+            model_name='blog',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True),
+        ),
+        migrations.RunSQL(
+            create_stats_sql(CATEGORY_STATS_SQL, AUTHOR_STATS_SQL), DROP_STATS_SQL
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 4.1.7 on 2026-10-19 09:40
+
+from django.db import migrations, models
+
+ROLLUP_SOURCES = ['blogs_like', 'blogs_reaction', 'blogs_comment', 'blogs_reply']
+
+
+def add_xid_sql(table):
+    # Rows written before this migration keep a NULL xid and sort first.
+    return f"""
+        ALTER TABLE {table} ADD COLUMN rollup_xid bigint;
+        ALTER TABLE {table}
+            ALTER COLUMN rollup_xid SET DEFAULT pg_current_xact_id()::text::bigint;
+        CREATE INDEX {table}_rollup_xid_idx ON {table} ((coalesce(rollup_xid, 0)), id);
+    """
+
+
+def drop_xid_sql(table):
+    return f"""
+        DROP INDEX {table}_rollup_xid_idx;
+        ALTER TABLE {table} DROP COLUMN rollup_xid;
+    """
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blogs', '0020_blog_created_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rollupwatermark',
+            name='xid',
+            field=models.BigIntegerField(default=0),
+        ),
+        *(
+            migrations.RunSQL(add_xid_sql(table), drop_xid_sql(table))
+            for table in ROLLUP_SOURCES
+        ),
+    ]
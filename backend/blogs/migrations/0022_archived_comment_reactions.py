@@ -0,0 +1,146 @@
+# Generated by Django 4.1.7 on 2026-10-19 10:05
+
+import json
+import zlib
+from importlib import import_module
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import migrations, models
+import blogs.models
+
+blog_created_at = import_module('blogs.migrations.0020_blog_created_at')
+
+
+# As in 0020, with archived comments and their reactions still counted.
+CATEGORY_STATS_SQL = '''
+CREATE MATERIALIZED VIEW blogs_category_daily_stats AS
+SELECT
+    row_number() OVER (ORDER BY category_id, day) AS id,
+    category_id,
+    day,
+    count(*) FILTER (WHERE kind = 'blog') AS blogs,
+    count(*) FILTER (WHERE kind = 'comment') AS comments,
+    count(*) FILTER (WHERE kind = 'like') AS likes,
+    count(*) FILTER (WHERE kind = 'reaction') AS reactions
+FROM (
+    SELECT blog.category_id, (blog.created_at AT TIME ZONE 'UTC')::date AS day, 'blog' AS kind
+    FROM blogs_blog AS blog
+    UNION ALL
+    SELECT blog.category_id, (comment.created_at AT TIME ZONE 'UTC')::date, 'comment'
+    FROM blogs_comment AS comment
+    JOIN blogs_blog AS blog ON blog.id = comment.blog_id
+    UNION ALL
+    SELECT blog.category_id, (archived.created_at AT TIME ZONE 'UTC')::date, 'comment'
+    FROM blogs_archivedcomment AS archived
+    JOIN blogs_blog AS blog ON blog.id = archived.blog_id
+    UNION ALL
+    SELECT blog.category_id, (liked.created_at AT TIME ZONE 'UTC')::date, 'like'
+    FROM blogs_like AS liked
+    JOIN blogs_blog AS blog ON blog.id = liked.blog_id
+    UNION ALL
+    SELECT blog.category_id, (reaction.given_at AT TIME ZONE 'UTC')::date, 'reaction'
+    FROM blogs_reaction AS reaction
+    LEFT JOIN blogs_comment AS comment ON comment.id = reaction.comment_id
+    JOIN blogs_blog AS blog ON blog.id = coalesce(reaction.blog_id, comment.blog_id)
+    UNION ALL
+    SELECT
+        blog.category_id,
+        ((reaction->>'given_at')::timestamptz AT TIME ZONE 'UTC')::date,
+        'reaction'
+    FROM blogs_archivedcomment AS archived
+    CROSS JOIN jsonb_array_elements(archived.reactions) AS reaction
+    JOIN blogs_blog AS blog
+        ON blog.id = coalesce((reaction->>'blog_id')::bigint, archived.blog_id)
+) AS activity
+WHERE category_id IS NOT NULL
+GROUP BY category_id, day
+'''
+
+# Archived reactions of deleted users are left out, as their live ones are
+# deleted with them.
+AUTHOR_STATS_SQL = '''
+CREATE MATERIALIZED VIEW blogs_author_daily_stats AS
+SELECT
+    row_number() OVER (ORDER BY author_id, day) AS id,
+    author_id,
+    day,
+    count(*) FILTER (WHERE kind = 'blog') AS blogs,
+    count(*) FILTER (WHERE kind = 'comment') AS comments,
+    count(*) FILTER (WHERE kind = 'like') AS likes,
+    count(*) FILTER (WHERE kind = 'reaction') AS reactions
+FROM (
+    SELECT author_id, (created_at AT TIME ZONE 'UTC')::date AS day, 'blog' AS kind
+    FROM blogs_blog
+    UNION ALL
+    SELECT author_id, (created_at AT TIME ZONE 'UTC')::date, 'comment'
+    FROM blogs_comment
+    UNION ALL
+    SELECT author_id, (created_at AT TIME ZONE 'UTC')::date, 'comment'
+    FROM blogs_archivedcomment
+    UNION ALL
+    SELECT author_id, (created_at AT TIME ZONE 'UTC')::date, 'like'
+    FROM blogs_like
+    UNION ALL
+    SELECT author_id, (given_at AT TIME ZONE 'UTC')::date, 'reaction'
+    FROM blogs_reaction
+    UNION ALL
+    SELECT author.id, ((reaction->>'given_at')::timestamptz AT TIME ZONE 'UTC')::date, 'reaction'
+    FROM blogs_archivedcomment AS archived
+    CROSS JOIN jsonb_array_elements(archived.reactions) AS reaction
+    JOIN accounts_customuser AS author ON author.id = (reaction->>'author_id')::bigint
+) AS activity
+WHERE author_id IS NOT NULL
+GROUP BY author_id, day
+'''
+
+
+def move_reactions(apps, schema_editor):
+    ArchivedComment = apps.get_model('blogs', 'ArchivedComment')
+    archives = ArchivedComment.objects.using(schema_editor.connection.alias)
+    for archive in archives.iterator(chunk_size=500):
+        data = json.loads(zlib.decompress(archive.payload))
+        archive.reactions = data.pop('reactions', [])
+        archive.payload = zlib.compress(
+            json.dumps(data, cls=DjangoJSONEncoder).encode(), level=9
+        )
+        archive.save(update_fields=['reactions', 'payload'])
+
+
+def pack_reactions(apps, schema_editor):
+    ArchivedComment = apps.get_model('blogs', 'ArchivedComment')
+    archives = ArchivedComment.objects.using(schema_editor.connection.alias)
+    for archive in archives.iterator(chunk_size=500):
+        data = json.loads(zlib.decompress(archive.payload))
+        data['reactions'] = archive.reactions
+        archive.payload = zlib.compress(
+            json.dumps(data, cls=DjangoJSONEncoder).encode(), level=9
+        )
+        archive.save(update_fields=['payload'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('blogs', '0021_rollup_xid'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedcomment',
+            name='reactions',
+            field=models.JSONField(default=list, encoder=blogs.models.ArchiveJSONEncoder),
+        ),
+        migrations.RunPython(move_reactions, pack_reactions),
+        migrations.RunSQL(
+            blog_created_at.DROP_STATS_SQL,
+            blog_created_at.create_stats_sql(
+                blog_created_at.CATEGORY_STATS_SQL, blog_created_at.AUTHOR_STATS_SQL
+            ),
+        ),
+        migrations.RunSQL(
+            blog_created_at.create_stats_sql(CATEGORY_STATS_SQL, AUTHOR_STATS_SQL),
+            blog_created_at.DROP_STATS_SQL,
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 4.1.7 on 2026-10-19 16:40
+
+from importlib import import_module
+
+from django.db import migrations
+
+blog_created_at = import_module('blogs.migrations.0020_blog_created_at')
+archived_reactions = import_module('blogs.migrations.0022_archived_comment_reactions')
+
+
+# row_number() renumbered every row behind a new key on each refresh, so a
+# concurrent refresh rewrote rows that had not changed. The id is now
+# derived from the key itself: the day offset fits in 32 bits, so ids of
+# different keys never collide.
+def stable_id(sql, column):
+    numbered = f'row_number() OVER (ORDER BY {column}, day) AS id'
+    assert numbered in sql
+    return sql.replace(
+        numbered, f"({column}::bigint << 32) + (day - DATE '1970-01-01') AS id"
+    )
+
+
+CATEGORY_STATS_SQL = stable_id(archived_reactions.CATEGORY_STATS_SQL, 'category_id')
+AUTHOR_STATS_SQL = stable_id(archived_reactions.AUTHOR_STATS_SQL, 'author_id')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blogs', '0022_archived_comment_reactions'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            blog_created_at.DROP_STATS_SQL,
+            blog_created_at.create_stats_sql(
+                archived_reactions.CATEGORY_STATS_SQL,
+                archived_reactions.AUTHOR_STATS_SQL,
+            ),
+        ),
+        migrations.RunSQL(
+            blog_created_at.create_stats_sql(CATEGORY_STATS_SQL, AUTHOR_STATS_SQL),
+            blog_created_at.DROP_STATS_SQL,
+        ),
+    ]
@@ -1,16 +1,23 @@
-import random
-import string
+import json
+import re
+import zlib
+from datetime import datetime
 
 from django.conf import settings
-from django.db import models
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, models, transaction
 from django.template.defaultfilters import slugify
 
+from core.querycache import CachedQuerySet
+
 User = settings.AUTH_USER_MODEL
 
 
 class Category(models.Model):
     name = models.CharField(max_length=30, unique=True)
 
+    objects = CachedQuerySet.as_manager()
+
     def __str__(self):
         return self.name
 
@@ -27,20 +34,80 @@ class Blog(models.Model):
         Category, on_delete=models.SET_NULL, null=True, related_name="blogs"
     )
     posted_at = models.DateTimeField(auto_now=True)
+    # posted_at moves on every save; statistics count blogs on this one.
+    created_at = models.DateTimeField(auto_now_add=True)
     is_public = models.BooleanField(default=True)
+    # Set while a background purge deletes the blog; hidden blogs are left
+    # out of every listing.
+    is_hidden = models.BooleanField(default=False)
     slug = models.CharField(max_length=1000, blank=True)
+    likes_count = models.PositiveIntegerField(default=0)
+
+    objects = CachedQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            # The pattern opclass also serves the prefix scan in unique_slug().
+            models.UniqueConstraint(
+                fields=["slug"],
+                opclasses=["varchar_pattern_ops"],
+                name="unique_blog_slug",
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["-posted_at"],
+                condition=models.Q(is_public=True),
+                name="blog_public_recent_idx",
+            ),
+        ]
 
     def __str__(self):
         return self.title
 
+    @classmethod
+    def unique_slug(cls, title, reserved=()):
+        """Slugify ``title``, adding the first free ``-<n>`` suffix if taken.
+
+        Only ``base`` and its suffixed slugs are read, with one index range
+        scan over the anchored prefix; ``reserved`` holds slugs already handed
+        out but not saved yet.
+        """
+        base = slugify(title) or "blog"
+        pattern = rf"^{re.escape(base)}(-\d+)?$"
+        taken = set(reserved)
+        taken.update(
+            cls.objects.filter(slug__regex=pattern).values_list("slug", flat=True)
+        )
+        slug = base
+        suffix = 1
+        while slug in taken:
+            suffix += 1
+            slug = f"{base}-{suffix}"
+        return slug
+
     def save(self, *args, **kwargs):
         if not self.slug:
-            base_slug = slugify(
-                self.title + " " + self.author.username + " " + self.category.name
-            )
-            self.slug = base_slug + "".join(
-                random.choice(string.ascii_letters + string.digits) for _ in range(5)
-            )
+            # A concurrent save may claim the same slug; pick the next one.
+            for attempt in range(3):
+                self.slug = self.unique_slug(self.title)
+                try:
+                    with transaction.atomic():
+                        return self._save(*args, **kwargs)
+                except IntegrityError as exc:
+                    if "unique_blog_slug" not in str(exc) or attempt == 2:
+                        raise
+        return self._save(*args, **kwargs)
+
+    def _save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            # likes_count is maintained with atomic UPDATEs; never write back
+            # the (possibly stale) value loaded with the instance.
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != "likes_count"
+            ]
         super().save(*args, **kwargs)
 
 
@@ -53,6 +120,15 @@ class Comment(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = CachedQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["blog", "created_at"], name="comment_blog_created_idx"
+            ),
+        ]
+
     def __str__(self):
         return f"{self.author} commented on {self.blog}."
 
@@ -68,6 +144,8 @@ class Reply(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = CachedQuerySet.as_manager()
+
     def __str__(self):
         return f"{self.author} replied to {self.comment}"
 
@@ -77,10 +155,87 @@ class Like(models.Model):
     blog = models.ForeignKey(Blog, on_delete=models.CASCADE, related_name="likes")
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = CachedQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["author", "blog"], name="unique_like_per_author"
+            ),
+        ]
+
     def __str__(self):
         return f"{self.author} liked {self.blog}"
 
 
+class PendingEngagement(models.Model):
+    """Like or reaction waiting to be flushed into its table in a batch.
+
+    Relations are declared without database constraints so that enqueueing
+    never locks the referenced blog or comment rows.
+    """
+
+    class Kinds(models.TextChoices):
+        LIKE = "like"
+        REACTION = "reaction"
+
+    kind = models.CharField(max_length=10, choices=Kinds.choices)
+    author = models.ForeignKey(
+        User, on_delete=models.DO_NOTHING, db_constraint=False, related_name="+"
+    )
+    blog = models.ForeignKey(
+        Blog, on_delete=models.DO_NOTHING, db_constraint=False, related_name="+"
+    )
+    comment = models.ForeignKey(
+        Comment,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        null=True,
+        related_name="+",
+    )
+    reaction_type = models.CharField(max_length=10, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Pending {self.kind} by {self.author_id} on {self.blog_id}"
+
+
+class ReactionQuerySet(CachedQuerySet):
+    def _summary_rows(self, field, ids):
+        queryset = self.filter(**{f"{field}__in": ids})
+        if field == "blog":
+            # Reactions to a comment may carry its blog too; they only count
+            # towards the comment.
+            queryset = queryset.filter(comment__isnull=True)
+        return (
+            queryset.order_by()
+            .values_list(f"{field}_id", "reaction_type")
+            .annotate(count=models.Count("id"))
+        )
+
+    @staticmethod
+    def _empty_summaries(ids):
+        return {
+            pk: {reaction_type: 0 for reaction_type in Reaction.ReactionTypes.values}
+            for pk in ids
+        }
+
+    def summaries(self, field, ids):
+        """Count reactions per type for every ``field`` id in a single GROUP BY."""
+        summaries = self._empty_summaries(ids)
+        for pk, reaction_type, count in self._summary_rows(field, list(summaries)):
+            summaries[pk][reaction_type] = count
+        return summaries
+
+    async def asummaries(self, field, ids):
+        summaries = self._empty_summaries(ids)
+        async for pk, reaction_type, count in self._summary_rows(
+            field, list(summaries)
+        ):
+            summaries[pk][reaction_type] = count
+        return summaries
+
+
 class Reaction(models.Model):
     class ReactionTypes(models.TextChoices):
         LIKE = "Like"
@@ -100,6 +255,36 @@ class Reaction(models.Model):
     reaction_type = models.CharField(max_length=10, choices=ReactionTypes.choices)
     given_at = models.DateTimeField(auto_now_add=True)
 
+    objects = ReactionQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["author", "blog", "comment"], name="unique_reaction_per_target"
+            ),
+            # NULLs never conflict in the constraint above, so reactions on the
+            # blog itself need their own partial one.
+            models.UniqueConstraint(
+                fields=["author", "blog"],
+                condition=models.Q(comment__isnull=True),
+                name="unique_blog_reaction_per_author",
+            ),
+        ]
+        # Cover the reaction summary GROUP BY so it is an index-only scan.
+        indexes = [
+            models.Index(
+                fields=["blog", "reaction_type"],
+                include=["id"],
+                name="reaction_blog_type_idx",
+            ),
+            models.Index(
+                fields=["comment", "reaction_type"],
+                include=["id"],
+                condition=models.Q(comment__isnull=False),
+                name="reaction_comment_type_idx",
+            ),
+        ]
+
     def __str__(self):
         return f"{self.author} reacted {self.reaction_type}"
 
@@ -109,5 +294,193 @@ class Tag(models.Model):
     blogs = models.ManyToManyField(Blog, related_name="tags")
     comments = models.ManyToManyField(Comment, related_name="tags")
 
+    objects = CachedQuerySet.as_manager()
+
     def __str__(self):
         return self.name
+
+
+class ChangeLog(models.Model):
+    class Actions(models.TextChoices):
+        CREATED = "created"
+        UPDATED = "updated"
+        DELETED = "deleted"
+
+    model = models.CharField(max_length=20)
+    object_id = models.BigIntegerField()
+    action = models.CharField(max_length=10, choices=Actions.choices)
+    changed_at = models.DateTimeField(auto_now_add=True)
+    # Feed position, numbered by blogs.changes.sequence_changes once the
+    # writing transaction has committed.
+    seq = models.BigIntegerField(null=True, unique=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["id"],
+                condition=models.Q(seq__isnull=True),
+                name="changelog_unsequenced_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"#{self.pk} {self.model} {self.object_id} {self.action}"
+
+
+class DailyStats(models.Model):
+    """Activity counts of one day, read from a materialized view.
+
+    The views are refreshed by the ``refresh_stats`` command, so rows lag
+    behind the tables until the next refresh.
+    """
+
+    day = models.DateField()
+    blogs = models.BigIntegerField()
+    comments = models.BigIntegerField()
+    likes = models.BigIntegerField()
+    reactions = models.BigIntegerField()
+
+    class Meta:
+        abstract = True
+
+
+class CategoryDailyStats(DailyStats):
+    """Blogs posted in a category and the comments, likes and reactions
+    they received."""
+
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name="+",
+    )
+
+    class Meta:
+        managed = False
+        db_table = "blogs_category_daily_stats"
+
+
+class AuthorDailyStats(DailyStats):
+    """Blogs, comments, likes and reactions a user made."""
+
+    author = models.ForeignKey(
+        User, on_delete=models.DO_NOTHING, db_constraint=False, related_name="+"
+    )
+
+    class Meta:
+        managed = False
+        db_table = "blogs_author_daily_stats"
+
+
+class BlogDailyEngagement(models.Model):
+    """Likes, reactions, comments and replies a blog got on one day.
+
+    Rows are only ever added to by ``blogs.rollups``, so a like that is
+    taken back later stays counted on the day it was given.
+    """
+
+    blog = models.ForeignKey(
+        Blog, on_delete=models.CASCADE, related_name="daily_engagement"
+    )
+    day = models.DateField()
+    likes = models.PositiveIntegerField(default=0)
+    reactions = models.PositiveIntegerField(default=0)
+    comments = models.PositiveIntegerField(default=0)
+    replies = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            # Also the index behind the per-blog day range scan.
+            models.UniqueConstraint(
+                fields=["blog", "day"], name="unique_blog_daily_engagement"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.blog} on {self.day}"
+
+
+class RollupWatermark(models.Model):
+    """Writing transaction and id of the last row folded into its rollup."""
+
+    name = models.CharField(max_length=50, unique=True)
+    xid = models.BigIntegerField(default=0)
+    position = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name} up to #{self.position} of transaction {self.xid}"
+
+
+class ArchiveJSONEncoder(DjangoJSONEncoder):
+    """Keeps the microseconds ``DjangoJSONEncoder`` cuts from datetimes."""
+
+    def default(self, o):
+        if isinstance(o, datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+class ArchivedComment(models.Model):
+    """Comment moved out of the hot tables by ``blogs.archive``.
+
+    Its text, replies and tags are kept as zlib-compressed JSON; the
+    reactions stay readable by PostgreSQL for the statistics views.
+    """
+
+    id = models.BigIntegerField(primary_key=True)
+    blog = models.ForeignKey(
+        Blog, on_delete=models.CASCADE, related_name="archived_comments"
+    )
+    author = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, related_name="+"
+    )
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+    payload = models.BinaryField()
+    reactions = models.JSONField(default=list, encoder=ArchiveJSONEncoder)
+
+    def __str__(self):
+        return f"Archived comment #{self.pk} on {self.blog_id}"
+
+    @staticmethod
+    def pack(data):
+        return zlib.compress(
+            json.dumps(data, cls=ArchiveJSONEncoder).encode(), level=9
+        )
+
+    def unpack(self):
+        data = json.loads(zlib.decompress(self.payload))
+        return {**data, "reactions": self.reactions}
+
+
+class PurgeTask(models.Model):
+    """Background deletion of a blog or user and everything depending on it.
+
+    ``progress`` counts the rows deleted (or detached) so far per model.
+    """
+
+    class Targets(models.TextChoices):
+        BLOG = "blog"
+        USER = "user"
+
+    target = models.CharField(max_length=10, choices=Targets.choices)
+    object_id = models.BigIntegerField()
+    requested_by = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, related_name="+"
+    )
+    progress = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["target", "object_id"],
+                condition=models.Q(finished_at__isnull=True),
+                name="unique_pending_purge",
+            ),
+        ]
+
+    def __str__(self):
+        return f"Purge of {self.target} #{self.object_id}"
@@ -0,0 +1,271 @@
+"""Optional monthly range partitioning of likes, reactions and comments.
+
+``convert`` copies a table into one partitioned by month on its time column.
+It rewrites the table under an exclusive lock, so it runs when asked to with
+``manage.py partitions --convert`` and never as part of ``migrate``.
+
+A partitioned table can only enforce unique constraints that include the
+partition key, so ``unique_like_per_author`` and the reaction constraints
+are dropped; with the table listed in ``BLOGS_PARTITIONED_TABLES`` the
+engagement writes check for existing rows under advisory locks instead.
+Foreign keys pointing at a partitioned ``blogs_comment`` are dropped as
+well; Django still cascades deletes itself.
+
+Detaching old partitions takes their rows out of the parent table. The
+likes are first subtracted from ``Blog.likes_count``, so liking again counts
+once; comments cannot be detached, as their replies and reactions would be
+left behind, and leave through ``archive_comments`` instead.
+"""
+
+import re
+from datetime import date, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.utils import timezone
+
+from .models import Blog, Comment, Like, Reaction
+
+PARTITION_KEYS = {
+    Like._meta.db_table: "created_at",
+    Reaction._meta.db_table: "given_at",
+    Comment._meta.db_table: "created_at",
+}
+
+MONTH_SUFFIX_RE = re.compile(r"_p(\d{4})(\d{2})$")
+
+UNDETACHABLE = {Comment._meta.db_table}
+
+# Run on a partition before it is detached.
+BEFORE_DETACH_SQL = {
+    Like._meta.db_table: f"""
+        UPDATE {Blog._meta.db_table} AS blog
+        SET likes_count = greatest(blog.likes_count - detached.likes, 0)
+        FROM (
+            SELECT blog_id, count(*) AS likes FROM {{partition}} GROUP BY blog_id
+        ) AS detached
+        WHERE blog.id = detached.blog_id
+    """,
+}
+
+
+def partitioned(model):
+    return model._meta.db_table in getattr(settings, "BLOGS_PARTITIONED_TABLES", ())
+
+
+def add_months(month, months):
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def current_month():
+    return timezone.now().date().replace(day=1)
+
+
+def partition_name(table, month):
+    return f"{table}_p{month:%Y%m}"
+
+
+def bound(month):
+    return f"'{month.isoformat()} 00:00:00+00'"
+
+
+def existing_partitions(cursor, table):
+    """``{name: month}`` of the monthly partitions attached to ``table``."""
+    cursor.execute(
+        """
+        SELECT child.relname FROM pg_inherits
+        JOIN pg_class AS child ON child.oid = pg_inherits.inhrelid
+        WHERE pg_inherits.inhparent = to_regclass(%s)
+        """,
+        [table],
+    )
+    partitions = {}
+    for (name,) in cursor.fetchall():
+        match = MONTH_SUFFIX_RE.search(name)
+        if match:
+            partitions[name] = date(int(match[1]), int(match[2]), 1)
+    return partitions
+
+
+def is_partitioned(cursor, table):
+    cursor.execute(
+        "SELECT relkind = 'p' FROM pg_class WHERE oid = to_regclass(%s)", [table]
+    )
+    row = cursor.fetchone()
+    return bool(row and row[0])
+
+
+def create_partitions(cursor, table, first, last):
+    """Create the missing monthly partitions from ``first`` to ``last``.
+
+    Rows of a new partition's month already in ``<table>_default`` are moved
+    into it; PostgreSQL refuses to attach it while they are there.
+    """
+    attached = existing_partitions(cursor, table)
+    cursor.execute("SELECT to_regclass(%s) IS NOT NULL", [f"{table}_default"])
+    (has_default,) = cursor.fetchone()
+    key = PARTITION_KEYS[table]
+    created = []
+    month = first
+    while month <= last:
+        name = partition_name(table, month)
+        if name not in attached:
+            values = f"FROM ({bound(month)}) TO ({bound(add_months(month, 1))})"
+            if has_default:
+                with transaction.atomic(using=cursor.db.alias):
+                    cursor.execute(
+                        f"CREATE TABLE {name} "
+                        f"(LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+                    )
+                    cursor.execute(
+                        f"WITH moved AS (DELETE FROM {table}_default "
+                        f"WHERE {key} >= {bound(month)} "
+                        f"AND {key} < {bound(add_months(month, 1))} RETURNING *) "
+                        f"INSERT INTO {name} SELECT * FROM moved"
+                    )
+                    cursor.execute(
+                        f"ALTER TABLE {table} ATTACH PARTITION {name} "
+                        f"FOR VALUES {values}"
+                    )
+            else:
+                cursor.execute(
+                    f"CREATE TABLE {name} PARTITION OF {table} FOR VALUES {values}"
+                )
+            created.append(name)
+        month = add_months(month, 1)
+    return created
+
+
+def ensure_partitions(table, months_ahead=3, using=DEFAULT_DB_ALIAS):
+    """Create the partitions of this month and the next ``months_ahead``."""
+    month = current_month()
+    with connections[using].cursor() as cursor:
+        if not is_partitioned(cursor, table):
+            return []
+        return create_partitions(cursor, table, month, add_months(month, months_ahead))
+
+
+def detach_partitions(table, keep_months, using=DEFAULT_DB_ALIAS):
+    """Detach monthly partitions older than the last ``keep_months`` months.
+
+    Detached partitions stay behind as plain tables, without foreign keys, to
+    be archived or dropped; their rows are no longer visible through the
+    parent table.
+    """
+    if table in UNDETACHABLE:
+        raise ValueError(f"Partitions of {table} cannot be detached.")
+    cutoff = add_months(current_month(), -keep_months)
+    detached = []
+    with transaction.atomic(using=using), connections[using].cursor() as cursor:
+        for name, month in sorted(existing_partitions(cursor, table).items()):
+            if month < cutoff:
+                if table in BEFORE_DETACH_SQL:
+                    cursor.execute(BEFORE_DETACH_SQL[table].format(partition=name))
+                cursor.execute(f"ALTER TABLE {table} DETACH PARTITION {name}")
+                # The detached table keeps copies of the foreign keys, which
+                # would block deleting the blogs and users its rows point at.
+                cursor.execute(
+                    "SELECT conname FROM pg_constraint "
+                    "WHERE conrelid = to_regclass(%s) AND contype = 'f'",
+                    [name],
+                )
+                for (constraint,) in cursor.fetchall():
+                    cursor.execute(f'ALTER TABLE {name} DROP CONSTRAINT "{constraint}"')
+                detached.append(name)
+    return detached
+
+
+def dependent_views(cursor, table):
+    """``(name, kind, definition, index definitions)`` of views on ``table``."""
+    cursor.execute(
+        """
+        SELECT DISTINCT view.oid, view.relname, view.relkind, pg_get_viewdef(view.oid)
+        FROM pg_depend
+        JOIN pg_rewrite ON pg_rewrite.oid = pg_depend.objid
+        JOIN pg_class AS view ON view.oid = pg_rewrite.ev_class
+        WHERE pg_depend.refobjid = to_regclass(%s) AND view.oid <> pg_depend.refobjid
+        """,
+        [table],
+    )
+    views = []
+    for oid, name, kind, definition in cursor.fetchall():
+        definition = definition.strip().rstrip(";")
+        cursor.execute(
+            "SELECT pg_get_indexdef(indexrelid) FROM pg_index WHERE indrelid = %s",
+            [oid],
+        )
+        indexes = [row[0] for row in cursor.fetchall()]
+        views.append((name, kind, definition, indexes))
+    return views
+
+
+@transaction.atomic
+def convert(table, months_ahead=3, using=DEFAULT_DB_ALIAS):
+    """Replace ``table`` with a copy partitioned by month on its time column.
+
+    Keeps ids, non-unique indexes, outgoing foreign keys and the views built
+    on the table. Rows outside every monthly partition go to ``<table>_default``.
+    Returns False when the table already is partitioned.
+    """
+    key = PARTITION_KEYS[table]
+    legacy = f"{table}_unpartitioned"
+    with connections[using].cursor() as cursor:
+        if is_partitioned(cursor, table):
+            return False
+        # Deferred foreign key checks still pending would block ALTER TABLE.
+        cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+        cursor.execute(f"LOCK TABLE {table} IN ACCESS EXCLUSIVE MODE")
+        cursor.execute(
+            "SELECT pg_get_indexdef(indexrelid) FROM pg_index "
+            "WHERE indrelid = to_regclass(%s) AND NOT indisunique",
+            [table],
+        )
+        indexes = [row[0] for row in cursor.fetchall()]
+        cursor.execute(
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE conrelid = to_regclass(%s) AND contype = 'f'",
+            [table],
+        )
+        foreign_keys = cursor.fetchall()
+        views = dependent_views(cursor, table)
+        cursor.execute(f"SELECT coalesce(max(id), 0), min({key}) FROM {table}")
+        last_id, first = cursor.fetchone()
+
+        # Dropping the identity also drops its sequence; a new one owned by
+        # the partitioned table continues after the last id.
+        cursor.execute(f"ALTER TABLE {table} ALTER COLUMN id DROP IDENTITY IF EXISTS")
+        cursor.execute(f"ALTER TABLE {table} RENAME TO {legacy}")
+        cursor.execute(
+            f"CREATE TABLE {table} (LIKE {legacy} INCLUDING DEFAULTS "
+            f"INCLUDING CONSTRAINTS) PARTITION BY RANGE ({key})"
+        )
+        cursor.execute(
+            f"CREATE SEQUENCE {table}_id_seq START WITH {last_id + 1} "
+            f"OWNED BY {table}.id"
+        )
+        cursor.execute(
+            f"ALTER TABLE {table} ALTER COLUMN id "
+            f"SET DEFAULT nextval('{table}_id_seq')"
+        )
+        month = current_month()
+        if first is not None:
+            month = min(month, first.astimezone(dt_timezone.utc).date().replace(day=1))
+        create_partitions(
+            cursor, table, month, add_months(current_month(), months_ahead)
+        )
+        cursor.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+        cursor.execute(f"INSERT INTO {table} SELECT * FROM {legacy}")
+        cursor.execute(f"DROP TABLE {legacy} CASCADE")
+
+        cursor.execute(f"ALTER TABLE {table} ADD PRIMARY KEY (id, {key})")
+        for definition in indexes:
+            cursor.execute(definition)
+        for name, definition in foreign_keys:
+            cursor.execute(f"ALTER TABLE {table} ADD CONSTRAINT {name} {definition}")
+        for name, kind, definition, view_indexes in views:
+            materialized = "MATERIALIZED " if kind == "m" else ""
+            cursor.execute(f"CREATE {materialized}VIEW {name} AS {definition}")
+            for index in view_indexes:
+                cursor.execute(index)
+    return True
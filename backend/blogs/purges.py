@@ -0,0 +1,198 @@
+"""Background deletion of blogs and users in small batches.
+
+Deleting a popular blog cascades into thousands of comments, replies, likes,
+reactions and tag rows in one transaction. ``schedule_purge`` instead hides
+the blog (or deactivates the user) right away and records a ``PurgeTask``;
+the ``blogs.run_purges`` job (or ``manage.py run_purges``) then deletes the
+dependent rows a batch per transaction, leaves the target itself for last
+and records its progress on the task, so a crashed worker resumes where it
+stopped.
+"""
+
+from collections import Counter
+
+from django.contrib.auth import get_user_model
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from core.invalidation import invalidate
+from core.jobs import enqueue
+
+from .bulk import delete_ids
+from .engagement import adjust_like_counts
+from .models import (
+    ArchivedComment,
+    Blog,
+    Comment,
+    Like,
+    PurgeTask,
+    Reaction,
+    Reply,
+    Tag,
+)
+from .streams import publish_reactions
+
+PURGE_BATCH_SIZE = 1000
+
+
+def schedule_purge(instance, requested_by=None, using=DEFAULT_DB_ALIAS):
+    """Hide ``instance`` and queue the deletion of it and its dependents."""
+    with transaction.atomic(using=using):
+        if isinstance(instance, Blog):
+            target = PurgeTask.Targets.BLOG
+            instance.is_hidden = True
+            instance.save(update_fields=["is_hidden"], using=using)
+        else:
+            target = PurgeTask.Targets.USER
+            if Blog.objects.using(using).filter(author=instance).update(is_hidden=True):
+                invalidate("categories", using=using)
+        task, _ = PurgeTask.objects.using(using).get_or_create(
+            target=target,
+            object_id=instance.pk,
+            finished_at=None,
+            defaults={"requested_by": requested_by},
+        )
+        enqueue("blogs.run_purges", using=using)
+    return task
+
+
+def blog_steps(blogs):
+    return [
+        (Reaction.objects.filter(Q(blog__in=blogs) | Q(comment__blog__in=blogs)), None),
+        (Reply.objects.filter(comment__blog__in=blogs), None),
+        (Tag.comments.through.objects.filter(comment__blog__in=blogs), None),
+        (Comment.objects.filter(blog__in=blogs), None),
+        (Like.objects.filter(blog__in=blogs), None),
+        (ArchivedComment.objects.filter(blog__in=blogs), None),
+        (blogs, None),
+    ]
+
+
+def purged_blogs(task):
+    if task.target == PurgeTask.Targets.BLOG:
+        return Blog.objects.filter(pk=task.object_id)
+    return Blog.objects.filter(author=task.object_id)
+
+
+def purge_steps(task):
+    """``(queryset, field)`` pairs worked through in order.
+
+    Rows are deleted, or detached by setting ``field`` to NULL when given.
+    """
+    if task.target == PurgeTask.Targets.BLOG:
+        return blog_steps(purged_blogs(task))
+    user = task.object_id
+    return [
+        (Reaction.objects.filter(author=user), None),
+        (Like.objects.filter(author=user), None),
+        *blog_steps(purged_blogs(task)),
+        (Comment.objects.filter(author=user), "author"),
+        (Reply.objects.filter(author=user), "author"),
+        (get_user_model().objects.filter(pk=user), None),
+    ]
+
+
+# Columns of the deleted rows that purge_step needs afterwards.
+DELETED_COLUMNS = {
+    Like: ("id", "blog_id"),
+    Reaction: ("id", "blog_id", "comment_id", "reaction_type"),
+}
+
+
+def purge_step(queryset, field, batch_size, purged):
+    """Delete or detach up to ``batch_size`` rows; ``{label: count}``.
+
+    The dependents of a row are deleted in earlier steps, so rows go with one
+    ``DELETE`` and without a signal per row. Instead, likes are subtracted
+    from the counts and reaction changes announced once per batch, and only
+    for the blogs that are not in the ``purged`` queryset. The blogs and the
+    user themselves are deleted through the ORM.
+    """
+    model = queryset.model
+    using = queryset.db
+    ids = list(queryset.order_by("pk").values_list("pk", flat=True)[:batch_size])
+    if not ids:
+        return {}
+    batch = model._default_manager.using(using).filter(pk__in=ids)
+    if field:
+        return {f"{model._meta.label} detached": batch.update(**{field: None})}
+    if model in (Blog, get_user_model()):
+        _, deleted = batch.delete()
+        return deleted
+    rows = delete_ids(model, ids, DELETED_COLUMNS.get(model, ("id",)), using=using)
+    if model is Like:
+        kept = set(
+            Blog.objects.using(using)
+            .filter(pk__in={blog_id for _, blog_id in rows})
+            .exclude(pk__in=purged)
+            .values_list("pk", flat=True)
+        )
+        deltas = Counter()
+        for _, blog_id in rows:
+            if blog_id in kept:
+                deltas[blog_id] -= 1
+        adjust_like_counts(deltas)
+    elif model is Reaction:
+        kept_comments = set(
+            Comment.objects.using(using)
+            .filter(pk__in={comment_id for _, _, comment_id, _ in rows})
+            .exclude(blog__in=purged)
+            .values_list("pk", flat=True)
+        )
+        kept_blogs = set(
+            Blog.objects.using(using)
+            .filter(pk__in={blog_id for _, blog_id, _, _ in rows})
+            .exclude(pk__in=purged)
+            .values_list("pk", flat=True)
+        )
+        publish_reactions(
+            [
+                (blog_id, comment_id, kind, -1)
+                for _, blog_id, comment_id, kind in rows
+                if (
+                    comment_id in kept_comments if comment_id else blog_id in kept_blogs
+                )
+            ],
+            using=using,
+        )
+    elif model is Tag.comments.through:
+        invalidate("tags", using=using)
+    return {model._meta.label: len(rows)}
+
+
+def purge_batch(batch_size=PURGE_BATCH_SIZE, using=DEFAULT_DB_ALIAS):
+    """Work one batch of the oldest unfinished purge no other worker holds.
+
+    Returns the task, or None when no purge is waiting.
+    """
+    with transaction.atomic(using=using):
+        task = (
+            PurgeTask.objects.using(using)
+            .filter(finished_at__isnull=True)
+            .select_for_update(skip_locked=True)
+            .order_by("id")
+            .first()
+        )
+        if task is None:
+            return None
+        purged = purged_blogs(task).using(using)
+        for queryset, field in purge_steps(task):
+            deleted = purge_step(queryset.using(using), field, batch_size, purged)
+            if deleted:
+                for label, count in deleted.items():
+                    task.progress[label] = task.progress.get(label, 0) + count
+                break
+        else:
+            task.finished_at = timezone.now()
+        # requested_by may just have been detached from the purged user.
+        task.save(update_fields=["progress", "finished_at", "updated_at"])
+    return task
+
+
+def run_purges(batch_size=PURGE_BATCH_SIZE, using=DEFAULT_DB_ALIAS):
+    """Work through every waiting purge; returns the number of batches."""
+    batches = 0
+    while purge_batch(batch_size, using=using) is not None:
+        batches += 1
+    return batches
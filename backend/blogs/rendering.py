@@ -0,0 +1,119 @@
+"""Comment payloads rendered to JSON by PostgreSQL.
+
+``comments_of_author_json`` returns the same document as
+``CommentForUserSerializer(many=True)`` as one string built with
+``json_build_object``/``json_agg``, so no model instances are created.
+"""
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connections, router
+
+from .models import Blog, Category, Comment, Reaction, Reply
+
+
+def sql_rendering_enabled():
+    return getattr(settings, "BLOGS_SQL_RENDERING", False)
+
+
+def utc(column, pattern):
+    return f"to_char({column} AT TIME ZONE 'UTC', '{pattern}')"
+
+
+def iso_datetime(column):
+    """Match DRF's ISO 8601 output: microseconds only when non-zero."""
+    seconds = utc(column, 'YYYY-MM-DD"T"HH24:MI:SS')
+    micros = utc(column, ".US")
+    return (
+        f"{seconds} || CASE WHEN {micros} = '.000000' THEN '' ELSE {micros} END"
+        " || 'Z'"
+    )
+
+
+def blog_json(blog, category):
+    """``BlogForUserSerializer``; ``category_name`` is skipped without one."""
+    fields = [
+        ("id", f"{blog}.id"),
+        ("category_name", f"{category}.name"),
+        ("title", f"{blog}.title"),
+        ("description", f"{blog}.description"),
+        ("is_public", f"{blog}.is_public"),
+        ("posted_at", iso_datetime(f"{blog}.posted_at")),
+        ("len_blog_title", f"char_length({blog}.title)"),
+        ("likes_count", f"{blog}.likes_count"),
+    ]
+
+    def build(fields):
+        return "json_build_object({})".format(
+            ", ".join(f"'{name}', {value}" for name, value in fields)
+        )
+
+    without_category = [field for field in fields if field[0] != "category_name"]
+    return (
+        f"CASE WHEN {blog}.id IS NULL THEN NULL"
+        f" WHEN {category}.id IS NULL THEN {build(without_category)}"
+        f" ELSE {build(fields)} END"
+    )
+
+
+# The serializer reports created_at as updated_at too; keep the output equal.
+COMMENTS_OF_AUTHOR_SQL = f"""
+    SELECT coalesce(json_agg(json_build_object(
+        'author_name', author.username,
+        'blog_title', blog.title,
+        'blog', {blog_json("blog", "category")},
+        'text', comment.text,
+        'created_at', {utc("comment.created_at", 'YYYY-MM-DD HH24:MI:SS "UTC"')},
+        'updated_at', {utc("comment.created_at", 'YYYY-MM-DD HH24:MI:SS "UTC"')},
+        'reactions', coalesce((
+            SELECT json_agg(json_build_object(
+                'author', reaction.author_id,
+                'blog', {blog_json("reaction_blog", "reaction_category")},
+                'comment', reaction.comment_id,
+                'reaction_type', reaction.reaction_type,
+                'given_at', {iso_datetime("reaction.given_at")}
+            ) ORDER BY reaction.id)
+            FROM {Reaction._meta.db_table} AS reaction
+            LEFT JOIN {Blog._meta.db_table} AS reaction_blog
+                ON reaction_blog.id = reaction.blog_id
+            LEFT JOIN {Category._meta.db_table} AS reaction_category
+                ON reaction_category.id = reaction_blog.category_id
+            WHERE reaction.comment_id = comment.id
+        ), '[]'),
+        'replies', coalesce((
+            SELECT json_agg(json_build_object(
+                'id', reply.id,
+                'author', reply.author_id,
+                'comment', reply.comment_id,
+                'text', reply.text,
+                'created_at', {iso_datetime("reply.created_at")},
+                'updated_at', {iso_datetime("reply.updated_at")}
+            ) ORDER BY reply.id)
+            FROM {Reply._meta.db_table} AS reply
+            WHERE reply.comment_id = comment.id
+        ), '[]')
+    ) ORDER BY comment.id), '[]')::text
+    FROM {Comment._meta.db_table} AS comment
+    JOIN {get_user_model()._meta.db_table} AS author ON author.id = comment.author_id
+    JOIN {Blog._meta.db_table} AS blog ON blog.id = comment.blog_id
+    LEFT JOIN {Category._meta.db_table} AS category ON category.id = blog.category_id
+    WHERE author.username = %s AND NOT blog.is_hidden
+"""
+
+
+def comments_of_author_json(username, since=None, until=None):
+    """The author's comments with nested blog, reactions and replies as JSON.
+
+    ``since`` and ``until`` bound ``created_at`` like ``TimeRangeFilter``.
+    """
+    sql, params = COMMENTS_OF_AUTHOR_SQL, [username]
+    if since is not None:
+        sql += " AND comment.created_at >= %s"
+        params.append(since)
+    if until is not None:
+        sql += " AND comment.created_at < %s"
+        params.append(until)
+    # Routed like the ORM reads of the serializer path, e.g. to a replica.
+    with connections[router.db_for_read(Comment)].cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchone()[0]
@@ -0,0 +1,127 @@
+"""Incremental per-blog daily rollups of likes, reactions, comments and replies.
+
+Every source table has a ``RollupWatermark`` holding the last row folded into
+``BlogDailyEngagement``; a run only reads the rows past it. Ids are handed
+out before their transaction commits, so rows are instead ordered by the
+``rollup_xid`` column, the id of the transaction that wrote them (filled in
+by the database, see migration 0021), and then by id. A run only folds rows
+of transactions older than ``pg_snapshot_xmin(pg_current_snapshot())``: all
+of those have committed or rolled back, so no row can later appear behind
+the watermark.
+"""
+
+from datetime import timedelta
+
+from django.db import connection, transaction
+
+from .models import (
+    BlogDailyEngagement,
+    Comment,
+    Like,
+    Reaction,
+    Reply,
+    RollupWatermark,
+)
+
+ROLLUP_BATCH_SIZE = 10000
+
+COUNTS = ["likes", "reactions", "comments", "replies"]
+
+COMMENT_JOIN = (
+    f"JOIN {Comment._meta.db_table} AS comment ON comment.id = source.comment_id"
+)
+
+# Rollup column: (source model, timestamp column, blog id expression, joins).
+SOURCES = {
+    "likes": (Like, "created_at", "source.blog_id", ""),
+    "reactions": (
+        Reaction,
+        "given_at",
+        # Reactions to a comment count towards the comment's blog.
+        "coalesce(source.blog_id, comment.blog_id)",
+        f"LEFT {COMMENT_JOIN}",
+    ),
+    "comments": (Comment, "created_at", "source.blog_id", ""),
+    "replies": (Reply, "created_at", "comment.blog_id", COMMENT_JOIN),
+}
+
+# Matches the (coalesce(rollup_xid, 0), id) index of every source table.
+ORDERING = "coalesce(source.rollup_xid, 0), source.id"
+ROW_KEY = f"({ORDERING})"
+
+
+def rollup_source(name, batch_size=ROLLUP_BATCH_SIZE):
+    """Fold the next batch of settled ``name`` rows into the rollup.
+
+    Returns how many source rows were folded.
+    """
+    model, timestamp, blog, joins = SOURCES[name]
+    table = model._meta.db_table
+    counts = ", ".join("count(*)" if column == name else "0" for column in COUNTS)
+    with transaction.atomic():
+        # Locking the watermark keeps concurrent runs from folding rows twice.
+        watermark, _ = RollupWatermark.objects.select_for_update().get_or_create(
+            name=name
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                SELECT {ORDERING}
+                FROM {table} AS source
+                WHERE {ROW_KEY} > (%s, %s)
+                    AND coalesce(source.rollup_xid, 0)
+                        < pg_snapshot_xmin(pg_current_snapshot())::text::bigint
+                ORDER BY {ORDERING} LIMIT %s
+                """,
+                [watermark.xid, watermark.position, batch_size],
+            )
+            settled = cursor.fetchall()
+            if not settled:
+                return 0
+            last_xid, last_id = settled[-1]
+            cursor.execute(
+                f"""
+                INSERT INTO {BlogDailyEngagement._meta.db_table} AS rollup
+                    (blog_id, day, {", ".join(COUNTS)})
+                SELECT {blog}, (source.{timestamp} AT TIME ZONE 'UTC')::date, {counts}
+                FROM {table} AS source {joins}
+                WHERE {ROW_KEY} > (%s, %s) AND {ROW_KEY} <= (%s, %s)
+                    AND {blog} IS NOT NULL
+                GROUP BY 1, 2
+                ON CONFLICT (blog_id, day)
+                DO UPDATE SET {name} = rollup.{name} + EXCLUDED.{name}
+                """,
+                [watermark.xid, watermark.position, last_xid, last_id],
+            )
+        watermark.xid = last_xid
+        watermark.position = last_id
+        watermark.save(update_fields=["xid", "position"])
+    return len(settled)
+
+
+def rollup_engagement(batch_size=ROLLUP_BATCH_SIZE):
+    """Catch every source up with its settled rows; returns the rows folded."""
+    folded = 0
+    for name in SOURCES:
+        while True:
+            batch = rollup_source(name, batch_size=batch_size)
+            folded += batch
+            if batch < batch_size:
+                break
+    return folded
+
+
+def engagement_series(blog_id, since, until):
+    """Daily counts of one blog from ``since`` to ``until``, zeros included."""
+    rows = {
+        row["day"]: row
+        for row in BlogDailyEngagement.objects.filter(
+            blog_id=blog_id, day__range=(since, until)
+        ).values("day", *COUNTS)
+    }
+    series = []
+    day = since
+    while day <= until:
+        series.append(rows.get(day) or {"day": day, **dict.fromkeys(COUNTS, 0)})
+        day += timedelta(days=1)
+    return series
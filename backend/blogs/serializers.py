@@ -1,15 +1,53 @@
+from datetime import timedelta
+
 from django.contrib.auth import get_user_model
+from django.db import models
 from django.utils import timezone
 from rest_framework import serializers
 
-from .models import Blog, Category, Comment, Reply, Like, Reaction, Tag
+from .exports import EXPORT_FORMATS
+from .fields import BatchedPrimaryKeyRelatedField, BatchedRelatedListSerializer
+from .models import Blog, Category, Comment, Reply, Like, Reaction, Tag, PurgeTask
 
 User = get_user_model()
 
 
+class ReactionSummaryListSerializer(BatchedRelatedListSerializer):
+    """Computes reaction summaries for the whole page with one query."""
+
+    def to_representation(self, data):
+        iterable = data.all() if isinstance(data, models.manager.BaseManager) else data
+        items = list(iterable)
+        key = self.child.reaction_summary_context_key
+        if key not in self.context:
+            self.context[key] = Reaction.objects.summaries(
+                self.child.reaction_summary_field, [item.pk for item in items]
+            )
+        return super().to_representation(items)
+
+
+class ReactionSummaryMixin(serializers.Serializer):
+    reaction_summary = serializers.SerializerMethodField()
+    reaction_summary_field = None
+
+    @property
+    def reaction_summary_context_key(self):
+        return f"{self.reaction_summary_field}_reaction_summaries"
+
+    def get_reaction_summary(self, obj):
+        summaries = self.context.get(self.reaction_summary_context_key)
+        if summaries is None or obj.pk not in summaries:
+            summaries = Reaction.objects.summaries(
+                self.reaction_summary_field, [obj.pk]
+            )
+        return summaries[obj.pk]
+
+
 class ReplyForUserSerializer(serializers.ModelSerializer):
     author = serializers.PrimaryKeyRelatedField(read_only=True)
-    comment = serializers.PrimaryKeyRelatedField(queryset=Comment.objects.all())
+    comment = BatchedPrimaryKeyRelatedField(
+        queryset=Comment.objects.filter(blog__is_hidden=False)
+    )
     created_at = serializers.SerializerMethodField()
     updated_at = serializers.SerializerMethodField()
 
@@ -48,8 +86,8 @@ class ReplayForCommentSerializer(serializers.ModelSerializer):
 
 
 class BlogSerializer(serializers.ModelSerializer):
-    author = serializers.PrimaryKeyRelatedField(queryset=User.objects.all())
-    category = serializers.PrimaryKeyRelatedField(queryset=Category.objects.all())
+    author = BatchedPrimaryKeyRelatedField(queryset=User.objects.all())
+    category = BatchedPrimaryKeyRelatedField(queryset=Category.objects.all())
     posted_at = serializers.SerializerMethodField()
 
     class Meta:
@@ -63,6 +101,7 @@ class BlogSerializer(serializers.ModelSerializer):
             "posted_at",
             "slug",
         ]
+        list_serializer_class = BatchedRelatedListSerializer
 
     def get_len_blog_title(self, object):
         return len(object.title)
@@ -78,12 +117,23 @@ class BlogSerializer(serializers.ModelSerializer):
         return obj.category.name
 
 
+class VisibleBlogListSerializer(serializers.ListSerializer):
+    """Leaves out blogs hidden while they are being purged."""
+
+    def to_representation(self, data):
+        iterable = data.all() if isinstance(data, models.manager.BaseManager) else data
+        return super().to_representation(
+            [blog for blog in iterable if not blog.is_hidden]
+        )
+
+
 class BlogForCategorySerializer(serializers.ModelSerializer):
     author = serializers.StringRelatedField(source="author.username", read_only=True)
 
     class Meta:
         model = Blog
         fields = ["id", "title", "description", "posted_at", "author"]
+        list_serializer_class = VisibleBlogListSerializer
 
 
 class CategoryCreateSerializer(serializers.ModelSerializer):
@@ -123,6 +173,7 @@ class BlogForUserSerializer(serializers.ModelSerializer):
             "is_public",
             "posted_at",
             "len_blog_title",
+            "likes_count",
         ]
 
     def get_posted_at(self, obj):
@@ -133,10 +184,19 @@ class BlogForUserSerializer(serializers.ModelSerializer):
         return len(object.title)
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class BlogWithReactionSummarySerializer(ReactionSummaryMixin, BlogForUserSerializer):
+    reaction_summary_field = "blog"
+
+    class Meta(BlogForUserSerializer.Meta):
+        fields = BlogForUserSerializer.Meta.fields + ["reaction_summary"]
+        list_serializer_class = ReactionSummaryListSerializer
+
+
+class CommentSerializer(ReactionSummaryMixin, serializers.ModelSerializer):
     author = serializers.PrimaryKeyRelatedField(read_only=True)
-    blog = serializers.PrimaryKeyRelatedField(queryset=Blog.objects.all())
+    blog = BatchedPrimaryKeyRelatedField(queryset=Blog.objects.filter(is_hidden=False))
     created_at = serializers.SerializerMethodField()
+    reaction_summary_field = "comment"
 
     class Meta:
         model = Comment
@@ -145,7 +205,9 @@ class CommentSerializer(serializers.ModelSerializer):
             "blog",
             "text",
             "created_at",
+            "reaction_summary",
         ]
+        list_serializer_class = ReactionSummaryListSerializer
 
     def get_created_at(self, obj):
         local_created_at = obj.created_at.astimezone(timezone.utc)
@@ -163,8 +225,10 @@ class CommentSerializer(serializers.ModelSerializer):
 
 class ReactionSerializer(serializers.ModelSerializer):
     author = serializers.PrimaryKeyRelatedField(read_only=True)
-    blog = serializers.PrimaryKeyRelatedField(queryset=Blog.objects.all())
-    comment = serializers.PrimaryKeyRelatedField(queryset=Comment.objects.all())
+    blog = BatchedPrimaryKeyRelatedField(queryset=Blog.objects.filter(is_hidden=False))
+    comment = BatchedPrimaryKeyRelatedField(
+        queryset=Comment.objects.filter(blog__is_hidden=False)
+    )
 
     class Meta:
         model = Reaction
@@ -178,10 +242,21 @@ class ReactionSerializer(serializers.ModelSerializer):
         ]
 
 
+class ReactionSummaryQuerySerializer(serializers.Serializer):
+    blog = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), required=False, max_length=100
+    )
+    comment = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), required=False, max_length=100
+    )
+
+
 class ReactionForUserSerializer(serializers.ModelSerializer):
-    author = serializers.PrimaryKeyRelatedField(queryset=User.objects.all())
+    author = BatchedPrimaryKeyRelatedField(queryset=User.objects.all())
     blog = BlogForUserSerializer()
-    comment = serializers.PrimaryKeyRelatedField(queryset=Comment.objects.all())
+    comment = BatchedPrimaryKeyRelatedField(
+        queryset=Comment.objects.filter(blog__is_hidden=False)
+    )
 
     class Meta:
         model = Reaction
@@ -228,7 +303,9 @@ class CommentForUserSerializer(serializers.ModelSerializer):
 
 class ReplySerializer(serializers.ModelSerializer):
     author = serializers.PrimaryKeyRelatedField(read_only=True)
-    comment = serializers.PrimaryKeyRelatedField(queryset=Comment.objects.all())
+    comment = BatchedPrimaryKeyRelatedField(
+        queryset=Comment.objects.filter(blog__is_hidden=False)
+    )
     created_at = serializers.SerializerMethodField()
     updated_at = serializers.SerializerMethodField()
 
@@ -264,7 +341,7 @@ class ReplySerializer(serializers.ModelSerializer):
 
 class LikeSerializer(serializers.ModelSerializer):
     author = serializers.PrimaryKeyRelatedField(read_only=True)
-    blog = serializers.PrimaryKeyRelatedField(queryset=Blog.objects.all())
+    blog = BatchedPrimaryKeyRelatedField(queryset=Blog.objects.filter(is_hidden=False))
     created_at = serializers.SerializerMethodField()
 
     class Meta:
@@ -295,13 +372,13 @@ class LikeForUserSerializer(serializers.ModelSerializer):
 
 
 class TagSerializer(serializers.ModelSerializer):
-    blogs = serializers.PrimaryKeyRelatedField(
+    blogs = BatchedPrimaryKeyRelatedField(
         many=True,
-        queryset=Blog.objects.all(),
+        queryset=Blog.objects.filter(is_hidden=False),
     )
-    comments = serializers.PrimaryKeyRelatedField(
+    comments = BatchedPrimaryKeyRelatedField(
         many=True,
-        queryset=Comment.objects.all(),
+        queryset=Comment.objects.filter(blog__is_hidden=False),
     )
 
     class Meta:
@@ -346,3 +423,124 @@ class TagCreateSerializer(serializers.ModelSerializer):
 
         tag.save()
         return tag
+
+
+class ExportQuerySerializer(serializers.Serializer):
+    output = serializers.ChoiceField(choices=list(EXPORT_FORMATS), default="ndjson")
+    since = serializers.DateTimeField(required=False)
+
+
+class ChangeFeedQuerySerializer(serializers.Serializer):
+    since = serializers.IntegerField(min_value=0, default=0)
+    limit = serializers.IntegerField(min_value=1, max_value=1000, default=100)
+
+
+class StatsQuerySerializer(serializers.Serializer):
+    since = serializers.DateField(required=False)
+    until = serializers.DateField(required=False)
+    id = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), required=False, max_length=100
+    )
+    daily = serializers.BooleanField(default=False)
+
+
+class PurgeQuerySerializer(serializers.Serializer):
+    background = serializers.BooleanField(default=False)
+
+
+class PurgeTaskSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = PurgeTask
+        fields = [
+            "id",
+            "target",
+            "object_id",
+            "progress",
+            "created_at",
+            "updated_at",
+            "finished_at",
+        ]
+
+
+class TimeRangeQuerySerializer(serializers.Serializer):
+    since = serializers.DateTimeField(required=False)
+    until = serializers.DateTimeField(required=False)
+
+
+ENGAGEMENT_MAX_DAYS = 731
+
+
+class EngagementSeriesQuerySerializer(serializers.Serializer):
+    since = serializers.DateField(required=False)
+    until = serializers.DateField(required=False)
+
+    def validate(self, attrs):
+        until = attrs.setdefault("until", timezone.now().date())
+        since = attrs.setdefault("since", until - timedelta(days=364))
+        if since > until:
+            raise serializers.ValidationError("since must not be after until.")
+        if (until - since).days >= ENGAGEMENT_MAX_DAYS:
+            raise serializers.ValidationError(
+                f"Ranges are limited to {ENGAGEMENT_MAX_DAYS} days."
+            )
+        return attrs
+
+
+BULK_MAX_ITEMS = 500
+
+
+class BulkLikeSerializer(serializers.Serializer):
+    blogs = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        min_length=1,
+        max_length=BULK_MAX_ITEMS,
+    )
+
+
+class BulkReactionItemSerializer(serializers.Serializer):
+    blog = serializers.IntegerField(min_value=1)
+    comment = serializers.IntegerField(min_value=1, required=False, allow_null=True)
+    reaction_type = serializers.ChoiceField(choices=Reaction.ReactionTypes.choices)
+
+
+class BulkReactionSerializer(serializers.Serializer):
+    reactions = BulkReactionItemSerializer(many=True)
+
+    def validate_reactions(self, value):
+        if not 0 < len(value) <= BULK_MAX_ITEMS:
+            raise serializers.ValidationError(
+                f"Send between 1 and {BULK_MAX_ITEMS} reactions."
+            )
+        return value
+
+
+class BulkReactionDeleteSerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        min_length=1,
+        max_length=BULK_MAX_ITEMS,
+    )
+
+
+class BulkTagItemSerializer(serializers.Serializer):
+    tag = serializers.IntegerField(min_value=1)
+    blog = serializers.IntegerField(min_value=1, required=False)
+    comment = serializers.IntegerField(min_value=1, required=False)
+
+    def validate(self, attrs):
+        if ("blog" in attrs) == ("comment" in attrs):
+            raise serializers.ValidationError(
+                "Provide either a blog or a comment for each assignment."
+            )
+        return attrs
+
+
+class BulkTagSerializer(serializers.Serializer):
+    assignments = BulkTagItemSerializer(many=True)
+
+    def validate_assignments(self, value):
+        if not 0 < len(value) <= BULK_MAX_ITEMS:
+            raise serializers.ValidationError(
+                f"Send between 1 and {BULK_MAX_ITEMS} assignments."
+            )
+        return value
@@ -0,0 +1,124 @@
+from django.db.models.signals import (
+    m2m_changed,
+    post_save,
+    post_delete,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+
+from core.invalidation import invalidate
+
+from .changes import MODEL_NAMES, record_changes
+from .engagement import adjust_like_counts
+from .models import Blog, Category, Comment, Reply, Like, Reaction, Tag, ChangeLog
+from .streams import publish_comment, publish_reactions, publish_reply
+
+
+def log_save(sender, instance, created, using, **kwargs):
+    action = ChangeLog.Actions.CREATED if created else ChangeLog.Actions.UPDATED
+    record_changes(sender, [instance.pk], action, using=using)
+
+
+def log_delete(sender, instance, using, **kwargs):
+    record_changes(sender, [instance.pk], ChangeLog.Actions.DELETED, using=using)
+
+
+for tracked_model in MODEL_NAMES:
+    post_save.connect(log_save, sender=tracked_model)
+    post_delete.connect(log_delete, sender=tracked_model)
+
+
+@receiver(pre_delete, sender=Blog)
+@receiver(pre_delete, sender=Comment)
+def log_detached_reactions(sender, instance, using, **kwargs):
+    # Reactions are detached with SET_NULL, which bypasses post_save.
+    field = "blog" if sender is Blog else "comment"
+    ids = Reaction.objects.filter(**{field: instance}).values_list("pk", flat=True)
+    record_changes(Reaction, list(ids), ChangeLog.Actions.UPDATED, using=using)
+
+
+@receiver(pre_save, sender=Like)
+def remember_liked_blog(sender, instance, **kwargs):
+    if instance.pk is not None:
+        instance._previous_blog_id = (
+            Like.objects.filter(pk=instance.pk)
+            .values_list("blog_id", flat=True)
+            .first()
+        )
+
+
+@receiver(post_save, sender=Like)
+def count_saved_like(sender, instance, created, **kwargs):
+    if created:
+        adjust_like_counts({instance.blog_id: 1})
+        return
+    previous_blog_id = getattr(instance, "_previous_blog_id", None)
+    if previous_blog_id is not None and previous_blog_id != instance.blog_id:
+        adjust_like_counts({previous_blog_id: -1, instance.blog_id: 1})
+
+
+@receiver(post_delete, sender=Like)
+def count_deleted_like(sender, instance, origin=None, **kwargs):
+    # Skip per-like updates when the blog itself is being deleted.
+    if not isinstance(origin, Blog):
+        adjust_like_counts({instance.blog_id: -1})
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_save, sender=Reply)
+def stream_new_comment(sender, instance, created, using, **kwargs):
+    if created:
+        publish = publish_comment if sender is Comment else publish_reply
+        publish(instance, using=using)
+
+
+@receiver(pre_save, sender=Reaction)
+def remember_reaction(sender, instance, using, **kwargs):
+    if instance.pk is not None:
+        instance._previous_reaction = (
+            Reaction.objects.using(using)
+            .filter(pk=instance.pk)
+            .values_list("blog_id", "comment_id", "reaction_type")
+            .first()
+        )
+
+
+@receiver(post_save, sender=Reaction)
+def stream_saved_reaction(sender, instance, created, using, **kwargs):
+    previous = getattr(instance, "_previous_reaction", None)
+    if not created and previous is None:
+        return
+    changes = [(instance.blog_id, instance.comment_id, instance.reaction_type, 1)]
+    if not created:
+        changes.append((*previous, -1))
+    publish_reactions(changes, using=using)
+
+
+@receiver(post_delete, sender=Reaction)
+def stream_deleted_reaction(sender, instance, using, origin=None, **kwargs):
+    # Reactions of a blog or comment being deleted are of no interest.
+    if not isinstance(origin, (Blog, Comment)):
+        publish_reactions(
+            [(instance.blog_id, instance.comment_id, instance.reaction_type, -1)],
+            using=using,
+        )
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Blog)
+@receiver(post_delete, sender=Blog)
+def invalidate_categories(sender, using, **kwargs):
+    # Category listings embed their blogs.
+    invalidate("categories", using=using)
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+@receiver(post_delete, sender=Blog)
+@receiver(post_delete, sender=Comment)
+@receiver(m2m_changed, sender=Tag.blogs.through)
+@receiver(m2m_changed, sender=Tag.comments.through)
+def invalidate_tags(sender, using, **kwargs):
+    invalidate("tags", using=using)
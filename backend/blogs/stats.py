@@ -0,0 +1,55 @@
+"""Per-day activity statistics kept in PostgreSQL materialized views."""
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import Sum
+
+from .models import AuthorDailyStats, CategoryDailyStats
+
+COUNTS = ["blogs", "comments", "likes", "reactions"]
+
+STATS = {
+    "categories": (CategoryDailyStats, "category"),
+    "authors": (AuthorDailyStats, "author"),
+}
+
+
+def refresh_stats(concurrently=True, using=DEFAULT_DB_ALIAS):
+    """Recompute every stats view.
+
+    A concurrent refresh lets readers keep querying the old rows while the
+    new ones are computed, at the cost of a slower refresh.
+    """
+    option = "CONCURRENTLY " if concurrently else ""
+    with connections[using].cursor() as cursor:
+        for model, _ in STATS.values():
+            cursor.execute(f"REFRESH MATERIALIZED VIEW {option}{model._meta.db_table}")
+
+
+def read_stats(kind, since=None, until=None, ids=None, daily=False):
+    """Counts per category or author between ``since`` and ``until``.
+
+    With ``daily`` every day gets its own row instead of being summed up.
+    """
+    model, key = STATS[kind]
+    column = f"{key}_id"
+    queryset = model.objects.all()
+    if since is not None:
+        queryset = queryset.filter(day__gte=since)
+    if until is not None:
+        queryset = queryset.filter(day__lte=until)
+    if ids:
+        queryset = queryset.filter(**{f"{column}__in": ids})
+    if daily:
+        rows = queryset.order_by(column, "day").values(column, "day", *COUNTS)
+        return [
+            {key: row[column], "day": row["day"], **{c: row[c] for c in COUNTS}}
+            for row in rows
+        ]
+    rows = (
+        queryset.values(column)
+        .annotate(**{f"total_{c}": Sum(c) for c in COUNTS})
+        .order_by(column)
+    )
+    return [
+        {key: row[column], **{c: row[f"total_{c}"] for c in COUNTS}} for row in rows
+    ]
@@ -0,0 +1,111 @@
+"""Live events of a blog, pushed to clients as server-sent events.
+
+New comments and replies are sent as they are committed. Reaction events
+carry the per-type changes of a blog's or comment's counts, taken from the
+writing transaction, so clients apply them to the counts they show without
+querying the summary again; a client that reconnects refetches the counts,
+as events sent while it was away are lost.
+"""
+
+from collections import Counter, defaultdict
+
+from asgiref.sync import ThreadSensitiveContext, sync_to_async
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework import exceptions
+
+from core.authentication import authenticate_token
+from core.events import publish, send_error, stream
+
+from .models import Blog, Comment
+
+
+def blog_topic(blog_id):
+    return f"blog:{blog_id}"
+
+
+def publish_comment(comment, using=DEFAULT_DB_ALIAS):
+    event = {
+        "type": "comment",
+        "id": comment.pk,
+        "author": comment.author_id,
+        "blog": comment.blog_id,
+        "text": comment.text,
+        "created_at": comment.created_at,
+    }
+    publish(blog_topic(comment.blog_id), event, using=using)
+
+
+def publish_reply(reply, using=DEFAULT_DB_ALIAS):
+    blog_id = reply.comment.blog_id
+    event = {
+        "type": "reply",
+        "id": reply.pk,
+        "author": reply.author_id,
+        "comment": reply.comment_id,
+        "blog": blog_id,
+        "text": reply.text,
+        "created_at": reply.created_at,
+    }
+    publish(blog_topic(blog_id), event, using=using)
+
+
+def publish_reactions(changes, using=DEFAULT_DB_ALIAS):
+    """Announce ``(blog_id, comment_id, reaction_type, delta)`` changes.
+
+    Changes are summed per blog or comment; targets whose changes cancel out
+    are not announced.
+    """
+    deltas = defaultdict(Counter)
+    for blog_id, comment_id, reaction_type, delta in changes:
+        deltas[blog_id, comment_id][reaction_type] += delta
+    comment_ids = {comment_id for _, comment_id in deltas if comment_id}
+    comment_blogs = dict(
+        Comment.objects.using(using)
+        .filter(pk__in=comment_ids)
+        .values_list("pk", "blog_id")
+    )
+    for (blog_id, comment_id), counts in deltas.items():
+        counts = {kind: delta for kind, delta in counts.items() if delta}
+        if comment_id:
+            blog_id = comment_blogs.get(comment_id)
+        if blog_id and counts:
+            event = {
+                "type": "reactions",
+                "blog": blog_id,
+                "comment": comment_id,
+                "deltas": counts,
+            }
+            publish(blog_topic(blog_id), event, using=using)
+
+
+def _token(scope):
+    # Tokens in the query string would end up in access logs and proxies.
+    auth = dict(scope["headers"]).get(b"authorization", b"").split()
+    if len(auth) == 2 and auth[0].lower() == b"token":
+        return auth[1].decode("latin-1")
+    return None
+
+
+async def _authorize(scope, blog_id):
+    if scope["method"] != "GET":
+        raise exceptions.MethodNotAllowed(scope["method"])
+    key = _token(scope)
+    if not key:
+        raise exceptions.NotAuthenticated()
+    await authenticate_token(key)
+    if not await Blog.objects.filter(pk=blog_id, is_hidden=False).aexists():
+        raise exceptions.NotFound()
+
+
+async def blog_events(scope, receive, send, blog_id):
+    """ASGI app streaming the events of one blog; see ``config.asgi``."""
+    async with ThreadSensitiveContext():
+        try:
+            await _authorize(scope, blog_id)
+        except exceptions.APIException as exc:
+            await send_error(send, exc.status_code, str(exc.detail))
+            return
+        finally:
+            # The stream may stay open for hours; don't hold a connection.
+            await sync_to_async(connections.close_all)()
+    await stream(receive, send, blog_topic(blog_id))
@@ -0,0 +1,147 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIRequestFactory, APITestCase, force_authenticate
+
+from accounts.factories import CustomUserFactory
+from blogs.archive import archive_comments, archived_comment
+from blogs.factories import (
+    BlogFactory,
+    CategoryFactory,
+    CommentFactory,
+    ReactionFactory,
+    ReplyFactory,
+    TagFactory,
+)
+from blogs.models import ArchivedComment, ChangeLog, Comment, Reaction, Reply
+from blogs.serializers import CommentForUserSerializer
+from blogs.views import CommentViewSet
+
+
+class ArchiveTestCase(APITestCase):
+    def setUp(self):
+        self.users = CustomUserFactory.create_batch(2)
+        token = Token.objects.create(user=self.users[0])
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token}")
+        category = CategoryFactory.create()
+        self.stale_blog = BlogFactory.create(author=self.users[0], category=category)
+        self.active_blog = BlogFactory.create(author=self.users[0], category=category)
+        self.old_comments = CommentFactory.create_batch(
+            3, author=self.users[1], blog=self.stale_blog
+        )
+        self.active_comment = CommentFactory.create(
+            author=self.users[1], blog=self.active_blog
+        )
+        self.recent_comment = CommentFactory.create(
+            author=self.users[1], blog=self.active_blog
+        )
+        self.reply = ReplyFactory.create(
+            author=self.users[0], comment=self.old_comments[0]
+        )
+        ReactionFactory.create(
+            author=self.users[0],
+            blog=None,
+            comment=self.old_comments[0],
+            reaction_type="Love",
+        )
+        TagFactory.create().comments.add(self.old_comments[0])
+
+        two_years_ago = timezone.now() - timedelta(days=730)
+        Comment.objects.exclude(pk=self.recent_comment.pk).update(
+            created_at=two_years_ago
+        )
+        Reply.objects.update(created_at=two_years_ago)
+
+    def test_only_inactive_blogs_are_archived(self):
+        comments, replies, reactions, raw, archived = archive_comments(
+            days=365, batch_size=2
+        )
+        self.assertEqual((comments, replies, reactions), (3, 1, 1))
+        self.assertGreater(raw, 0)
+        self.assertGreater(archived, 0)
+        self.assertFalse(Comment.objects.filter(blog=self.stale_blog).exists())
+        self.assertFalse(Reply.objects.exists())
+        self.assertFalse(Reaction.objects.exists())
+        self.assertEqual(Comment.objects.filter(blog=self.active_blog).count(), 2)
+        self.assertEqual(
+            sorted(ArchivedComment.objects.values_list("id", flat=True)),
+            [comment.pk for comment in self.old_comments],
+        )
+        self.assertEqual(archive_comments(days=365), (0, 0, 0, 0, 0))
+
+    @mock.patch("blogs.streams.publish")
+    def test_archiving_is_not_logged_or_streamed(self, publish):
+        ChangeLog.objects.all().delete()
+        with self.captureOnCommitCallbacks(execute=True):
+            archive_comments(days=365)
+        self.assertFalse(ChangeLog.objects.exists())
+        publish.assert_not_called()
+
+    def test_payload_keeps_replies_reactions_and_tags(self):
+        archive_comments(days=365)
+        data = ArchivedComment.objects.get(pk=self.old_comments[0].pk).unpack()
+        self.assertEqual(data["text"], self.old_comments[0].text)
+        self.assertEqual(
+            [(reply["id"], reply["text"]) for reply in data["replies"]],
+            [(self.reply.pk, self.reply.text)],
+        )
+        self.assertEqual(data["reactions"][0]["reaction_type"], "Love")
+        self.assertEqual(len(data["tags"]), 1)
+
+    def test_archived_comment_is_retrieved(self):
+        url = reverse("comment-detail", args=[self.old_comments[0].pk])
+        expected = self.client.get(url).json()
+        archive_comments(days=365)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), expected)
+        self.assertEqual(response.json()["reaction_summary"]["Love"], 1)
+        async_url = reverse("async-comment-detail", args=[self.old_comments[0].pk])
+        self.assertEqual(self.client.get(async_url).json(), expected)
+
+    def test_archived_comment_is_filtered_like_live_ones(self):
+        url = reverse("comment-detail", args=[self.old_comments[0].pk])
+        archive_comments(days=365)
+        response = self.client.get(url, {"until": "2020-01-01T00:00:00Z"})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        request = APIRequestFactory().get(url)
+        force_authenticate(request, user=self.users[0])
+        view = CommentViewSet.as_view({"get": "retrieve"})
+        response = view(request, pk=self.old_comments[0].pk, username="nobody")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = view(
+            request, pk=self.old_comments[0].pk, username=self.users[1].username
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["text"], self.old_comments[0].text)
+
+    def test_archived_replies_and_reactions_are_rendered(self):
+        ReactionFactory.create(
+            author=self.users[1],
+            blog=self.active_blog,
+            comment=self.old_comments[0],
+            reaction_type="Haha",
+        )
+        comment = Comment.objects.get(pk=self.old_comments[0].pk)
+        expected = CommentForUserSerializer(comment).data
+        archive_comments(days=365)
+        archived, _ = archived_comment(comment.pk)
+        data = CommentForUserSerializer(archived).data
+        self.assertEqual(len(data["replies"]), 1)
+        self.assertEqual(len(data["reactions"]), 2)
+        self.assertEqual(data, expected)
+
+    def test_missing_comment_is_not_found(self):
+        response = self.client.get(reverse("comment-detail", args=[0]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_command_reports_sizes(self):
+        out = StringIO()
+        call_command("archive_comments", "--days", "365", stdout=out)
+        self.assertIn("Archived 3 comments, 1 replies and 1 reactions", out.getvalue())
@@ -0,0 +1,110 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient, APITestCase
+
+from accounts.factories import CustomUserFactory
+from blogs.factories import (
+    BlogFactory,
+    CategoryFactory,
+    CommentFactory,
+    ReactionFactory,
+)
+
+
+def sort_blogs(data):
+    # The sync category views nest blogs in no particular order.
+    items = data.get("results", [data]) if isinstance(data, dict) else data
+    for item in items:
+        if "blogs" in item:
+            item["blogs"].sort(key=lambda blog: blog["id"])
+    return data
+
+
+class AsyncViewsTest(APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = CustomUserFactory.create(is_staff=True)
+        self.token = Token.objects.create(user=self.admin)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token}")
+
+        self.category = CategoryFactory.create()
+        self.blogs = BlogFactory.create_batch(
+            12, category=self.category, author=self.admin
+        )
+        self.comments = CommentFactory.create_batch(
+            3, blog=self.blogs[0], author=self.admin
+        )
+        ReactionFactory.create(blog=self.blogs[0], comment=None, author=self.admin)
+        ReactionFactory.create(
+            blog=self.blogs[0], comment=self.comments[0], author=self.admin
+        )
+
+    def assertSameResponse(self, sync_name, async_name, **kwargs):
+        expected = self.client.get(reverse(sync_name, kwargs=kwargs))
+        response = self.client.get(reverse(async_name, kwargs=kwargs))
+        self.assertEqual(response.status_code, expected.status_code)
+        data, expected_data = response.json(), expected.json()
+        if isinstance(data, dict) and "results" in data:
+            # Page links point at the async URL; only the page itself must match.
+            for key in ("next", "previous"):
+                del data[key], expected_data[key]
+        self.assertEqual(sort_blogs(data), sort_blogs(expected_data))
+
+    def test_blog_list_matches_sync_view(self):
+        self.assertSameResponse("blog-list", "async-blog-list")
+
+    def test_blog_detail_matches_sync_view(self):
+        self.assertSameResponse("blog-detail", "async-blog-detail", pk=self.blogs[0].pk)
+
+    def test_comment_list_matches_sync_view(self):
+        self.assertSameResponse("comment-list", "async-comment-list")
+
+    def test_comment_detail_matches_sync_view(self):
+        self.assertSameResponse(
+            "comment-detail", "async-comment-detail", pk=self.comments[0].pk
+        )
+
+    def test_category_list_matches_sync_view(self):
+        CategoryFactory.create_batch(6)
+        self.assertSameResponse("category-list", "async-category-list")
+
+    def test_category_detail_matches_sync_view(self):
+        self.assertSameResponse(
+            "category-detail", "async-category-detail", pk=self.category.pk
+        )
+
+    def test_blog_list_is_paginated(self):
+        response = self.client.get(reverse("async-blog-list"), {"page": 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.json()
+        self.assertEqual(data["count"], 12)
+        self.assertEqual(len(data["results"]), 2)
+        self.assertIsNotNone(data["previous"])
+        response = self.client.get(reverse("async-blog-list"), {"page": 99})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_requires_authentication(self):
+        self.client.credentials()
+        response = self.client.get(reverse("async-blog-list"))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.client.credentials(HTTP_AUTHORIZATION="Token invalid")
+        response = self.client.get(reverse("async-comment-list"))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_token_lookups_are_cached(self):
+        self.client.get(reverse("async-blog-list"))
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("async-blog-list"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(any("authtoken_token" in query["sql"] for query in queries))
+
+    def test_missing_object_returns_not_found(self):
+        response = self.client.get(reverse("async-blog-detail", kwargs={"pk": 0}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_only_get_is_allowed(self):
+        response = self.client.post(reverse("async-category-list"), {})
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
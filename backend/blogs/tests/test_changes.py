@@ -0,0 +1,89 @@
+from django.db import transaction
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase, APIClient
+
+from accounts.factories import CustomUserFactory
+from blogs.factories import CategoryFactory, BlogFactory, CommentFactory
+from blogs.changes import sequence_changes
+from blogs.models import ChangeLog
+
+
+class ChangeFeedViewTestCase(APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = CustomUserFactory.create()
+        self.user_token = Token.objects.create(user=self.user)
+        self.category = CategoryFactory.create()
+        self.url = reverse("changes")
+
+    def test_changes_are_logged(self):
+        blog = BlogFactory.create(category=self.category, author=self.user)
+        comment = CommentFactory.create(blog=blog, author=self.user)
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.user_token}")
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data["results"]
+        self.assertEqual(
+            [(r["model"], r["id"], r["action"]) for r in results],
+            [("blog", blog.pk, "created"), ("comment", comment.pk, "created")],
+        )
+        self.assertEqual(results[0]["data"]["title"], blog.title)
+        self.assertEqual(response.data["cursor"], results[-1]["seq"])
+        self.assertFalse(response.data["has_more"])
+
+    def test_changes_since_cursor_with_tombstones(self):
+        blog = BlogFactory.create(category=self.category, author=self.user)
+        comment = CommentFactory.create(blog=blog, author=self.user)
+        sequence_changes()
+        cursor = ChangeLog.objects.latest("seq").seq
+        comment_pk = comment.pk
+
+        comment.text = "Edited"
+        comment.save()
+        comment.delete()
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.user_token}")
+        response = self.client.get(self.url, {"since": cursor})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 1)
+        tombstone = response.data["results"][0]
+        self.assertEqual(tombstone["id"], comment_pk)
+        self.assertEqual(tombstone["action"], "deleted")
+        self.assertIsNone(tombstone["data"])
+
+    def test_changes_pagination(self):
+        BlogFactory.create_batch(3, category=self.category, author=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.user_token}")
+        response = self.client.get(self.url, {"limit": 2})
+        self.assertEqual(len(response.data["results"]), 2)
+        self.assertTrue(response.data["has_more"])
+        response = self.client.get(
+            self.url, {"since": response.data["cursor"], "limit": 2}
+        )
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertFalse(response.data["has_more"])
+
+    def test_changes_not_logged_on_rollback(self):
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            BlogFactory.create(category=self.category, author=self.user)
+            raise RuntimeError
+        self.assertFalse(ChangeLog.objects.exists())
+
+    def test_changes_are_sequenced_once(self):
+        BlogFactory.create(category=self.category, author=self.user)
+        self.assertIsNone(ChangeLog.objects.get().seq)
+        sequence_changes()
+        first = ChangeLog.objects.get().seq
+        BlogFactory.create(category=self.category, author=self.user)
+        sequence_changes()
+        self.assertEqual(
+            list(ChangeLog.objects.order_by("pk").values_list("seq", flat=True)),
+            [first, first + 1],
+        )
+
+    def test_changes_requires_authentication(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
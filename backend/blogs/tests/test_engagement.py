@@ -0,0 +1,119 @@
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase, APIClient
+
+from accounts.factories import CustomUserFactory
+from blogs.factories import CategoryFactory, BlogFactory, CommentFactory
+from blogs.models import Like, Reaction, PendingEngagement
+
+
+@override_settings(BLOGS_BUFFERED_ENGAGEMENT=True)
+class BufferedEngagementTestCase(APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.author = CustomUserFactory.create()
+        self.user = CustomUserFactory.create()
+        self.user_token = Token.objects.create(user=self.user)
+        self.category = CategoryFactory.create()
+        self.blog = BlogFactory.create(category=self.category, author=self.author)
+        self.comment = CommentFactory.create(blog=self.blog, author=self.author)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.user_token}")
+
+    def test_like_is_queued_and_flushed_in_batch(self):
+        response = self.client.post(reverse("like-list"), {"blog": self.blog.pk})
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertFalse(Like.objects.exists())
+        self.assertEqual(PendingEngagement.objects.count(), 1)
+
+        call_command("flush_engagement", "--once", stdout=open("/dev/null", "w"))
+
+        self.assertFalse(PendingEngagement.objects.exists())
+        self.assertTrue(Like.objects.filter(author=self.user, blog=self.blog).exists())
+        self.blog.refresh_from_db()
+        self.assertEqual(self.blog.likes_count, 1)
+
+    def test_reaction_is_queued(self):
+        data = {
+            "blog": self.blog.pk,
+            "comment": self.comment.pk,
+            "reaction_type": "Love",
+        }
+        response = self.client.post(reverse("reaction-list"), data)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertTrue(response.data["pending"])
+        self.assertFalse(Reaction.objects.exists())
+
+    def test_reads_see_own_queued_writes(self):
+        self.client.post(reverse("like-list"), {"blog": self.blog.pk})
+        response = self.client.get(reverse("like-list"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([like["blog"] for like in response.data], [self.blog.pk])
+        self.assertFalse(PendingEngagement.objects.exists())
+
+    def test_async_reads_see_own_queued_writes(self):
+        self.client.post(reverse("like-list"), {"blog": self.blog.pk})
+        response = self.client.get(
+            reverse("async-blog-detail", kwargs={"pk": self.blog.pk})
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["likes_count"], 1)
+        self.assertFalse(PendingEngagement.objects.exists())
+
+    def test_reads_without_queued_writes_do_not_flush(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("like-list"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(any("FOR UPDATE" in query["sql"] for query in queries))
+
+    def test_queued_write_for_deleted_blog_is_dropped(self):
+        self.client.post(reverse("like-list"), {"blog": self.blog.pk})
+        self.blog.delete()
+        call_command("flush_engagement", "--once", stdout=open("/dev/null", "w"))
+        self.assertFalse(PendingEngagement.objects.exists())
+        self.assertFalse(Like.objects.exists())
+
+
+class LikesCountTestCase(APITestCase):
+    def setUp(self):
+        self.author = CustomUserFactory.create()
+        self.category = CategoryFactory.create()
+        self.blog = BlogFactory.create(category=self.category, author=self.author)
+        self.other_blog = BlogFactory.create(category=self.category, author=self.author)
+
+    def test_likes_count_follows_likes(self):
+        like = Like.objects.create(author=self.author, blog=self.blog)
+        self.blog.refresh_from_db()
+        self.assertEqual(self.blog.likes_count, 1)
+
+        like.blog = self.other_blog
+        like.save()
+        self.blog.refresh_from_db()
+        self.other_blog.refresh_from_db()
+        self.assertEqual((self.blog.likes_count, self.other_blog.likes_count), (0, 1))
+
+        like.delete()
+        self.other_blog.refresh_from_db()
+        self.assertEqual(self.other_blog.likes_count, 0)
+
+    def test_saving_blog_keeps_likes_count(self):
+        stale = type(self.blog).objects.get(pk=self.blog.pk)
+        Like.objects.create(author=self.author, blog=self.blog)
+        stale.title = "Renamed"
+        stale.save()
+        self.blog.refresh_from_db()
+        self.assertEqual(self.blog.likes_count, 1)
+
+    def test_dedupe_keeps_detached_reactions(self):
+        Reaction.objects.bulk_create(
+            [
+                Reaction(author=self.author, blog=None, comment=None, reaction_type=t)
+                for t in ["Love", "Like"]
+            ]
+        )
+        call_command("dedupe_engagement", stdout=open("/dev/null", "w"))
+        self.assertEqual(Reaction.objects.count(), 2)
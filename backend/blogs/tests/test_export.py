@@ -0,0 +1,96 @@
+import csv
+import gzip
+import io
+import json
+import os
+import tempfile
+from datetime import timedelta
+
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase, APIClient
+
+from accounts.factories import CustomUserFactory
+from accounts.models import CustomUser
+from blogs.factories import CategoryFactory, BlogFactory, CommentFactory
+from blogs.models import Blog, Comment
+
+
+class ExportViewTestCase(APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = CustomUser.objects.create_superuser(
+            username="admin", password="admin"
+        )
+        self.user = CustomUserFactory.create()
+        self.admin_token = Token.objects.create(user=self.admin)
+        self.user_token = Token.objects.create(user=self.user)
+
+        self.category = CategoryFactory.create()
+        self.blog = BlogFactory.create(category=self.category, author=self.user)
+        self.comments = CommentFactory.create_batch(5, blog=self.blog, author=self.user)
+
+        self.url = reverse("export", kwargs={"resource": "comment"})
+
+    def test_export_ndjson(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.admin_token}")
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        rows = [
+            json.loads(line)
+            for line in b"".join(response.streaming_content).decode().splitlines()
+        ]
+        self.assertEqual([row["id"] for row in rows], [c.pk for c in self.comments])
+        self.assertEqual(rows[0]["blog_id"], self.blog.pk)
+
+    def test_export_csv_gzip(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.admin_token}")
+        response = self.client.get(
+            self.url, {"output": "csv"}, HTTP_ACCEPT_ENCODING="gzip, deflate"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        content = gzip.decompress(b"".join(response.streaming_content)).decode()
+        rows = list(csv.DictReader(io.StringIO(content)))
+        self.assertEqual(len(rows), len(self.comments))
+        self.assertEqual(rows[0]["text"], self.comments[0].text)
+
+    def test_export_since(self):
+        Comment.objects.filter(pk=self.comments[0].pk).update(
+            updated_at=timezone.now() - timedelta(days=30)
+        )
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.admin_token}")
+        since = (timezone.now() - timedelta(days=1)).isoformat()
+        response = self.client.get(self.url, {"since": since})
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), len(self.comments) - 1)
+
+    def test_export_skips_hidden_blogs(self):
+        Blog.objects.filter(pk=self.blog.pk).update(is_hidden=True)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.admin_token}")
+        response = self.client.get(self.url)
+        self.assertEqual(b"".join(response.streaming_content), b"")
+
+    def test_export_unknown_resource(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.admin_token}")
+        response = self.client.get(reverse("export", kwargs={"resource": "user"}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_export_requires_permission(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.user_token}")
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_export_command(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "blog.csv.gz")
+            call_command(
+                "export_data", "blog", "--output", "csv", "--gzip", "--file", path
+            )
+            with gzip.open(path, "rt") as export:
+                rows = list(csv.DictReader(export))
+        self.assertEqual([row["title"] for row in rows], [self.blog.title])
@@ -0,0 +1,72 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+
+from accounts.factories import CustomUserFactory
+from blogs.factories import (
+    BlogFactory,
+    CategoryFactory,
+    CommentFactory,
+    ReplyFactory,
+)
+from blogs.index_advisor import advise, shape
+from blogs.models import Comment, Reply
+
+
+class IndexAdvisorTestCase(TestCase):
+    def setUp(self):
+        self.user = CustomUserFactory.create()
+        self.category = CategoryFactory.create()
+        self.blog = BlogFactory.create(author=self.user, category=self.category)
+        self.comments = CommentFactory.create_batch(3, author=self.user, blog=self.blog)
+        ReplyFactory.create_batch(3, author=self.user, comment=self.comments[0])
+        # Fire deferred foreign key checks; CREATE INDEX refuses to run while
+        # they are pending.
+        connection.check_constraints()
+
+    def test_shape_ignores_literals(self):
+        self.assertEqual(
+            shape("SELECT * FROM t WHERE id IN (1, 22) AND name = 'a''b'"),
+            "SELECT * FROM t WHERE id IN (...) AND name = ?",
+        )
+
+    def test_sequential_scan_filter_becomes_candidate(self):
+        first = Reply.objects.filter(text="first").query.sql_with_params()
+        second = Reply.objects.filter(text="second").query.sql_with_params()
+        candidates = advise([first, second], min_rows=0, build=True)
+
+        candidate = next(c for c in candidates if c["model"] is Reply)
+        self.assertEqual(candidate["fields"], ["text"])
+        self.assertEqual(candidate["name"], "reply_text_idx")
+        self.assertEqual(len(candidate["queries"]), 1)
+        self.assertIsNotNone(candidate["cost_with_index"])
+
+    def test_sort_columns_follow_filter_columns(self):
+        query = (
+            Comment.objects.filter(author=self.user)
+            .order_by("-updated_at")
+            .query.sql_with_params()
+        )
+        candidates = advise([query], min_rows=0)
+        candidate = next(c for c in candidates if c["model"] is Comment)
+        self.assertEqual(candidate["fields"], ["author", "updated_at"])
+        self.assertIsNone(candidate["cost_with_index"])
+
+    def test_small_tables_are_skipped(self):
+        query = Reply.objects.filter(text="first").query.sql_with_params()
+        self.assertEqual(advise([query], min_rows=10**9), [])
+
+    def test_command_captures_api_queries(self):
+        out = StringIO()
+        call_command(
+            "advise_indexes",
+            url=["/api/comment/"],
+            user=self.user.username,
+            host="testserver",
+            min_rows=0,
+            stdout=out,
+            stderr=StringIO(),
+        )
+        self.assertTrue(out.getvalue())
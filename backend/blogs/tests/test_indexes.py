@@ -0,0 +1,56 @@
+from django.db import connection
+from django.db.models import Count
+from django.test import TestCase
+
+from accounts.factories import CustomUserFactory
+from blogs.factories import BlogFactory, CategoryFactory, CommentFactory
+from blogs.models import Blog, Comment, Reaction
+
+
+class IndexUsageTestCase(TestCase):
+    def setUp(self):
+        self.author = CustomUserFactory.create()
+        self.category = CategoryFactory.create()
+        self.blog = BlogFactory.create(author=self.author, category=self.category)
+        self.comment = CommentFactory.create(author=self.author, blog=self.blog)
+
+    def assertUsesIndex(self, queryset, index_name):
+        # The test tables are tiny, so a sequential scan would always win.
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+        plan = queryset.explain()
+        self.assertIn(index_name, plan)
+
+    def test_blog_slug_lookup(self):
+        queryset = Blog.objects.filter(slug=self.blog.slug)
+        self.assertUsesIndex(queryset, "unique_blog_slug")
+
+    def test_blog_slug_prefix_scan(self):
+        queryset = Blog.objects.filter(slug__regex=rf"^{self.blog.slug}(-\d+)?$")
+        self.assertUsesIndex(queryset, "unique_blog_slug")
+
+    def test_public_blogs_by_posted_at(self):
+        queryset = Blog.objects.filter(is_public=True).order_by("-posted_at")[:10]
+        self.assertUsesIndex(queryset, "blog_public_recent_idx")
+
+    def test_blog_comments_by_created_at(self):
+        queryset = Comment.objects.filter(blog=self.blog).order_by("created_at")
+        self.assertUsesIndex(queryset, "comment_blog_created_idx")
+
+    def test_blog_reaction_summary(self):
+        queryset = (
+            Reaction.objects.filter(blog__in=[self.blog.pk])
+            .order_by()
+            .values_list("blog_id", "reaction_type")
+            .annotate(count=Count("id"))
+        )
+        self.assertUsesIndex(queryset, "reaction_blog_type_idx")
+
+    def test_comment_reaction_summary(self):
+        queryset = (
+            Reaction.objects.filter(comment__in=[self.comment.pk])
+            .order_by()
+            .values_list("comment_id", "reaction_type")
+            .annotate(count=Count("id"))
+        )
+        self.assertUsesIndex(queryset, "reaction_comment_type_idx")
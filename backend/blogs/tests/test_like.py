@@ -5,6 +5,7 @@ from rest_framework.test import APIClient, APITestCase
 
 from accounts.factories import CustomUserFactory
 from blogs.factories import LikeFactory, BlogFactory, CategoryFactory
+from blogs.models import Like
 from blogs.serializers import LikeSerializer
 
 
@@ -32,10 +33,10 @@ class LikeViewSetTestCase(APITestCase):
         self.category = CategoryFactory.create()
         self.blog = BlogFactory.create(category=self.category, author=self.author)
         self.blog1 = BlogFactory.create(category=self.category, author=self.author)
-        self.likes = LikeFactory.create_batch(10, blog=self.blog, author=self.author)
-        self.like = self.likes[0]
-        self.like.author = self.author
-        self.like.save()
+        self.likes = [
+            LikeFactory.create(blog=self.blog, author=user) for user in self.users
+        ]
+        self.like = self.likes[1]
 
         # create urls
         self.url = reverse("like-list")
@@ -92,6 +93,16 @@ class LikeViewSetTestCase(APITestCase):
         self.assertEqual(response.data["blog"], self.blog.pk)
         self.assertEqual(response.data["author"], self.user.pk)
 
+    def test_create_like_twice_keeps_one_like(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.author_token}")
+        response = self.client.post(self.url, {"blog": self.blog.pk})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            Like.objects.filter(author=self.author, blog=self.blog).count(), 1
+        )
+        self.blog.refresh_from_db()
+        self.assertEqual(self.blog.likes_count, len(self.likes))
+
     def test_create_like_requires_authentication(self):
         data = {
             "blog": self.blog.pk
@@ -166,3 +177,32 @@ class LikeViewSetTestCase(APITestCase):
     def test_delete_like_requires_authentication(self):
         response = self.client.delete(self.retrieve_url)
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_bulk_like_and_unlike(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.user_token}")
+        url = f"{self.url}bulk/"
+        blog2 = BlogFactory.create(category=self.category, author=self.author)
+        data = {"blogs": [self.blog.pk, self.blog1.pk, blog2.pk, 999999]}
+        with self.assertNumQueries(7):
+            response = self.client.post(url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item["status"] for item in response.data],
+            ["exists", "created", "created", "not_found"],
+        )
+        self.assertEqual(Like.objects.filter(author=self.user).count(), 3)
+
+        response = self.client.delete(
+            url, {"blogs": [self.blog1.pk, 999999]}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item["status"] for item in response.data], ["deleted", "not_found"]
+        )
+        self.assertEqual(Like.objects.filter(author=self.user).count(), 2)
+
+    def test_bulk_like_requires_authentication(self):
+        response = self.client.post(
+            f"{self.url}bulk/", {"blogs": [self.blog.pk]}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
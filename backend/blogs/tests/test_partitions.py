@@ -0,0 +1,209 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+from accounts.factories import CustomUserFactory
+from blogs.engagement import insert_likes, upsert_reactions
+from blogs.factories import (
+    BlogFactory,
+    CategoryFactory,
+    CommentFactory,
+    LikeFactory,
+    ReactionFactory,
+)
+from blogs.models import Blog, Comment, Like, Reaction
+from blogs.partitions import (
+    add_months,
+    convert,
+    current_month,
+    detach_partitions,
+    ensure_partitions,
+    partition_name,
+)
+from blogs.stats import refresh_stats
+
+TABLES = ["blogs_like", "blogs_reaction", "blogs_comment"]
+
+
+@override_settings(BLOGS_PARTITIONED_TABLES=TABLES)
+class PartitionTestCase(APITestCase):
+    def setUp(self):
+        self.users = CustomUserFactory.create_batch(3)
+        token = Token.objects.create(user=self.users[0])
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token}")
+        category = CategoryFactory.create()
+        self.blog = BlogFactory.create(author=self.users[0], category=category)
+        self.comment = CommentFactory.create(author=self.users[1], blog=self.blog)
+        self.old_like = LikeFactory.create(author=self.users[1], blog=self.blog)
+        self.like = LikeFactory.create(author=self.users[2], blog=self.blog)
+        self.reaction = ReactionFactory.create(
+            author=self.users[1], blog=self.blog, comment=None, reaction_type="Like"
+        )
+        Like.objects.filter(pk=self.old_like.pk).update(
+            created_at=timezone.now() - timedelta(days=100)
+        )
+        self.old_month = (timezone.now() - timedelta(days=100)).date().replace(day=1)
+
+    def convert_all(self):
+        for table in TABLES:
+            self.assertTrue(convert(table))
+
+    def partition_of(self, model, pk):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT tableoid::regclass::text FROM {model._meta.db_table} "
+                "WHERE id = %s",
+                [pk],
+            )
+            return cursor.fetchone()[0]
+
+    def test_convert_keeps_rows_and_ids(self):
+        likes = list(Like.objects.order_by("id").values_list("id", "created_at"))
+        self.convert_all()
+        self.assertFalse(convert("blogs_like"))
+        self.assertEqual(
+            list(Like.objects.order_by("id").values_list("id", "created_at")), likes
+        )
+        self.assertEqual(Comment.objects.get().pk, self.comment.pk)
+        self.assertEqual(
+            self.partition_of(Like, self.old_like.pk),
+            partition_name("blogs_like", self.old_month),
+        )
+        self.assertEqual(
+            self.partition_of(Like, self.like.pk),
+            partition_name("blogs_like", current_month()),
+        )
+
+    def test_new_rows_continue_ids(self):
+        self.convert_all()
+        (like_id, _, _), *_ = insert_likes([(self.users[0].pk, self.blog.pk)])
+        self.assertGreater(like_id, self.like.pk)
+        comment = CommentFactory.create(author=self.users[0], blog=self.blog)
+        self.assertGreater(comment.pk, self.comment.pk)
+
+    def test_likes_stay_unique(self):
+        self.convert_all()
+        likes_count = Blog.objects.get(pk=self.blog.pk).likes_count
+        pairs = [(self.users[0].pk, self.blog.pk)] * 2
+        self.assertEqual(len(insert_likes(pairs)), 1)
+        self.assertEqual(insert_likes(pairs), [])
+        self.assertEqual(insert_likes([(self.users[1].pk, self.blog.pk)]), [])
+        self.assertEqual(Like.objects.filter(blog=self.blog).count(), 3)
+        self.blog.refresh_from_db()
+        self.assertEqual(self.blog.likes_count, likes_count + 1)
+
+    def test_duplicates_are_checked_before_converting(self):
+        self.assertEqual(insert_likes([(self.users[1].pk, self.blog.pk)]), [])
+
+    def test_reactions_are_upserted(self):
+        self.convert_all()
+        results = upsert_reactions(
+            [
+                (self.users[1].pk, self.blog.pk, None, "Love"),
+                (self.users[2].pk, self.blog.pk, self.comment.pk, "Haha"),
+            ]
+        )
+        self.assertEqual(
+            results[(self.users[1].pk, self.blog.pk, None)],
+            (self.reaction.pk, False),
+        )
+        self.assertTrue(results[(self.users[2].pk, self.blog.pk, self.comment.pk)][1])
+        self.reaction.refresh_from_db()
+        self.assertEqual(self.reaction.reaction_type, "Love")
+        self.assertEqual(Reaction.objects.count(), 2)
+
+    def test_views_on_converted_tables_are_kept(self):
+        self.convert_all()
+        refresh_stats()
+
+    def test_time_range_prunes_partitions(self):
+        self.convert_all()
+        queryset = Like.objects.filter(created_at__gte=timezone.now() - timedelta(1))
+        plan = queryset.explain()
+        self.assertIn(partition_name("blogs_like", current_month()), plan)
+        self.assertNotIn(partition_name("blogs_like", self.old_month), plan)
+
+    def test_ensure_and_detach_partitions(self):
+        self.convert_all()
+        self.assertEqual(ensure_partitions("blogs_like", months_ahead=3), [])
+        self.assertEqual(
+            ensure_partitions("blogs_like", months_ahead=4),
+            [partition_name("blogs_like", add_months(current_month(), 4))],
+        )
+        likes_count = Blog.objects.get(pk=self.blog.pk).likes_count
+        detached = detach_partitions("blogs_like", keep_months=1)
+        self.assertEqual(detached[0], partition_name("blogs_like", self.old_month))
+        self.assertNotIn(partition_name("blogs_like", current_month()), detached)
+        self.assertFalse(Like.objects.filter(pk=self.old_like.pk).exists())
+        # Liking again after the old like is detached counts once.
+        self.assertEqual(Blog.objects.get(pk=self.blog.pk).likes_count, likes_count - 1)
+        self.assertEqual(len(insert_likes([(self.users[1].pk, self.blog.pk)])), 1)
+        self.assertEqual(Blog.objects.get(pk=self.blog.pk).likes_count, likes_count)
+
+    def test_targets_of_detached_rows_can_be_deleted(self):
+        self.convert_all()
+        ReactionFactory.create(author=self.users[2], blog=self.blog, comment=None)
+        Reaction.objects.update(given_at=timezone.now() - timedelta(days=100))
+        detach_partitions("blogs_like", keep_months=1)
+        detach_partitions("blogs_reaction", keep_months=1)
+        Blog.objects.get(pk=self.blog.pk).delete()
+        self.users[1].delete()
+        self.assertFalse(Blog.objects.filter(pk=self.blog.pk).exists())
+
+    def test_comment_partitions_are_not_detached(self):
+        self.convert_all()
+        with self.assertRaisesMessage(ValueError, "blogs_comment"):
+            detach_partitions("blogs_comment", keep_months=1)
+        with self.assertRaisesMessage(CommandError, "use archive_comments"):
+            call_command("partitions", "--keep-months", "1")
+
+    def test_rows_in_the_default_partition_move_to_new_ones(self):
+        self.convert_all()
+        month = add_months(current_month(), 5)
+        Like.objects.filter(pk=self.like.pk).update(
+            created_at=datetime(month.year, month.month, 2, tzinfo=dt_timezone.utc)
+        )
+        self.assertEqual(self.partition_of(Like, self.like.pk), "blogs_like_default")
+        self.assertEqual(
+            ensure_partitions("blogs_like", months_ahead=5)[-1],
+            partition_name("blogs_like", month),
+        )
+        self.assertEqual(
+            self.partition_of(Like, self.like.pk), partition_name("blogs_like", month)
+        )
+        self.assertEqual(Like.objects.count(), 2)
+
+    def test_command(self):
+        out = StringIO()
+        call_command("partitions", "--convert", stdout=out)
+        self.assertIn("Partitioned blogs_like.", out.getvalue())
+        out = StringIO()
+        with override_settings(BLOGS_PARTITIONED_TABLES=["blogs_like"]):
+            call_command("partitions", "--keep-months", "1", stdout=out)
+        self.assertIn(
+            f"Detached {partition_name('blogs_like', self.old_month)}.",
+            out.getvalue(),
+        )
+
+    @override_settings(BLOGS_PARTITIONED_TABLES=["blogs_blog"])
+    def test_command_rejects_other_tables(self):
+        with self.assertRaisesMessage(Exception, "Cannot partition blogs_blog."):
+            call_command("partitions")
+
+    def test_list_filters_on_time_range(self):
+        since = (timezone.now() - timedelta(days=1)).isoformat()
+        response = self.client.get(reverse("like-list"), {"since": since})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([like["author"] for like in response.data], [self.users[2].pk])
+        response = self.client.get(reverse("like-list"), {"until": since})
+        self.assertEqual([like["author"] for like in response.data], [self.users[1].pk])
+        response = self.client.get(reverse("like-list"), {"since": "yesterday"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,208 @@
+import threading
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+from accounts.factories import CustomUserFactory
+from accounts.models import CustomUser
+from blogs.factories import (
+    BlogFactory,
+    CategoryFactory,
+    CommentFactory,
+    LikeFactory,
+    ReactionFactory,
+    ReplyFactory,
+    TagFactory,
+)
+from blogs.models import Blog, Comment, Like, PurgeTask, Reaction, Reply
+from blogs.purges import purge_batch, run_purges, schedule_purge
+from core.jobs import REGISTRY, work
+from core.models import Job
+
+
+class PurgeTestCase(APITestCase):
+    def setUp(self):
+        self.users = CustomUserFactory.create_batch(3)
+        self.token = Token.objects.create(user=self.users[0])
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token}")
+        self.category = CategoryFactory.create()
+        self.blog = BlogFactory.create(author=self.users[0], category=self.category)
+        self.other_blog = BlogFactory.create(
+            author=self.users[1], category=self.category
+        )
+        self.comments = CommentFactory.create_batch(
+            3, author=self.users[1], blog=self.blog
+        )
+        ReplyFactory.create_batch(2, author=self.users[2], comment=self.comments[0])
+        LikeFactory.create(author=self.users[1], blog=self.blog)
+        LikeFactory.create(author=self.users[2], blog=self.blog)
+        LikeFactory.create(author=self.users[0], blog=self.other_blog)
+        ReactionFactory.create(author=self.users[1], blog=self.blog, comment=None)
+        ReactionFactory.create(
+            author=self.users[2], blog=None, comment=self.comments[1]
+        )
+        TagFactory.create().blogs.add(self.blog)
+        self.other_comment = CommentFactory.create(
+            author=self.users[0], blog=self.other_blog
+        )
+
+    def delete_blog(self):
+        url = reverse("blog-detail", args=[self.blog.pk])
+        return self.client.delete(f"{url}?background=true")
+
+    def test_blog_is_hidden_until_purged(self):
+        response = self.delete_blog()
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertIsNone(response.data["finished_at"])
+        self.assertTrue(Blog.objects.filter(pk=self.blog.pk).exists())
+        response = self.client.get(reverse("blog-detail", args=[self.blog.pk]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.get(reverse("blog-list"))
+        self.assertEqual(
+            [blog["id"] for blog in response.data["results"]], [self.other_blog.pk]
+        )
+        response = self.client.get(reverse("category-detail", args=[self.category.pk]))
+        self.assertEqual(
+            [blog["id"] for blog in response.data["blogs"]], [self.other_blog.pk]
+        )
+
+    def test_hidden_blog_rejects_likes_and_comments(self):
+        self.delete_blog()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token}")
+        response = self.client.post(reverse("like-list"), {"blog": self.blog.pk})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.post(
+            reverse("comment-list"), {"blog": self.blog.pk, "text": "Late comment"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.post(
+            f"{reverse('like-list')}bulk/", {"blogs": [self.blog.pk]}, format="json"
+        )
+        self.assertEqual(response.data[0]["status"], "not_found")
+        self.assertEqual(Like.objects.filter(blog=self.blog).count(), 2)
+        self.assertEqual(Comment.objects.filter(blog=self.blog).count(), 3)
+
+    def test_comments_of_hidden_blog_are_not_read(self):
+        self.delete_blog()
+        response = self.client.get(reverse("comment-list"))
+        self.assertEqual(
+            [comment["blog"] for comment in response.data], [self.other_blog.pk]
+        )
+        response = self.client.get(
+            reverse("comment-detail", args=[self.comments[0].pk])
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_blog_is_purged_in_batches(self):
+        TagFactory.create().comments.add(self.comments[0])
+        task_id = self.delete_blog().data["id"]
+        self.assertEqual(run_purges(batch_size=2), 8)
+        self.assertFalse(Blog.objects.filter(pk=self.blog.pk).exists())
+        self.assertFalse(Comment.objects.filter(blog=self.blog).exists())
+        self.assertEqual(Reply.objects.count(), 0)
+        self.assertEqual(Like.objects.count(), 1)
+        self.assertEqual(Reaction.objects.count(), 0)
+        self.assertTrue(Comment.objects.filter(pk=self.other_comment.pk).exists())
+
+        response = self.client.get(reverse("purge-detail", args=[task_id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNotNone(response.data["finished_at"])
+        progress = response.data["progress"]
+        self.assertEqual(progress["blogs.Comment"], 3)
+        self.assertEqual(progress["blogs.Reply"], 2)
+        self.assertEqual(progress["blogs.Like"], 2)
+        self.assertEqual(progress["blogs.Reaction"], 2)
+        self.assertEqual(progress["blogs.Blog"], 1)
+        self.assertEqual(progress["blogs.Tag_blogs"], 1)
+        self.assertEqual(progress["blogs.Tag_comments"], 1)
+
+    def test_purge_resumes_from_its_progress(self):
+        self.delete_blog()
+        purge_batch(batch_size=1)
+        task = PurgeTask.objects.get()
+        self.assertEqual(task.progress, {"blogs.Reaction": 1})
+        run_purges()
+        task.refresh_from_db()
+        self.assertEqual(task.progress["blogs.Reaction"], 2)
+        self.assertIsNotNone(task.finished_at)
+        self.assertIsNone(purge_batch())
+
+    def test_repeated_requests_share_a_task(self):
+        task_id = self.delete_blog().data["id"]
+        self.assertEqual(schedule_purge(self.blog).pk, task_id)
+        self.assertEqual(PurgeTask.objects.count(), 1)
+
+    def test_purge_job_is_queued(self):
+        self.delete_blog()
+        self.assertEqual(Job.objects.get().name, "blogs.run_purges")
+        with self.settings(JOBS_SCHEDULE={name: None for name in REGISTRY}):
+            work(threading.Event(), once=True)
+        self.assertIsNotNone(PurgeTask.objects.get().finished_at)
+        self.assertFalse(Blog.objects.filter(pk=self.blog.pk).exists())
+
+    def test_progress_is_private_to_the_requester(self):
+        task_id = self.delete_blog().data["id"]
+        token = Token.objects.create(user=self.users[1])
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token}")
+        response = self.client.get(reverse("purge-detail", args=[task_id]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_synchronous_delete_is_kept(self):
+        response = self.client.delete(reverse("blog-detail", args=[self.blog.pk]))
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(Blog.objects.filter(pk=self.blog.pk).exists())
+        self.assertFalse(PurgeTask.objects.exists())
+
+    def test_user_is_deactivated_and_purged(self):
+        user = self.users[1]
+        admin = CustomUserFactory.create(is_staff=True)
+        token = Token.objects.create(user=admin)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token}")
+        url = reverse("user-detail", args=[user.pk])
+        response = self.client.delete(f"{url}?background=true")
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        user.refresh_from_db()
+        self.assertFalse(user.is_active)
+        self.assertTrue(Blog.objects.get(pk=self.other_blog.pk).is_hidden)
+
+        out = StringIO()
+        call_command("run_purges", "--once", stdout=out)
+        self.assertIn(f"Finished Purge of user #{user.pk}", out.getvalue())
+        self.assertFalse(CustomUser.objects.filter(pk=user.pk).exists())
+        self.assertFalse(Blog.objects.filter(author=user.pk).exists())
+        self.assertFalse(Like.objects.filter(author=user.pk).exists())
+        # Comments on other blogs stay without their author.
+        self.assertEqual(Comment.objects.filter(blog=self.blog, author=None).count(), 3)
+
+    def test_user_likes_are_uncounted_once_per_batch(self):
+        user = self.users[2]
+        LikeFactory.create(author=user, blog=self.other_blog)
+        own_blog = BlogFactory.create(author=user, category=self.category)
+        LikeFactory.create(author=user, blog=own_blog)
+        counts = dict(Blog.objects.values_list("pk", "likes_count"))
+        schedule_purge(user)
+        purge_batch()
+        self.assertEqual(PurgeTask.objects.get().progress, {"blogs.Reaction": 1})
+        with CaptureQueriesContext(connection) as queries:
+            purge_batch()
+        self.assertEqual(PurgeTask.objects.get().progress["blogs.Like"], 3)
+        counted = [
+            query["sql"]
+            for query in queries
+            if query["sql"].startswith('UPDATE "blogs_blog"')
+        ]
+        self.assertEqual(len(counted), 1)
+        self.assertEqual(
+            dict(Blog.objects.values_list("pk", "likes_count")),
+            {
+                **counts,
+                self.blog.pk: counts[self.blog.pk] - 1,
+                self.other_blog.pk: counts[self.other_blog.pk] - 1,
+            },
+        )
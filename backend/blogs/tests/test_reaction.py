@@ -33,12 +33,13 @@ class ReactionViewSetTestCase(APITestCase):
         self.category = CategoryFactory.create()
         self.blog = BlogFactory.create(category=self.category, author=self.author)
         self.comments = CommentFactory.create_batch(3, blog=self.blog, author=self.user)
-        self.reactions = ReactionFactory.create_batch(
-            10, blog=self.blog, comment=self.comments[0], author=self.author
-        )
+        self.reactions = [
+            ReactionFactory.create(
+                blog=self.blog, comment=self.comments[0], author=user
+            )
+            for user in [self.author, *CustomUserFactory.create_batch(9)]
+        ]
         self.reaction = self.reactions[0]
-        self.reaction.author = self.author
-        self.reaction.save()
 
         # url
         self.url = reverse("reaction-list")
@@ -107,6 +108,22 @@ class ReactionViewSetTestCase(APITestCase):
         serializer = ReactionSerializer(created_reaction, many=False)
         self.assertEqual(response.data, serializer.data)
 
+    def test_create_reaction_twice_updates_reaction_type(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.author_token}")
+        for reaction_type in ["Like", "Love"]:
+            data = {
+                "blog": self.blog.pk,
+                "comment": self.comments[1].pk,
+                "reaction_type": reaction_type,
+            }
+            response = self.client.post(self.url, data)
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        reactions = Reaction.objects.filter(
+            author=self.author, blog=self.blog, comment=self.comments[1]
+        )
+        self.assertEqual(reactions.count(), 1)
+        self.assertEqual(reactions.get().reaction_type, "Love")
+
     def test_create_reaction_requires_authentication(self):
         data = {
             "blog": self.blog.pk,
@@ -195,3 +212,78 @@ class ReactionViewSetTestCase(APITestCase):
     def test_delete_reaction_requires_authentication(self):
         response = self.client.delete(self.retrieve_url)
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_reaction_summary_for_blogs_and_comments(self):
+        blog_reactions = [
+            ReactionFactory.create(blog=self.blog, comment=None, author=user)
+            for user in [self.author, self.user]
+        ]
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.user_token}")
+        response = self.client.get(
+            f"{self.url}summary/",
+            {"blog": [self.blog.pk], "comment": [c.pk for c in self.comments]},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        blog_summary = response.data["blogs"][self.blog.pk]
+        self.assertEqual(sum(blog_summary.values()), len(blog_reactions))
+        for reaction_type in Reaction.ReactionTypes.values:
+            expected = Reaction.objects.filter(
+                blog=self.blog, comment=None, reaction_type=reaction_type
+            ).count()
+            self.assertEqual(blog_summary[reaction_type], expected)
+        self.assertEqual(
+            sum(response.data["comments"][self.comments[0].pk].values()),
+            len(self.reactions),
+        )
+        self.assertEqual(
+            sum(response.data["comments"][self.comments[1].pk].values()), 0
+        )
+
+    def test_reaction_summary_rejects_invalid_ids(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.user_token}")
+        response = self.client.get(f"{self.url}summary/", {"blog": ["abc"]})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_reaction_summary_requires_authentication(self):
+        response = self.client.get(f"{self.url}summary/", {"blog": [self.blog.pk]})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_bulk_create_and_delete_reactions(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.user_token}")
+        url = f"{self.url}bulk/"
+        data = {
+            "reactions": [
+                {
+                    "blog": self.blog.pk,
+                    "comment": self.comments[1].pk,
+                    "reaction_type": "Love",
+                },
+                {"blog": self.blog.pk, "reaction_type": "Haha"},
+                {"blog": self.blog.pk, "comment": 999999, "reaction_type": "SAD"},
+            ]
+        }
+        response = self.client.post(url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item["status"] for item in response.data],
+            ["created", "created", "not_found"],
+        )
+        created_ids = [item["id"] for item in response.data[:2]]
+        self.assertEqual(
+            Reaction.objects.filter(pk__in=created_ids, author=self.user).count(), 2
+        )
+
+        response = self.client.delete(
+            url, {"ids": created_ids + [self.reaction.pk]}, format="json"
+        )
+        self.assertEqual(
+            [item["status"] for item in response.data],
+            ["deleted", "deleted", "not_found"],
+        )
+        self.assertTrue(Reaction.objects.filter(pk=self.reaction.pk).exists())
+
+    def test_bulk_reactions_validates_reaction_type(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.user_token}")
+        data = {"reactions": [{"blog": self.blog.pk, "reaction_type": "Meh"}]}
+        response = self.client.post(f"{self.url}bulk/", data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,91 @@
+import json
+from datetime import datetime, timezone
+
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+from accounts.factories import CustomUserFactory
+from blogs.factories import (
+    BlogFactory,
+    CategoryFactory,
+    CommentFactory,
+    ReactionFactory,
+    ReplyFactory,
+)
+from blogs.models import Blog, Comment, Reaction, Reply
+from blogs.rendering import comments_of_author_json
+
+
+class SqlRenderingTestCase(APITestCase):
+    def setUp(self):
+        self.author = CustomUserFactory.create()
+        self.reader = CustomUserFactory.create()
+        token = Token.objects.create(user=self.author)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token}")
+        self.url = f"{reverse('comment-list')}author/{self.author.username}/"
+
+        category = CategoryFactory.create()
+        blog = BlogFactory.create(author=self.reader, category=category)
+        uncategorized = BlogFactory.create(author=self.reader, category=category)
+        Blog.objects.filter(pk=uncategorized.pk).update(category=None)
+        self.comments = [
+            CommentFactory.create(author=self.author, blog=blog),
+            CommentFactory.create(author=self.author, blog=uncategorized),
+            CommentFactory.create(author=self.reader, blog=blog),
+        ]
+        ReplyFactory.create_batch(2, author=self.reader, comment=self.comments[0])
+        Reply.objects.filter(comment=self.comments[0]).update(
+            updated_at=datetime(2024, 3, 1, 12, 30, tzinfo=timezone.utc)
+        )
+        ReactionFactory.create(author=self.reader, blog=blog, comment=self.comments[0])
+        ReactionFactory.create(author=self.author, blog=None, comment=self.comments[0])
+        ReactionFactory.create(
+            author=self.reader, blog=uncategorized, comment=self.comments[1]
+        )
+        # Whole seconds are rendered without a fraction.
+        Reaction.objects.filter(comment=self.comments[0]).update(
+            given_at=datetime(2024, 3, 2, tzinfo=timezone.utc)
+        )
+
+    def test_matches_serializer_output(self):
+        expected = self.client.get(self.url)
+        with override_settings(BLOGS_SQL_RENDERING=True):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertEqual(
+            sorted(json.loads(response.content), key=lambda c: c["text"]),
+            sorted(json.loads(expected.content), key=lambda c: c["text"]),
+        )
+
+    def test_time_range_matches_serializer_output(self):
+        Comment.objects.filter(pk=self.comments[1].pk).update(
+            created_at=datetime(2024, 1, 1, tzinfo=timezone.utc)
+        )
+        for bounds in [{"since": "2024-02-01T00:00:00Z"}, {"until": "2024-02-01"}]:
+            expected = self.client.get(self.url, bounds)
+            with override_settings(BLOGS_SQL_RENDERING=True):
+                response = self.client.get(self.url, bounds)
+            self.assertEqual(len(json.loads(response.content)), 1)
+            self.assertEqual(json.loads(response.content), json.loads(expected.content))
+        with override_settings(BLOGS_SQL_RENDERING=True):
+            response = self.client.get(self.url, {"since": "yesterday"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_renders_in_one_query(self):
+        with self.assertNumQueries(1):
+            comments = json.loads(comments_of_author_json(self.author.username))
+        self.assertEqual(len(comments), 2)
+        self.assertEqual(len(comments[0]["replies"]), 2)
+        self.assertEqual(len(comments[0]["reactions"]), 2)
+
+    def test_unknown_author_renders_empty_list(self):
+        self.assertEqual(json.loads(comments_of_author_json("nobody")), [])
+
+    def test_disabled_by_default(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsInstance(response.data, list)
@@ -0,0 +1,146 @@
+import threading
+from datetime import timedelta
+
+from django.db import connection, transaction
+
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITransactionTestCase
+
+from accounts.factories import CustomUserFactory
+from blogs.factories import (
+    BlogFactory,
+    CategoryFactory,
+    CommentFactory,
+    LikeFactory,
+    ReactionFactory,
+    ReplyFactory,
+)
+from blogs.models import BlogDailyEngagement, Comment, Like, RollupWatermark
+from blogs.rollups import rollup_engagement
+
+
+# Rows only settle once their transaction has committed, so these tests do not
+# run inside one.
+class RollupTestCase(APITransactionTestCase):
+    def setUp(self):
+        self.users = CustomUserFactory.create_batch(3)
+        token = Token.objects.create(user=self.users[0])
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token}")
+        category = CategoryFactory.create()
+        self.blog = BlogFactory.create(author=self.users[0], category=category)
+        self.other_blog = BlogFactory.create(author=self.users[0], category=category)
+        self.today = timezone.now().date()
+        self.yesterday = self.today - timedelta(days=1)
+
+        comments = CommentFactory.create_batch(2, author=self.users[1], blog=self.blog)
+        Comment.objects.filter(pk=comments[0].pk).update(
+            created_at=timezone.now() - timedelta(days=1)
+        )
+        ReplyFactory.create(author=self.users[2], comment=comments[0])
+        LikeFactory.create(author=self.users[1], blog=self.blog)
+        LikeFactory.create(author=self.users[2], blog=self.blog)
+        LikeFactory.create(author=self.users[1], blog=self.other_blog)
+        ReactionFactory.create(author=self.users[1], blog=self.blog, comment=None)
+        # Counted for the blog of the comment.
+        ReactionFactory.create(author=self.users[2], blog=None, comment=comments[1])
+
+    def rollup(self, blog):
+        return {
+            row.day: (row.likes, row.reactions, row.comments, row.replies)
+            for row in BlogDailyEngagement.objects.filter(blog=blog)
+        }
+
+    def test_folds_every_source_per_blog_and_day(self):
+        self.assertEqual(rollup_engagement(), 8)
+        self.assertEqual(
+            self.rollup(self.blog),
+            {self.yesterday: (0, 0, 1, 0), self.today: (2, 2, 1, 1)},
+        )
+        self.assertEqual(self.rollup(self.other_blog), {self.today: (1, 0, 0, 0)})
+
+    def test_only_new_rows_are_folded(self):
+        rollup_engagement()
+        LikeFactory.create(author=self.users[0], blog=self.blog)
+        self.assertEqual(rollup_engagement(), 1)
+        self.assertEqual(self.rollup(self.blog)[self.today], (3, 2, 1, 1))
+        self.assertEqual(
+            RollupWatermark.objects.get(name="likes").position,
+            Like.objects.latest("id").id,
+        )
+
+    def test_small_batches_catch_up(self):
+        self.assertEqual(rollup_engagement(batch_size=1), 8)
+        self.assertEqual(self.rollup(self.blog)[self.today], (2, 2, 1, 1))
+
+    def test_stops_at_rows_of_open_transactions(self):
+        written = threading.Event()
+        release = threading.Event()
+
+        def write_like():
+            try:
+                with transaction.atomic():
+                    LikeFactory.create(author=self.users[0], blog=self.other_blog)
+                    written.set()
+                    release.wait(10)
+            finally:
+                connection.close()
+
+        writer = threading.Thread(target=write_like)
+        writer.start()
+        try:
+            written.wait(10)
+            # Committed while the first like is still open.
+            LikeFactory.create(author=self.users[0], blog=self.blog)
+            self.assertEqual(rollup_engagement(), 8)
+            self.assertEqual(self.rollup(self.blog)[self.today], (2, 2, 1, 1))
+        finally:
+            release.set()
+            writer.join()
+        self.assertEqual(rollup_engagement(), 2)
+        self.assertEqual(self.rollup(self.blog)[self.today], (3, 2, 1, 1))
+        self.assertEqual(self.rollup(self.other_blog), {self.today: (2, 0, 0, 0)})
+
+    def test_engagement_series(self):
+        rollup_engagement()
+        since = self.today - timedelta(days=2)
+        response = self.client.get(
+            reverse("blog-engagement", args=[self.blog.pk]),
+            {"since": since.isoformat(), "until": self.today.isoformat()},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["blog"], self.blog.pk)
+        self.assertEqual(
+            response.data["series"],
+            [
+                {"day": since, "likes": 0, "reactions": 0, "comments": 0, "replies": 0},
+                {
+                    "day": self.yesterday,
+                    "likes": 0,
+                    "reactions": 0,
+                    "comments": 1,
+                    "replies": 0,
+                },
+                {
+                    "day": self.today,
+                    "likes": 2,
+                    "reactions": 2,
+                    "comments": 1,
+                    "replies": 1,
+                },
+            ],
+        )
+
+    def test_engagement_series_defaults_to_a_year(self):
+        response = self.client.get(reverse("blog-engagement", args=[self.blog.pk]))
+        self.assertEqual(len(response.data["series"]), 365)
+        self.assertEqual(response.data["until"], self.today)
+
+    def test_engagement_series_rejects_bad_ranges(self):
+        url = reverse("blog-engagement", args=[self.blog.pk])
+        response = self.client.get(url, {"since": "2024-02-01", "until": "2024-01-01"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(url, {"since": "2020-01-01", "until": "2024-01-01"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
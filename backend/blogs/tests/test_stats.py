@@ -0,0 +1,154 @@
+from datetime import datetime, timedelta, timezone
+from io import StringIO
+
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+from accounts.factories import CustomUserFactory
+from blogs.archive import archive_comments
+from blogs.factories import (
+    BlogFactory,
+    CategoryFactory,
+    CommentFactory,
+    LikeFactory,
+    ReactionFactory,
+)
+from blogs.models import Blog, CategoryDailyStats, Comment
+from blogs.stats import STATS, read_stats, refresh_stats
+
+
+class StatsTestCase(APITestCase):
+    def setUp(self):
+        self.author = CustomUserFactory.create()
+        self.reader = CustomUserFactory.create()
+        token = Token.objects.create(user=self.reader)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token}")
+
+        self.category = CategoryFactory.create()
+        self.other_category = CategoryFactory.create()
+        self.blog = BlogFactory.create(author=self.author, category=self.category)
+        BlogFactory.create(author=self.author, category=self.other_category)
+        uncategorized = BlogFactory.create(author=self.author, category=self.category)
+        Blog.objects.filter(pk=uncategorized.pk).update(category=None)
+
+        comments = CommentFactory.create_batch(2, author=self.reader, blog=self.blog)
+        self.yesterday = datetime.now(timezone.utc) - timedelta(days=1)
+        Comment.objects.filter(pk=comments[0].pk).update(created_at=self.yesterday)
+        LikeFactory.create(author=self.reader, blog=self.blog)
+        ReactionFactory.create(author=self.reader, blog=self.blog, comment=None)
+        # A reaction to a comment counts towards the comment's blog.
+        ReactionFactory.create(author=self.author, blog=None, comment=comments[1])
+        refresh_stats()
+        self.today = datetime.now(timezone.utc).date()
+
+    def test_category_totals(self):
+        response = self.client.get(reverse("stats", args=["categories"]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data,
+            [
+                {
+                    "category": self.category.pk,
+                    "blogs": 1,
+                    "comments": 2,
+                    "likes": 1,
+                    "reactions": 2,
+                },
+                {
+                    "category": self.other_category.pk,
+                    "blogs": 1,
+                    "comments": 0,
+                    "likes": 0,
+                    "reactions": 0,
+                },
+            ],
+        )
+
+    def test_archived_comments_are_still_counted(self):
+        expected = {kind: read_stats(kind, daily=True) for kind in STATS}
+        self.assertEqual(archive_comments(days=0)[:3], (2, 0, 1))
+        refresh_stats()
+        self.assertEqual(
+            {kind: read_stats(kind, daily=True) for kind in STATS}, expected
+        )
+
+    def test_category_daily_rows(self):
+        response = self.client.get(
+            reverse("stats", args=["categories"]),
+            {"daily": "true", "id": [self.category.pk]},
+        )
+        self.assertEqual(
+            [(row["day"], row["comments"]) for row in response.data],
+            [(self.yesterday.date(), 1), (self.today, 1)],
+        )
+
+    def test_author_totals_within_range(self):
+        response = self.client.get(
+            reverse("stats", args=["authors"]), {"since": self.today.isoformat()}
+        )
+        self.assertEqual(
+            response.data,
+            [
+                {
+                    "author": self.author.pk,
+                    "blogs": 3,
+                    "comments": 0,
+                    "likes": 0,
+                    "reactions": 1,
+                },
+                {
+                    "author": self.reader.pk,
+                    "blogs": 0,
+                    "comments": 1,
+                    "likes": 1,
+                    "reactions": 1,
+                },
+            ],
+        )
+
+    def test_reads_only_refreshed_rows(self):
+        BlogFactory.create(author=self.author, category=self.other_category)
+        response = self.client.get(reverse("stats", args=["categories"]))
+        self.assertEqual(response.data[1]["blogs"], 1)
+        call_command("refresh_stats", "--once", stdout=StringIO())
+        response = self.client.get(reverse("stats", args=["categories"]))
+        self.assertEqual(response.data[1]["blogs"], 2)
+
+    def test_blogs_count_on_their_creation_day(self):
+        Blog.objects.filter(pk=self.blog.pk).update(created_at=self.yesterday)
+        # Saving moves posted_at to now.
+        Blog.objects.get(pk=self.blog.pk).save()
+        refresh_stats()
+        response = self.client.get(
+            reverse("stats", args=["categories"]),
+            {"daily": "true", "id": [self.category.pk]},
+        )
+        self.assertEqual(
+            [(row["day"], row["blogs"]) for row in response.data],
+            [(self.yesterday.date(), 1), (self.today, 0)],
+        )
+
+    def test_ids_are_kept_across_refreshes(self):
+        rows = set(CategoryDailyStats.objects.values_list("id", "category", "day"))
+        # Rows of a category sorting first used to renumber all the others.
+        first = CategoryFactory.create(pk=0)
+        BlogFactory.create(author=self.author, category=first)
+        refresh_stats()
+        refreshed = CategoryDailyStats.objects.values_list("id", "category", "day")
+        self.assertEqual(set(refreshed.exclude(category=first)), rows)
+
+    def test_blocking_refresh(self):
+        refresh_stats(concurrently=False)
+        self.assertEqual(CategoryDailyStats.objects.count(), 3)
+
+    def test_unknown_kind(self):
+        response = self.client.get(reverse("stats", args=["tags"]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_requires_authentication(self):
+        self.client.credentials()
+        response = self.client.get(reverse("stats", args=["authors"]))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
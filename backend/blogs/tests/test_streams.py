@@ -0,0 +1,148 @@
+import json
+
+from asgiref.sync import sync_to_async
+from asgiref.testing import ApplicationCommunicator
+from django.test import TransactionTestCase
+from rest_framework.authtoken.models import Token
+
+from accounts.factories import CustomUserFactory
+from blogs.bulk import bulk_react, bulk_unreact
+from blogs.factories import BlogFactory, CategoryFactory, CommentFactory
+from blogs.models import Blog, Reaction, Reply
+from config.asgi import application
+
+
+class BlogEventsTestCase(TransactionTestCase):
+    def setUp(self):
+        self.user = CustomUserFactory.create()
+        self.token = Token.objects.create(user=self.user)
+        self.blog = BlogFactory.create(
+            author=self.user, category=CategoryFactory.create()
+        )
+        self.path = f"/api/blog/{self.blog.pk}/events/"
+
+    def communicator(self, path=None, query_string=b"", headers=None):
+        if headers is None:
+            headers = [(b"authorization", f"Token {self.token}".encode())]
+        scope = {
+            "type": "http",
+            "method": "GET",
+            "path": path or self.path,
+            "query_string": query_string,
+            "headers": headers,
+        }
+        return ApplicationCommunicator(application, scope)
+
+    async def connect(self, communicator):
+        await communicator.send_input({"type": "http.request"})
+        start = await communicator.receive_output(timeout=5)
+        self.assertEqual(start["status"], 200)
+        self.assertIn((b"content-type", b"text/event-stream"), start["headers"])
+        await communicator.receive_output(timeout=5)
+
+    async def receive_event(self, communicator):
+        message = await communicator.receive_output(timeout=5)
+        kind, data = message["body"].decode().strip().split("\n")
+        return kind.removeprefix("event: "), json.loads(data.removeprefix("data: "))
+
+    async def disconnect(self, communicator):
+        await communicator.send_input({"type": "http.disconnect"})
+        await communicator.wait(timeout=5)
+
+    async def test_streams_new_comments_and_replies(self):
+        communicator = self.communicator()
+        await self.connect(communicator)
+
+        comment = await sync_to_async(CommentFactory.create)(
+            blog=self.blog, author=self.user, text="First"
+        )
+        kind, data = await self.receive_event(communicator)
+        self.assertEqual(kind, "comment")
+        self.assertEqual(data["id"], comment.pk)
+        self.assertEqual(data["text"], "First")
+
+        reply = await sync_to_async(Reply.objects.create)(
+            comment=comment, author=self.user, text="Reply"
+        )
+        kind, data = await self.receive_event(communicator)
+        self.assertEqual(kind, "reply")
+        self.assertEqual(data["id"], reply.pk)
+        self.assertEqual(data["blog"], self.blog.pk)
+        await self.disconnect(communicator)
+
+    async def test_streams_reaction_changes_of_bulk_writes(self):
+        communicator = self.communicator()
+        await self.connect(communicator)
+
+        await sync_to_async(bulk_react)(
+            self.user, [{"blog": self.blog.pk, "reaction_type": "Love"}]
+        )
+        kind, data = await self.receive_event(communicator)
+        self.assertEqual(kind, "reactions")
+        self.assertEqual(data["blog"], self.blog.pk)
+        self.assertIsNone(data["comment"])
+        self.assertEqual(data["deltas"], {"Love": 1})
+
+        await sync_to_async(bulk_react)(
+            self.user, [{"blog": self.blog.pk, "reaction_type": "Haha"}]
+        )
+        kind, data = await self.receive_event(communicator)
+        self.assertEqual(data["deltas"], {"Love": -1, "Haha": 1})
+
+        reaction = await Reaction.objects.aget(blog=self.blog)
+        await sync_to_async(bulk_unreact)(self.user, [reaction.pk])
+        kind, data = await self.receive_event(communicator)
+        self.assertEqual(data["deltas"], {"Haha": -1})
+        await self.disconnect(communicator)
+
+    async def test_streams_reaction_changes_of_model_writes(self):
+        communicator = self.communicator()
+        await self.connect(communicator)
+
+        comment = await sync_to_async(CommentFactory.create)(
+            blog=self.blog, author=self.user
+        )
+        await self.receive_event(communicator)
+        reaction = await Reaction.objects.acreate(
+            author=self.user, blog=None, comment=comment, reaction_type="WOW"
+        )
+        kind, data = await self.receive_event(communicator)
+        self.assertEqual(data["comment"], comment.pk)
+        self.assertEqual(data["deltas"], {"WOW": 1})
+
+        reaction.reaction_type = "SAD"
+        await sync_to_async(reaction.save)()
+        kind, data = await self.receive_event(communicator)
+        self.assertEqual(data["deltas"], {"WOW": -1, "SAD": 1})
+
+        await sync_to_async(reaction.delete)()
+        kind, data = await self.receive_event(communicator)
+        self.assertEqual(data["deltas"], {"SAD": -1})
+        await self.disconnect(communicator)
+
+    async def test_token_in_query_string_is_ignored(self):
+        communicator = self.communicator(
+            query_string=f"token={self.token}".encode(), headers=[]
+        )
+        await communicator.send_input({"type": "http.request"})
+        start = await communicator.receive_output(timeout=5)
+        self.assertEqual(start["status"], 401)
+
+    async def test_requires_authentication(self):
+        communicator = self.communicator(headers=[])
+        await communicator.send_input({"type": "http.request"})
+        start = await communicator.receive_output(timeout=5)
+        self.assertEqual(start["status"], 401)
+
+    async def test_hidden_blog(self):
+        await Blog.objects.filter(pk=self.blog.pk).aupdate(is_hidden=True)
+        communicator = self.communicator()
+        await communicator.send_input({"type": "http.request"})
+        start = await communicator.receive_output(timeout=5)
+        self.assertEqual(start["status"], 404)
+
+    async def test_unknown_blog(self):
+        communicator = self.communicator(path="/api/blog/0/events/")
+        await communicator.send_input({"type": "http.request"})
+        start = await communicator.receive_output(timeout=5)
+        self.assertEqual(start["status"], 404)
@@ -1,3 +1,5 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.authtoken.models import Token
@@ -166,3 +168,81 @@ class TagViewSetTestCase(APITestCase):
     def test_delete_tag_requires_authentication(self):
         response = self.client.delete(self.url_retrieve)
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_bulk_tag_assignments(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.admin_token}")
+        tag = TagFactory.create()
+        url = f"{self.url}bulk/"
+        data = {
+            "assignments": [
+                {"tag": tag.pk, "blog": self.blog.pk},
+                {"tag": tag.pk, "comment": self.comments[0].pk},
+                {"tag": tag.pk, "blog": 999999},
+            ]
+        }
+        response = self.client.post(url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item["status"] for item in response.data],
+            ["assigned", "assigned", "not_found"],
+        )
+        self.assertEqual(list(tag.blogs.all()), [self.blog])
+        self.assertEqual(list(tag.comments.all()), [self.comments[0]])
+
+        response = self.client.post(url, data, format="json")
+        self.assertEqual(
+            [item["status"] for item in response.data],
+            ["exists", "exists", "not_found"],
+        )
+        self.assertEqual(tag.blogs.count(), 1)
+
+        response = self.client.delete(url, data, format="json")
+        self.assertEqual(
+            [item["status"] for item in response.data],
+            ["deleted", "deleted", "not_found"],
+        )
+        self.assertFalse(tag.blogs.exists())
+        self.assertFalse(tag.comments.exists())
+
+    def test_bulk_tag_requires_permission(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.user_token}")
+        data = {"assignments": [{"tag": self.tag.pk, "blog": self.blog.pk}]}
+        response = self.client.post(f"{self.url}bulk/", data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_bulk_tag_requires_single_target(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.admin_token}")
+        data = {"assignments": [{"tag": self.tag.pk}]}
+        response = self.client.post(f"{self.url}bulk/", data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_update_tag_resolves_related_ids_in_one_query_per_model(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.admin_token}")
+        blogs = BlogFactory.create_batch(20, author=self.user, category=self.category)
+        data = {
+            "name": "Batched tag",
+            "blogs": [blog.pk for blog in blogs],
+            "comments": [comment.pk for comment in self.comments],
+        }
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.put(self.url_retrieve, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        lookups = [
+            query["sql"]
+            for query in queries.captured_queries
+            if '"blogs_blog"."id" IN' in query["sql"]
+            or '"blogs_comment"."id" IN' in query["sql"]
+        ]
+        self.assertEqual(len(lookups), 2)
+        self.assertEqual(sorted(response.data["blogs"]), sorted(data["blogs"]))
+
+    def test_update_tag_reports_all_missing_ids(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.admin_token}")
+        data = {
+            "name": "Broken tag",
+            "blogs": [self.blog.pk, 999998, 999999],
+            "comments": [self.comments[0].pk],
+        }
+        response = self.client.put(self.url_retrieve, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("999998, 999999", str(response.data["blogs"][0]))
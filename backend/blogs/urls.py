@@ -1,6 +1,7 @@
 from django.urls import path
 from rest_framework import routers
 
+from . import async_views
 from .views import (
     CategoryViewSet,
     BlogViewSet,
@@ -9,6 +10,10 @@ from .views import (
     LikeViewSet,
     ReactionViewSet,
     TagViewSet,
+    ExportView,
+    ChangeFeedView,
+    StatsView,
+    PurgeTaskView,
 )
 
 router = routers.DefaultRouter()
@@ -22,6 +27,11 @@ router.register(r"reaction", ReactionViewSet, basename="reaction")
 router.register(r"tag", TagViewSet, basename="tag")
 
 custom_urlpatterns = [
+    path(
+        "blog/by-slug/<slug:slug>/",
+        BlogViewSet.as_view({"get": "retrieve"}, lookup_field="slug"),
+        name="blog-detail-by-slug",
+    ),
     path(
         "blog/author/<str:username>/",
         BlogViewSet.as_view({"get": "list"}),
@@ -47,6 +57,24 @@ custom_urlpatterns = [
         ReactionViewSet.as_view({"get": "list"}),
         name="comment-list-of-author",
     ),
+    path("export/<str:resource>/", ExportView.as_view(), name="export"),
+    path("changes/", ChangeFeedView.as_view(), name="changes"),
+    path("stats/<str:kind>/", StatsView.as_view(), name="stats"),
+    path("purge/<int:pk>/", PurgeTaskView.as_view(), name="purge-detail"),
+    path("async/blog/", async_views.blog_list, name="async-blog-list"),
+    path("async/blog/<int:pk>/", async_views.blog_detail, name="async-blog-detail"),
+    path("async/comment/", async_views.comment_list, name="async-comment-list"),
+    path(
+        "async/comment/<int:pk>/",
+        async_views.comment_detail,
+        name="async-comment-detail",
+    ),
+    path("async/category/", async_views.category_list, name="async-category-list"),
+    path(
+        "async/category/<int:pk>/",
+        async_views.category_detail,
+        name="async-category-detail",
+    ),
 ]
 
 urlpatterns = router.urls + custom_urlpatterns
@@ -1,19 +1,60 @@
+import re
+
 from django.contrib.auth import get_user_model
-from rest_framework import viewsets
-from rest_framework.authentication import TokenAuthentication
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from rest_framework import viewsets, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound
 from rest_framework.filters import OrderingFilter
-from rest_framework.permissions import IsAdminUser
-
-from .filters import CategoryFilter
-from .models import Category, Blog, Comment, Reply, Like, Reaction, Tag
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from core.authentication import CachedTokenAuthentication
+from core.mixins import CachedViewMixin
+
+from .archive import archived_comment
+from .bulk import (
+    bulk_like,
+    bulk_unlike,
+    bulk_react,
+    bulk_unreact,
+    bulk_tag,
+    bulk_untag,
+)
+from .changes import changes_since
+from .engagement import (
+    buffering_enabled,
+    enqueue_like,
+    enqueue_reaction,
+    flush_pending_of,
+    upsert_like,
+    upsert_reaction,
+)
+from .exports import EXPORTS, EXPORT_FORMATS, export_stream
+from .filters import CategoryFilter, TimeRangeFilter
+from .models import (
+    ArchivedComment,
+    Category,
+    Blog,
+    Comment,
+    Reply,
+    Like,
+    Reaction,
+    Tag,
+    PurgeTask,
+)
 from .pagination import CategoryPageNumberPagination, BlogsPageNumberPagination
 from .permissions import StaffAllReadOnlyUser, IsAuthorOrAdmin
+from .purges import schedule_purge
+from .rendering import comments_of_author_json, sql_rendering_enabled
+from .rollups import engagement_series
 from .serializers import (
     CategorySerializer,
     CategoryCreateSerializer,
     BlogSerializer,
     CommentSerializer,
-    BlogForUserSerializer,
+    BlogWithReactionSummarySerializer,
     ReplySerializer,
     LikeSerializer,
     ReactionSerializer,
@@ -22,15 +63,40 @@ from .serializers import (
     ReplyForUserSerializer,
     LikeForUserSerializer,
     ReactionForUserSerializer,
+    ReactionSummaryQuerySerializer,
+    ExportQuerySerializer,
+    ChangeFeedQuerySerializer,
+    StatsQuerySerializer,
+    EngagementSeriesQuerySerializer,
+    PurgeQuerySerializer,
+    PurgeTaskSerializer,
+    TimeRangeQuerySerializer,
+    BulkLikeSerializer,
+    BulkReactionSerializer,
+    BulkReactionDeleteSerializer,
+    BulkTagSerializer,
 )
+from .stats import STATS, read_stats
 
 User = get_user_model()
 
 
-class CategoryViewSet(viewsets.ModelViewSet):
+class PendingEngagementMixin:
+    """Reads flush the requesting user's queued likes and reactions first."""
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method == "GET":
+            flush_pending_of(request.user)
+
+
+class CategoryViewSet(CachedViewMixin, viewsets.ModelViewSet):
     serializer_class = CategorySerializer
-    queryset = Category.objects.all()
-    authentication_classes = [TokenAuthentication]
+    queryset = Category.objects.cached()
+    cache_name = "categories"
+    cache_ttl = 30
+    cache_stale_ttl = 300
+    authentication_classes = [CachedTokenAuthentication]
     filter_backends = [CategoryFilter, OrderingFilter]
     ordering = ["id"]
     search_fields = ["name", "id"]
@@ -43,10 +109,10 @@ class CategoryViewSet(viewsets.ModelViewSet):
         return CategoryCreateSerializer
 
 
-class BlogViewSet(viewsets.ModelViewSet):
+class BlogViewSet(PendingEngagementMixin, viewsets.ModelViewSet):
     serializer_class = BlogSerializer
-    queryset = Blog.objects.all()
-    authentication_classes = [TokenAuthentication]
+    queryset = Blog.objects.filter(is_hidden=False)
+    authentication_classes = [CachedTokenAuthentication]
     pagination_class = BlogsPageNumberPagination
 
     permission_classes = [IsAuthorOrAdmin]
@@ -56,23 +122,52 @@ class BlogViewSet(viewsets.ModelViewSet):
 
     def get_serializer_class(self):
         if self.request.method in ["GET"]:
-            return BlogForUserSerializer
+            return BlogWithReactionSummarySerializer
         return super().get_serializer_class()
 
     def get_queryset(self):
         username = self.kwargs.get("username")
         if username:
             try:
-                return Blog.objects.filter(author__username=username)
+                return Blog.objects.filter(
+                    author__username=username, is_hidden=False
+                ).cached()
             except User.DoesNotExist:
                 pass
         return super().get_queryset()
 
+    def destroy(self, request, *args, **kwargs):
+        query = PurgeQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        if not query.validated_data["background"]:
+            return super().destroy(request, *args, **kwargs)
+        task = schedule_purge(self.get_object(), requested_by=request.user)
+        return Response(PurgeTaskSerializer(task).data, status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=True, methods=["get"])
+    def engagement(self, request, pk=None):
+        """Daily likes, reactions, comments and replies from the rollups."""
+        blog = self.get_object()
+        serializer = EngagementSeriesQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        since = serializer.validated_data["since"]
+        until = serializer.validated_data["until"]
+        return Response(
+            {
+                "blog": blog.pk,
+                "since": since,
+                "until": until,
+                "series": engagement_series(blog.pk, since, until),
+            }
+        )
+
 
 class CommentViewSet(viewsets.ModelViewSet):
     serializer_class = CommentSerializer
-    queryset = Comment.objects.all()
-    authentication_classes = [TokenAuthentication]
+    queryset = Comment.objects.filter(blog__is_hidden=False)
+    filter_backends = [TimeRangeFilter]
+    time_field = "created_at"
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthorOrAdmin]
 
     def perform_create(self, serializer):
@@ -80,11 +175,11 @@ class CommentViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         username = self.kwargs.get("username")
-        queryset = Comment.objects.all()
+        queryset = Comment.objects.filter(blog__is_hidden=False)
 
         if username:
             try:
-                queryset = Comment.objects.filter(author__username=username)
+                queryset = queryset.filter(author__username=username)
             except User.DoesNotExist:
                 pass
         return queryset
@@ -94,11 +189,45 @@ class CommentViewSet(viewsets.ModelViewSet):
             return CommentForUserSerializer
         return super().get_serializer_class()
 
+    def list(self, request, *args, **kwargs):
+        username = self.kwargs.get("username")
+        if username and sql_rendering_enabled():
+            bounds = TimeRangeQuerySerializer(data=request.query_params)
+            bounds.is_valid(raise_exception=True)
+            return HttpResponse(
+                comments_of_author_json(username, **bounds.validated_data),
+                content_type="application/json",
+            )
+        return super().list(request, *args, **kwargs)
+
+    def get_archived_queryset(self):
+        """``get_queryset`` and the filter backends, for archived comments."""
+        queryset = ArchivedComment.objects.filter(blog__is_hidden=False)
+        username = self.kwargs.get("username")
+        if username:
+            queryset = queryset.filter(author__username=username)
+        return self.filter_queryset(queryset)
+
+    def retrieve(self, request, *args, **kwargs):
+        try:
+            return super().retrieve(request, *args, **kwargs)
+        except Http404:
+            # Comments of inactive blogs may have moved to cold storage.
+            comment, summary = archived_comment(
+                self.kwargs["pk"], self.get_archived_queryset()
+            )
+            if comment is None:
+                raise
+        self.check_object_permissions(request, comment)
+        serializer = self.get_serializer(comment)
+        serializer.context["comment_reaction_summaries"] = {comment.pk: summary}
+        return Response(serializer.data)
+
 
 class ReplyViewSet(viewsets.ModelViewSet):
     serializer_class = ReplySerializer
     queryset = Reply.objects.all()
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthorOrAdmin]
 
     def perform_create(self, serializer):
@@ -121,14 +250,29 @@ class ReplyViewSet(viewsets.ModelViewSet):
         return super().get_serializer_class()
 
 
-class LikeViewSet(viewsets.ModelViewSet):
+class LikeViewSet(PendingEngagementMixin, viewsets.ModelViewSet):
     serializer_class = LikeSerializer
     queryset = Like.objects.all()
-    authentication_classes = [TokenAuthentication]
+    filter_backends = [TimeRangeFilter]
+    time_field = "created_at"
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthorOrAdmin]
 
+    def create(self, request, *args, **kwargs):
+        if not buffering_enabled():
+            return super().create(request, *args, **kwargs)
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        pending = enqueue_like(request.user, serializer.validated_data["blog"])
+        return Response(
+            {"author": request.user.pk, "blog": pending.blog_id, "pending": True},
+            status=status.HTTP_202_ACCEPTED,
+        )
+
     def perform_create(self, serializer):
-        return serializer.save(author=self.request.user)
+        serializer.instance = upsert_like(
+            self.request.user, serializer.validated_data["blog"]
+        )
 
     def get_queryset(self):
         queryset = Like.objects.all()
@@ -142,15 +286,45 @@ class LikeViewSet(viewsets.ModelViewSet):
             return LikeForUserSerializer
         return super().get_serializer_class()
 
+    @action(detail=False, methods=["post", "delete"])
+    def bulk(self, request):
+        serializer = BulkLikeSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        blog_ids = serializer.validated_data["blogs"]
+        if request.method == "DELETE":
+            return Response(bulk_unlike(request.user, blog_ids))
+        return Response(bulk_like(request.user, blog_ids))
 
-class ReactionViewSet(viewsets.ModelViewSet):
+
+class ReactionViewSet(PendingEngagementMixin, viewsets.ModelViewSet):
     serializer_class = ReactionSerializer
     queryset = Reaction.objects.all()
-    authentication_classes = [TokenAuthentication]
+    filter_backends = [TimeRangeFilter]
+    time_field = "given_at"
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthorOrAdmin]
 
+    def create(self, request, *args, **kwargs):
+        if not buffering_enabled():
+            return super().create(request, *args, **kwargs)
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        pending = enqueue_reaction(request.user, **serializer.validated_data)
+        return Response(
+            {
+                "author": request.user.pk,
+                "blog": pending.blog_id,
+                "comment": pending.comment_id,
+                "reaction_type": pending.reaction_type,
+                "pending": True,
+            },
+            status=status.HTTP_202_ACCEPTED,
+        )
+
     def perform_create(self, serializer):
-        return serializer.save(author=self.request.user)
+        serializer.instance = upsert_reaction(
+            self.request.user, **serializer.validated_data
+        )
 
     def get_queryset(self):
         queryset = Reaction.objects.all()
@@ -164,9 +338,124 @@ class ReactionViewSet(viewsets.ModelViewSet):
             return ReactionForUserSerializer
         return super().get_serializer_class()
 
+    @action(detail=False, methods=["post", "delete"])
+    def bulk(self, request):
+        if request.method == "DELETE":
+            serializer = BulkReactionDeleteSerializer(data=request.data)
+            serializer.is_valid(raise_exception=True)
+            return Response(
+                bulk_unreact(request.user, serializer.validated_data["ids"])
+            )
+        serializer = BulkReactionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return Response(
+            bulk_react(request.user, serializer.validated_data["reactions"])
+        )
+
+    @action(detail=False, methods=["get"])
+    def summary(self, request):
+        serializer = ReactionSummaryQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        blog_ids = serializer.validated_data.get("blog", [])
+        comment_ids = serializer.validated_data.get("comment", [])
+        return Response(
+            {
+                "blogs": Reaction.objects.summaries("blog", blog_ids),
+                "comments": Reaction.objects.summaries("comment", comment_ids),
+            }
+        )
+
 
 class TagViewSet(viewsets.ModelViewSet):
     serializer_class = TagSerializer
-    queryset = Tag.objects.all()
-    authentication_classes = [TokenAuthentication]
+    queryset = Tag.objects.cached()
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [IsAdminUser]
+
+    @action(detail=False, methods=["post", "delete"])
+    def bulk(self, request):
+        serializer = BulkTagSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        assignments = serializer.validated_data["assignments"]
+        if request.method == "DELETE":
+            return Response(bulk_untag(assignments))
+        return Response(bulk_tag(assignments))
+
+
+class ExportView(APIView):
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAdminUser]
+
+    def get(self, request, resource):
+        if resource not in EXPORTS:
+            raise NotFound(f"Unknown export '{resource}'.")
+        serializer = ExportQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        output = serializer.validated_data["output"]
+        compress = bool(
+            re.search(r"\bgzip\b", request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        )
+        response = StreamingHttpResponse(
+            export_stream(
+                resource,
+                output=output,
+                since=serializer.validated_data.get("since"),
+                compress=compress,
+            ),
+            content_type=EXPORT_FORMATS[output],
+        )
+        response["Content-Disposition"] = f'attachment; filename="{resource}.{output}"'
+        response["Vary"] = "Accept-Encoding"
+        if compress:
+            response["Content-Encoding"] = "gzip"
+        return response
+
+
+class ChangeFeedView(APIView):
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        serializer = ChangeFeedQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        return Response(changes_since(**serializer.validated_data))
+
+
+class StatsView(APIView):
+    """Daily counts from the materialized views of ``blogs.stats``."""
+
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, kind):
+        if kind not in STATS:
+            raise NotFound(f"Unknown statistics '{kind}'.")
+        serializer = StatsQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        return Response(
+            read_stats(
+                kind,
+                since=data.get("since"),
+                until=data.get("until"),
+                ids=data.get("id"),
+                daily=data["daily"],
+            )
+        )
+
+
+class PurgeTaskView(APIView):
+    """Progress of a background purge, for staff and whoever requested it."""
+
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        tasks = PurgeTask.objects.all()
+        if not request.user.is_staff:
+            tasks = tasks.filter(requested_by=request.user)
+        try:
+            task = tasks.get(pk=pk)
+        except PurgeTask.DoesNotExist:
+            raise NotFound()
+        return Response(PurgeTaskSerializer(task).data)
@@ -8,9 +8,25 @@ https://docs.djangoproject.com/en/4.1/howto/deployment/asgi/
 """
 
 import os
+import re
 
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from blogs.streams import blog_events  # noqa: E402
+
+# Event streams stay open for as long as the page does. Django 4.1 would
+# iterate a streaming response in a worker thread per client, so they are
+# served by a plain ASGI app on the event loop instead.
+BLOG_EVENTS_PATH = re.compile(r"^/api/blog/(?P<pk>\d+)/events/$")
+
+
+async def application(scope, receive, send):
+    if scope["type"] == "http":
+        match = BLOG_EVENTS_PATH.match(scope["path"])
+        if match:
+            return await blog_events(scope, receive, send, int(match["pk"]))
+    return await django_application(scope, receive, send)
@@ -45,12 +45,13 @@ INSTALLED_APPS = [
     # local apps
     "accounts.apps.AccountsConfig",
     "blogs.apps.BlogsConfig",
+    "core.apps.CoreConfig",
 ]
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
         #
-        "rest_framework.authentication.TokenAuthentication",  # Token
+        "core.authentication.CachedTokenAuthentication",  # Token
     ],
     # "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.LimitOffsetPagination",
     # "PAGE_SIZE": 3,
@@ -76,6 +77,8 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "core.middleware.ReplicaRoutingMiddleware",
+    "core.middleware.SlowQueryMiddleware",
 ]
 
 ROOT_URLCONF = "config.urls"
@@ -101,6 +104,11 @@ WSGI_APPLICATION = "config.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/4.1/ref/settings/#databases
 
+# Connections are kept open for CONN_MAX_AGE seconds per worker thread. For
+# a bounded pool shared by the threads of a process, set ENGINE to
+# "core.backends.postgresql_pool", CONN_MAX_AGE to 0 and configure it with
+# OPTIONS = {"pool": {"max_size": 10, "timeout": 30}}; its metrics are
+# listed at /api/db-pools/.
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.postgresql",
@@ -109,9 +117,32 @@ DATABASES = {
         "PASSWORD": "postgres",
         "HOST": "db",
         "PORT": 5432,
-    }
+        "CONN_MAX_AGE": 60,
+        "CONN_HEALTH_CHECKS": True,
+    },
+    # Stand-in for a streaming replica; point HOST at the real one.
+    "replica": {
+        "ENGINE": "django.db.backends.postgresql",
+        "NAME": "postgres",
+        "USER": "postgres",
+        "PASSWORD": "postgres",
+        "HOST": "db",
+        "PORT": 5432,
+        "CONN_MAX_AGE": 60,
+        "CONN_HEALTH_CHECKS": True,
+        "TEST": {"MIRROR": "default"},
+    },
 }
 
+DATABASE_ROUTERS = ["core.routers.ReplicaRouter"]
+
+# Aliases that serve reads of GET/HEAD/OPTIONS requests. Clients stay on the
+# primary for REPLICA_PIN_SECONDS after a write, and replicas lagging more
+# than REPLICA_MAX_LAG_SECONDS are skipped.
+DATABASE_REPLICAS = []
+REPLICA_PIN_SECONDS = 5
+REPLICA_MAX_LAG_SECONDS = 5
+
 # Password validation
 # https://docs.djangoproject.com/en/4.1/ref/settings/#auth-password-validators
 
@@ -152,3 +183,57 @@ STATIC_URL = "static/"
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 AUTH_USER_MODEL = "accounts.CustomUser"
+
+# Queue likes and reactions and write them in batches with the
+# flush_engagement command instead of inserting them in the request.
+BLOGS_BUFFERED_ENGAGEMENT = False
+
+# Render comment/author/<username>/ as one JSON document built by PostgreSQL
+# (blogs.rendering) instead of through CommentForUserSerializer.
+BLOGS_SQL_RENDERING = False
+
+# Tables partitioned by month with `manage.py partitions --convert`. Listed
+# tables lose their unique constraints, so likes and reactions written to
+# them are checked for duplicates under advisory locks instead; add a table
+# here before converting it.
+BLOGS_PARTITIONED_TABLES = []
+
+# Statements slower than this many milliseconds are logged with their request
+# context and listed at /api/slow-queries/ (None disables the log). A sample
+# of the logged SELECTs is re-run with EXPLAIN (ANALYZE, BUFFERS).
+SLOW_QUERY_THRESHOLD_MS = 200
+SLOW_QUERY_LOG_SIZE = 200
+SLOW_QUERY_LOG_FILE = None
+SLOW_QUERY_EXPLAIN_SAMPLE_RATE = 0.1
+
+# Live blog events at /api/blog/<id>/events/ (served by config.asgi only).
+# With a channel name set, events go through PostgreSQL NOTIFY so clients on
+# every node receive them; None delivers them within the process only. Each
+# client may fall EVENTS_QUEUE_SIZE events behind before it is disconnected.
+EVENTS_NOTIFY_CHANNEL = None
+EVENTS_QUEUE_SIZE = 100
+EVENTS_KEEPALIVE_SECONDS = 15
+
+# In-process caches (see core.caches) are evicted on every node through
+# PostgreSQL NOTIFY on this channel; None evicts within the process only.
+CACHE_INVALIDATION_CHANNEL = None
+
+# Rows of querysets marked with .cached() are kept in memory for this many
+# seconds; any write to a table they read evicts them first.
+QUERYSET_CACHE_TIMEOUT = 300
+QUERYSET_CACHE_MAX_ENTRIES = 1000
+
+# Background jobs (see core.jobs), run by manage.py run_jobs. Failed jobs are
+# retried after JOBS_RETRY_BACKOFF_SECONDS, doubling up to the maximum.
+# Workers mark their running job alive every JOBS_HEARTBEAT_SECONDS; jobs
+# without a heartbeat for JOBS_LOCK_TIMEOUT_SECONDS are taken to belong to a
+# dead worker and queued again. JOBS_SCHEDULE overrides the interval in
+# seconds of periodic jobs by name (None disables one), e.g.
+# {"blogs.archive_comments": 86400}.
+JOBS_RETRY_BACKOFF_SECONDS = 10
+JOBS_RETRY_BACKOFF_MAX_SECONDS = 3600
+JOBS_HEARTBEAT_SECONDS = 30
+JOBS_LOCK_TIMEOUT_SECONDS = 120
+JOBS_MAINTENANCE_SECONDS = 60
+JOBS_KEEP_FINISHED_DAYS = 7
+JOBS_SCHEDULE = {}
@@ -0,0 +1,16 @@
+from django.apps import AppConfig
+
+
+class CoreConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'core'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+        from django.utils.module_loading import autodiscover_modules
+
+        from .querycache import install_write_tracking
+
+        connection_created.connect(install_write_tracking)
+        # Registers the @job functions of every app.
+        autodiscover_modules('jobs')
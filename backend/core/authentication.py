@@ -0,0 +1,32 @@
+import copy
+
+from asgiref.sync import sync_to_async
+from rest_framework.authentication import TokenAuthentication
+
+from .caches import local_cache
+
+token_cache = local_cache("tokens", timeout=60)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """``TokenAuthentication`` that keeps looked up tokens in memory.
+
+    Entries are evicted on every node when the token or its user changes,
+    see ``accounts.signals``.
+    """
+
+    def authenticate_credentials(self, key):
+        lookup = super().authenticate_credentials
+        user, token = token_cache.get_or_set(key, lambda: lookup(key))
+        # Views may modify request.user; don't share the cached instance.
+        return copy.copy(user), token
+
+
+authentication = CachedTokenAuthentication()
+
+
+async def authenticate_token(key):
+    """The user of token ``key``, for async views and streams."""
+    # Cache hits skip the database like they do in the viewsets.
+    user, _ = await sync_to_async(authentication.authenticate_credentials)(key)
+    return user
@@ -0,0 +1,47 @@
+from functools import partial
+
+import psycopg2.extras
+from django.db.backends.postgresql import base
+
+from core.pool import get_pool
+
+
+def connect(conn_params, isolation_level=None):
+    connection = base.Database.connect(**conn_params)
+    if isolation_level is not None and isolation_level != connection.isolation_level:
+        connection.set_session(isolation_level=isolation_level)
+    psycopg2.extras.register_default_jsonb(conn_or_curs=connection, loads=lambda x: x)
+    return connection
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """PostgreSQL backend that checks connections out of a per-process pool.
+
+    Configure the pool with ``OPTIONS["pool"]`` (``max_size``, ``timeout``,
+    ``max_idle``, ``health_check_interval``) and keep ``CONN_MAX_AGE`` at 0
+    so connections go back to the pool when a request finishes.
+    """
+
+    def get_connection_params(self):
+        conn_params = super().get_connection_params()
+        conn_params.pop("pool", None)
+        return conn_params
+
+    def get_new_connection(self, conn_params):
+        options = self.settings_dict["OPTIONS"]
+        self.pool = get_pool(
+            self.alias,
+            conn_params,
+            partial(connect, conn_params, options.get("isolation_level")),
+            options.get("pool", {}),
+        )
+        connection = self.pool.getconn()
+        self.isolation_level = options.get(
+            "isolation_level", connection.isolation_level
+        )
+        return connection
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                self.pool.putconn(self.connection)
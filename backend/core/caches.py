@@ -0,0 +1,136 @@
+import threading
+import time
+
+_caches = {}
+_caches_lock = threading.Lock()
+_missing = object()
+
+
+class LocalCache:
+    """Thread-safe in-process cache of one kind of value.
+
+    Entries expire after ``timeout`` seconds as a backstop; writes elsewhere
+    evict them earlier through ``core.invalidation``.
+    """
+
+    def __init__(self, name, timeout=300, max_entries=10000):
+        self.name = name
+        self.timeout = timeout
+        self.max_entries = max_entries
+        self._entries = {}
+        self._lock = threading.Lock()
+        # Bumped by every eviction, so a value computed before an eviction
+        # is not stored after it.
+        self._generation = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            value, expires = self._entries.get(key, (_missing, 0))
+            if value is _missing or expires < time.monotonic():
+                self._entries.pop(key, None)
+                return default
+            return value
+
+    @property
+    def generation(self):
+        return self._generation
+
+    def set(self, key, value, generation=None, timeout=None):
+        """Store ``value`` unless the cache was evicted since ``generation``."""
+        from .invalidation import start_invalidation_listener
+
+        start_invalidation_listener()
+        if timeout is None:
+            timeout = self.timeout
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            if len(self._entries) >= self.max_entries and key not in self._entries:
+                self._entries.pop(next(iter(self._entries)))
+            self._entries[key] = (value, time.monotonic() + timeout)
+
+    def get_or_set(self, key, compute):
+        generation = self.generation
+        value = self.get(key, _missing)
+        if value is _missing:
+            value = compute()
+            self.set(key, value, generation)
+        return value
+
+    def delete_many(self, keys):
+        with self._lock:
+            self._generation += 1
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Runs one call per key at a time; concurrent callers share its outcome."""
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def running(self, key):
+        with self._lock:
+            return key in self._calls
+
+    def do(self, key, compute, timeout=None):
+        """Return ``compute()``, or the result of the call already running.
+
+        Callers waiting longer than ``timeout`` seconds compute it themselves.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        if not leader:
+            if not call.done.wait(timeout):
+                return compute()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = compute()
+            return call.result
+        except Exception as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+
+def local_cache(name, **options):
+    """Return the process's cache called ``name``, creating it on first use."""
+    with _caches_lock:
+        if name not in _caches:
+            _caches[name] = LocalCache(name, **options)
+        return _caches[name]
+
+
+def get_cache(name):
+    return _caches.get(name)
+
+
+def clear_all():
+    for cache in list(_caches.values()):
+        cache.clear()
@@ -0,0 +1,285 @@
+import asyncio
+import json
+import logging
+import select
+import threading
+from collections import defaultdict
+from functools import partial
+
+import psycopg2
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from psycopg2 import sql
+
+logger = logging.getLogger(__name__)
+
+# PostgreSQL rejects NOTIFY payloads of 8000 bytes or more.
+NOTIFY_MAX_BYTES = 7999
+OVERFLOW = object()
+
+
+def notify_channel():
+    return getattr(settings, "EVENTS_NOTIFY_CHANNEL", None)
+
+
+def encode(topic, event):
+    return json.dumps({"topic": topic, "event": event}, cls=DjangoJSONEncoder)
+
+
+class Subscription:
+    """Bounded queue of events for one client, owned by its event loop.
+
+    When the client falls ``maxsize`` events behind, the queued events are
+    dropped and the subscription ends with ``OVERFLOW``, so a slow client
+    costs at most ``maxsize`` events of memory.
+    """
+
+    def __init__(self, topic, maxsize):
+        self.topic = topic
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize)
+        self.overflowed = False
+
+    def put(self, event):
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(OVERFLOW)
+
+    async def get(self):
+        return await self.queue.get()
+
+
+class Broker:
+    """In-process fan-out of events to the subscriptions of a topic."""
+
+    def __init__(self):
+        self._subscriptions = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, topic, maxsize=None):
+        if maxsize is None:
+            maxsize = getattr(settings, "EVENTS_QUEUE_SIZE", 100)
+        subscription = Subscription(topic, maxsize)
+        with self._lock:
+            self._subscriptions[topic].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.topic, set())
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                self._subscriptions.pop(subscription.topic, None)
+
+    def publish(self, topic, event):
+        """Queue ``event`` for every subscriber; safe to call from any thread."""
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(topic, ()))
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.put, event)
+            except RuntimeError:
+                # The subscriber's event loop is gone.
+                self.unsubscribe(subscription)
+
+    def subscriber_count(self, topic=None):
+        with self._lock:
+            if topic is not None:
+                return len(self._subscriptions.get(topic, ()))
+            return sum(
+                len(subscriptions) for subscriptions in self._subscriptions.values()
+            )
+
+
+broker = Broker()
+
+
+def _send(topic, event, using):
+    channel = notify_channel()
+    if not channel:
+        broker.publish(topic, event)
+        return
+    payload = encode(topic, event)
+    if len(payload.encode()) > NOTIFY_MAX_BYTES:
+        # Clients fetch the full object by id.
+        event = {key: event[key] for key in ("type", "id") if key in event}
+        payload = encode(topic, {**event, "truncated": True})
+    with connections[using].cursor() as cursor:
+        cursor.execute("SELECT pg_notify(%s, %s)", [channel, payload])
+
+
+def publish(topic, event, using=DEFAULT_DB_ALIAS):
+    """Deliver ``event`` to the subscribers of ``topic`` after commit.
+
+    With ``EVENTS_NOTIFY_CHANNEL`` set the event goes through PostgreSQL
+    ``NOTIFY`` and reaches subscribers on every node through their
+    ``NotifyListener``; otherwise only this process's subscribers get it.
+    """
+    transaction.on_commit(partial(_send, topic, event, using), using=using)
+
+
+class NotifyListener(threading.Thread):
+    """Thread that listens on a channel and hands payloads to ``handle``.
+
+    ``on_connect`` runs after every (re)connect: notifications sent while the
+    listener was disconnected are lost.
+    """
+
+    daemon = True
+    poll_interval = 1.0
+    max_backoff = 30
+
+    def __init__(self, channel, handle, on_connect=None, using=DEFAULT_DB_ALIAS):
+        super().__init__(name=f"notify-listener-{channel}")
+        self.channel = channel
+        self.handle = handle
+        self.on_connect = on_connect
+        self.using = using
+        self.stopped = threading.Event()
+
+    def run(self):
+        backoff = 1
+        while not self.stopped.is_set():
+            try:
+                self.listen()
+                backoff = 1
+            except psycopg2.Error:
+                logger.exception("Listening on %r failed, reconnecting", self.channel)
+                self.stopped.wait(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+
+    def listen(self):
+        params = connections[self.using].get_connection_params()
+        connection = psycopg2.connect(**params)
+        try:
+            connection.autocommit = True
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    sql.SQL("LISTEN {}").format(sql.Identifier(self.channel))
+                )
+            if self.on_connect is not None:
+                self.on_connect()
+            while not self.stopped.is_set():
+                if not select.select([connection], [], [], self.poll_interval)[0]:
+                    continue
+                connection.poll()
+                while connection.notifies:
+                    self.handle(connection.notifies.pop(0).payload)
+        finally:
+            connection.close()
+
+    def stop(self):
+        self.stopped.set()
+
+
+_listeners = {}
+_listeners_lock = threading.Lock()
+
+
+def start_listener(channel, handle, on_connect=None):
+    """Start this process's listener on ``channel`` unless it is running."""
+    with _listeners_lock:
+        listener = _listeners.get(channel)
+        if listener is None or not listener.is_alive():
+            listener = _listeners[channel] = NotifyListener(channel, handle, on_connect)
+            listener.start()
+        return listener
+
+
+def dispatch(payload, broker=broker):
+    try:
+        message = json.loads(payload)
+        broker.publish(message["topic"], message["event"])
+    except (ValueError, KeyError, TypeError):
+        logger.warning("Ignoring malformed notification %r", payload)
+
+
+def ensure_listener():
+    """Start this process's listener the first time a client subscribes."""
+    channel = notify_channel()
+    if channel:
+        return start_listener(channel, dispatch)
+    return None
+
+
+def format_event(event):
+    data = json.dumps(event, cls=DjangoJSONEncoder)
+    return f"event: {event.get('type', 'message')}\ndata: {data}\n\n".encode()
+
+
+async def _wait_for_disconnect(receive):
+    while (await receive())["type"] != "http.disconnect":
+        pass
+
+
+async def send_error(send, status, detail):
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", b"application/json")],
+        }
+    )
+    await send(
+        {"type": "http.response.body", "body": json.dumps({"detail": detail}).encode()}
+    )
+
+
+async def stream(receive, send, topic):
+    """Stream the events of ``topic`` as server-sent events until disconnect.
+
+    ``send`` waits while the client's socket buffer is full; events arriving
+    meanwhile pile up in the bounded subscription queue. A client that falls
+    too far behind gets an ``overflow`` event and is disconnected so it can
+    reconnect and reload the current state.
+    """
+    ensure_listener()
+    subscription = broker.subscribe(topic)
+    keepalive = getattr(settings, "EVENTS_KEEPALIVE_SECONDS", 15)
+    disconnected = asyncio.ensure_future(_wait_for_disconnect(receive))
+    getter = None
+    try:
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [
+                    (b"content-type", b"text/event-stream"),
+                    (b"cache-control", b"no-cache"),
+                    (b"x-accel-buffering", b"no"),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": b"", "more_body": True})
+        while True:
+            if getter is None:
+                getter = asyncio.ensure_future(subscription.get())
+            done, _ = await asyncio.wait(
+                {getter, disconnected},
+                timeout=keepalive,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if disconnected in done:
+                return
+            if getter not in done:
+                body = b": keepalive\n\n"
+            elif getter.result() is OVERFLOW:
+                body = format_event({"type": "overflow"})
+                await send({"type": "http.response.body", "body": body})
+                return
+            else:
+                body = format_event(getter.result())
+                getter = None
+            await send({"type": "http.response.body", "body": body, "more_body": True})
+    finally:
+        broker.unsubscribe(subscription)
+        for task in (getter, disconnected):
+            if task is not None:
+                task.cancel()
@@ -0,0 +1,103 @@
+"""Cross-node eviction of ``core.caches`` entries over PostgreSQL NOTIFY.
+
+Every node numbers the messages it sends. A listener that sees a gap in a
+node's numbers, or reconnects after losing its connection, cannot tell which
+keys it missed and flushes all local caches instead.
+"""
+
+import itertools
+import json
+import logging
+import threading
+import uuid
+from functools import partial
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from .caches import clear_all, get_cache
+from .events import start_listener
+
+logger = logging.getLogger(__name__)
+
+NODE_ID = uuid.uuid4().hex[:12]
+
+_sequence = itertools.count(1)
+_last_seen = {}
+_last_seen_lock = threading.Lock()
+
+
+def invalidation_channel():
+    return getattr(settings, "CACHE_INVALIDATION_CHANNEL", None)
+
+
+def evict(name, keys):
+    cache = get_cache(name)
+    if cache is None:
+        return
+    if keys is None:
+        cache.clear()
+    else:
+        cache.delete_many(keys)
+
+
+def flush(reason):
+    logger.info("Flushing local caches: %s", reason)
+    clear_all()
+
+
+def _notify(name, keys, using):
+    evict(name, keys)
+    channel = invalidation_channel()
+    if not channel:
+        return
+    # Short keys keep messages well below the 8000 byte NOTIFY limit.
+    message = {"n": NODE_ID, "s": next(_sequence), "c": name, "k": keys}
+    with connections[using].cursor() as cursor:
+        cursor.execute("SELECT pg_notify(%s, %s)", [channel, json.dumps(message)])
+
+
+def invalidate(name, keys=None, using=DEFAULT_DB_ALIAS):
+    """Evict ``keys`` (or everything) from the cache ``name`` on every node.
+
+    The local entries are evicted right away and again after commit, so a
+    value read before the commit cannot stay cached; other nodes evict once
+    the transaction commits.
+    """
+    if keys is not None:
+        keys = list(keys)
+        if not keys:
+            return
+    evict(name, keys)
+    transaction.on_commit(partial(_notify, name, keys, using), using=using)
+
+
+def handle(payload):
+    try:
+        message = json.loads(payload)
+        node, sequence, name, keys = (message[key] for key in ("n", "s", "c", "k"))
+    except (ValueError, KeyError, TypeError):
+        flush(f"malformed message {payload!r}")
+        return
+    if node == NODE_ID:
+        return
+    with _last_seen_lock:
+        expected = _last_seen.get(node, sequence - 1) + 1
+        _last_seen[node] = max(sequence, _last_seen.get(node, 0))
+    if sequence > expected:
+        flush(f"missed {sequence - expected} message(s) from node {node}")
+    else:
+        evict(name, keys)
+
+
+def connected():
+    # Nothing is known about writes made while the listener was down.
+    with _last_seen_lock:
+        _last_seen.clear()
+    flush("listener connected")
+
+
+def start_invalidation_listener():
+    channel = invalidation_channel()
+    if channel:
+        start_listener(channel, handle, on_connect=connected)
@@ -0,0 +1,268 @@
+"""Background jobs kept in the database and run by ``manage.py run_jobs``.
+
+Functions registered with ``@job`` are queued with ``enqueue``. Workers claim
+due jobs with ``SELECT ... FOR UPDATE SKIP LOCKED``, so any number of them
+share the table without running a job twice. A failing job is retried with
+exponential backoff until it has run ``max_attempts`` times. While a job
+runs, its worker refreshes ``locked_at`` every ``JOBS_HEARTBEAT_SECONDS``;
+jobs whose heartbeat stopped for ``JOBS_LOCK_TIMEOUT_SECONDS`` are queued
+again. Jobs registered with ``every`` also run periodically: finishing a run
+queues the next one, and idle workers queue the first when none is pending.
+Apps register their jobs in a ``jobs`` module, imported when the project
+starts.
+"""
+
+import logging
+import os
+import socket
+import threading
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, close_old_connections, connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job, ReplicaPin
+
+logger = logging.getLogger(__name__)
+
+REGISTRY = {}
+
+WORKER_MAX_BACKOFF_SECONDS = 60
+
+
+class RegisteredJob:
+    def __init__(self, name, func, max_attempts, every):
+        self.name = name
+        self.func = func
+        self.max_attempts = max_attempts
+        self.every = every
+
+    @property
+    def interval(self):
+        """Seconds between periodic runs; ``JOBS_SCHEDULE`` overrides ``every``."""
+        return getattr(settings, "JOBS_SCHEDULE", {}).get(self.name, self.every)
+
+
+def job(name, max_attempts=5, every=None):
+    """Register the decorated function as the job ``name``.
+
+    With ``every`` seconds the job is also run periodically, without kwargs.
+    """
+
+    def decorator(func):
+        REGISTRY[name] = RegisteredJob(name, func, max_attempts, every)
+        return func
+
+    return decorator
+
+
+def enqueue(name, delay=0, using=DEFAULT_DB_ALIAS, **kwargs):
+    """Queue a run of the job ``name`` with JSON serializable ``kwargs``.
+
+    Queued inside a transaction, the job is only seen by workers on commit.
+    """
+    if name not in REGISTRY:
+        raise ValueError(f"Unknown job '{name}'.")
+    return Job.objects.using(using).create(
+        name=name, kwargs=kwargs, run_at=timezone.now() + timedelta(seconds=delay)
+    )
+
+
+def backoff(attempts):
+    base = getattr(settings, "JOBS_RETRY_BACKOFF_SECONDS", 10)
+    limit = getattr(settings, "JOBS_RETRY_BACKOFF_MAX_SECONDS", 3600)
+    return timedelta(seconds=min(base * 2 ** (attempts - 1), limit))
+
+
+def schedule_periodic(using=DEFAULT_DB_ALIAS):
+    """Queue the periodic jobs that have no pending run."""
+    now = timezone.now()
+    jobs = [
+        Job(name=registered.name, periodic=True, run_at=now)
+        for registered in REGISTRY.values()
+        if registered.interval
+    ]
+    # unique_pending_periodic_job drops the ones already pending.
+    Job.objects.using(using).bulk_create(jobs, ignore_conflicts=True)
+
+
+def requeue_stale(using=DEFAULT_DB_ALIAS):
+    """Queue again the jobs whose worker stopped while running them.
+
+    A live worker refreshes ``locked_at`` of its job with ``Heartbeat``, so
+    only jobs without a heartbeat for the lock timeout are taken.
+    """
+    now = timezone.now()
+    timeout = getattr(settings, "JOBS_LOCK_TIMEOUT_SECONDS", 120)
+    return (
+        Job.objects.using(using)
+        .filter(
+            state=Job.States.RUNNING,
+            locked_at__lt=now - timedelta(seconds=timeout),
+        )
+        .update(state=Job.States.QUEUED, locked_by="", locked_at=None, run_at=now)
+    )
+
+
+def claim(worker, limit=1, using=DEFAULT_DB_ALIAS):
+    """Lock up to ``limit`` due jobs for ``worker`` and mark them running."""
+    now = timezone.now()
+    with transaction.atomic(using=using):
+        ids = list(
+            Job.objects.using(using)
+            .filter(state=Job.States.QUEUED, run_at__lte=now)
+            .order_by("run_at")
+            .select_for_update(skip_locked=True)
+            .values_list("pk", flat=True)[:limit]
+        )
+        Job.objects.using(using).filter(pk__in=ids).update(
+            state=Job.States.RUNNING,
+            locked_by=worker,
+            locked_at=now,
+            attempts=F("attempts") + 1,
+        )
+    return list(Job.objects.using(using).filter(pk__in=ids).order_by("run_at"))
+
+
+def finish(job, error=None, using=DEFAULT_DB_ALIAS):
+    registered = REGISTRY.get(job.name)
+    now = timezone.now()
+    changes = {"locked_by": "", "locked_at": None, "last_error": error or ""}
+    if error is None:
+        changes.update(state=Job.States.DONE, finished_at=now)
+    elif registered and job.attempts < registered.max_attempts:
+        changes.update(state=Job.States.QUEUED, run_at=now + backoff(job.attempts))
+    else:
+        changes.update(state=Job.States.FAILED, finished_at=now)
+    with transaction.atomic(using=using):
+        # A job requeued as stale may be running on another worker by now.
+        Job.objects.using(using).filter(pk=job.pk, locked_by=job.locked_by).update(
+            **changes
+        )
+        if job.periodic and changes["state"] != Job.States.QUEUED:
+            interval = registered and registered.interval
+            if interval:
+                schedule_next = Job(
+                    name=job.name,
+                    periodic=True,
+                    run_at=now + timedelta(seconds=interval),
+                )
+                Job.objects.using(using).bulk_create(
+                    [schedule_next], ignore_conflicts=True
+                )
+
+
+class Heartbeat(threading.Thread):
+    """Refreshes ``locked_at`` of a running job until stopped."""
+
+    def __init__(self, job, using=DEFAULT_DB_ALIAS):
+        super().__init__(name=f"{threading.current_thread().name}-heartbeat")
+        self.job = job
+        self.using = using
+        self.stopped = threading.Event()
+
+    def run(self):
+        interval = getattr(settings, "JOBS_HEARTBEAT_SECONDS", 30)
+        try:
+            while not self.stopped.wait(interval):
+                try:
+                    self.beat()
+                except Exception:
+                    logger.exception("Heartbeat of job %s failed.", self.job)
+        finally:
+            connections[self.using].close()
+
+    def beat(self):
+        Job.objects.using(self.using).filter(
+            pk=self.job.pk, state=Job.States.RUNNING, locked_by=self.job.locked_by
+        ).update(locked_at=timezone.now())
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+def run(job, using=DEFAULT_DB_ALIAS):
+    """Run a claimed job and record its outcome."""
+    registered = REGISTRY.get(job.name)
+    heartbeat = Heartbeat(job, using=using)
+    heartbeat.start()
+    try:
+        if registered is None:
+            raise ValueError(f"Unknown job '{job.name}'.")
+        if job.attempts > registered.max_attempts:
+            raise RuntimeError("The worker running the last attempt stopped.")
+        registered.func(**job.kwargs)
+    except Exception:
+        error = traceback.format_exc()
+        logger.exception("Job %s failed.", job)
+    else:
+        error = None
+    finally:
+        heartbeat.stop()
+    finish(job, error=error, using=using)
+
+
+def worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}:{threading.current_thread().name}"
+
+
+def work(stop, once=False, interval=1.0, using=DEFAULT_DB_ALIAS):
+    """Run due jobs one at a time until ``stop`` is set.
+
+    With ``once`` the worker returns as soon as no job is due. Stale jobs are
+    requeued and periodic jobs scheduled at most every
+    ``JOBS_MAINTENANCE_SECONDS`` while idle. A failing iteration, e.g. while
+    the database restarts, is logged and retried with exponential backoff
+    instead of ending the worker.
+    """
+    worker = worker_name()
+    maintained_at = None
+    failures = 0
+    while not stop.is_set():
+        # Drops connections that broke or outlived CONN_MAX_AGE, as requests
+        # do; a surrounding transaction, as in tests, keeps its connection.
+        if not connections[using].in_atomic_block:
+            close_old_connections()
+        try:
+            jobs = claim(worker, using=using)
+            if not jobs and (
+                maintained_at is None
+                or time.monotonic() - maintained_at
+                >= getattr(settings, "JOBS_MAINTENANCE_SECONDS", 60)
+            ):
+                maintained_at = time.monotonic()
+                requeue_stale(using=using)
+                schedule_periodic(using=using)
+                jobs = claim(worker, using=using)
+            for claimed in jobs:
+                run(claimed, using=using)
+        except Exception:
+            if once:
+                raise
+            failures += 1
+            logger.exception("Worker %s failed, retrying.", worker)
+            stop.wait(min(interval * 2**failures, WORKER_MAX_BACKOFF_SECONDS))
+            continue
+        failures = 0
+        if not jobs:
+            if once:
+                break
+            stop.wait(interval)
+
+
+@job("core.delete_finished_jobs", every=3600)
+def delete_finished_jobs():
+    """Delete jobs finished more than ``JOBS_KEEP_FINISHED_DAYS`` ago."""
+    days = getattr(settings, "JOBS_KEEP_FINISHED_DAYS", 7)
+    Job.objects.filter(finished_at__lt=timezone.now() - timedelta(days=days)).delete()
+
+
+@job("core.delete_expired_pins", every=3600)
+def delete_expired_pins():
+    """Delete the replica pins of clients that have not written lately."""
+    ReplicaPin.objects.filter(expires_at__lte=timezone.now()).delete()
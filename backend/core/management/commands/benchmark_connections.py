@@ -0,0 +1,63 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.db.utils import load_backend
+
+from core.pool import close_pools, pool_stats
+
+POOL_ENGINE = "core.backends.postgresql_pool"
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the cost of a short request-like unit of work with a new "
+        "connection each time, a persistent connection and the pool."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default="default")
+        parser.add_argument("--iterations", type=int, default=200)
+        parser.add_argument(
+            "--queries", type=int, default=1, help="Queries per unit of work"
+        )
+
+    def handle(self, *args, **options):
+        settings_dict = connections[options["database"]].settings_dict
+        standard = {**settings_dict, "ENGINE": "django.db.backends.postgresql"}
+        pooled = {**settings_dict, "ENGINE": POOL_ENGINE}
+
+        results = {
+            "new connection": self.run(standard, options, reconnect=True),
+            "persistent": self.run(standard, options, reconnect=False),
+            "pooled": self.run(pooled, options, reconnect=True),
+        }
+        for mode, timings in results.items():
+            timings.sort()
+            p95 = timings[int(len(timings) * 0.95) - 1]
+            self.stdout.write(
+                f"{mode:>15}: mean {statistics.mean(timings):.3f} ms, "
+                f"p95 {p95:.3f} ms"
+            )
+        for alias, stats in pool_stats().items():
+            self.stdout.write(f"pool {alias}: {stats}")
+        close_pools()
+
+    def run(self, settings_dict, options, reconnect):
+        backend = load_backend(settings_dict["ENGINE"])
+        alias = f"benchmark-{options['database']}"
+        wrapper = backend.DatabaseWrapper(settings_dict, alias)
+        timings = []
+        try:
+            for _ in range(options["iterations"]):
+                start = time.perf_counter()
+                with wrapper.cursor() as cursor:
+                    for _ in range(options["queries"]):
+                        cursor.execute("SELECT 1")
+                if reconnect:
+                    wrapper.close()
+                timings.append((time.perf_counter() - start) * 1000)
+        finally:
+            wrapper.close()
+        return timings
@@ -0,0 +1,61 @@
+import statistics
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = (
+        "Fire concurrent GET requests at an endpoint and report throughput and "
+        "latency, e.g. to compare /api/blog/ under gunicorn (WSGI) with "
+        "/api/async/blog/ under uvicorn (ASGI) using the same worker count."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", required=True)
+        parser.add_argument("--token", help="API token sent in the header")
+        parser.add_argument("--concurrency", type=int, default=50)
+        parser.add_argument("--requests", type=int, default=1000)
+        parser.add_argument("--timeout", type=float, default=30)
+
+    def handle(self, *args, **options):
+        headers = {}
+        if options["token"]:
+            headers["Authorization"] = f"Token {options['token']}"
+
+        def fetch(_):
+            request = urllib.request.Request(options["url"], headers=headers)
+            start = time.perf_counter()
+            try:
+                with urllib.request.urlopen(request, timeout=options["timeout"]) as r:
+                    r.read()
+                    status = r.status
+            except urllib.error.HTTPError as exc:
+                status = exc.code
+            except OSError:
+                status = None
+            return status, (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options["concurrency"]) as executor:
+            results = list(executor.map(fetch, range(options["requests"])))
+        elapsed = time.perf_counter() - start
+
+        timings = sorted(timing for status, timing in results if status == 200)
+        failed = len(results) - len(timings)
+        self.stdout.write(
+            f"{len(results)} requests in {elapsed:.2f} s "
+            f"({len(results) / elapsed:.1f} req/s), {failed} failed"
+        )
+        if timings:
+            p50, p95, p99 = (
+                timings[min(len(timings) - 1, int(len(timings) * q))]
+                for q in (0.5, 0.95, 0.99)
+            )
+            self.stdout.write(
+                f"latency mean {statistics.mean(timings):.1f} ms, "
+                f"p50 {p50:.1f} ms, p95 {p95:.1f} ms, p99 {p99:.1f} ms"
+            )
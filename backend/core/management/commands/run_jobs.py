@@ -0,0 +1,66 @@
+import multiprocessing
+import threading
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from core.jobs import work
+
+
+def work_and_close(stop, once, interval):
+    try:
+        work(stop, once=once, interval=interval)
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = "Run queued and periodic background jobs."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrency", type=int, default=1, help="Jobs run at the same time"
+        )
+        parser.add_argument(
+            "--processes",
+            action="store_true",
+            help="Run workers in processes instead of threads",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=1.0,
+            help="Seconds to sleep when no job is due",
+        )
+        parser.add_argument(
+            "--once", action="store_true", help="Run the due jobs and exit"
+        )
+
+    def handle(self, *args, **options):
+        if options["processes"]:
+            # Forked workers must not share the parent's connections.
+            connections.close_all()
+            context = multiprocessing.get_context("fork")
+            stop = context.Event()
+            start_worker = context.Process
+        else:
+            stop = threading.Event()
+            start_worker = threading.Thread
+        workers = [
+            start_worker(
+                target=work_and_close,
+                args=(stop, options["once"], options["interval"]),
+                name=f"jobs-{number}",
+            )
+            for number in range(options["concurrency"])
+        ]
+        for worker in workers:
+            worker.start()
+        try:
+            for worker in workers:
+                worker.join()
+        except KeyboardInterrupt:
+            # Workers finish the job they are running first.
+            stop.set()
+            for worker in workers:
+                worker.join()
@@ -0,0 +1,140 @@
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.db import OperationalError, connections
+from django.http import HttpResponse
+
+from .routers import (
+    choose_replica,
+    is_pinned,
+    mark_unhealthy,
+    pin,
+    replica_aliases,
+    reset_read_alias,
+    set_read_alias,
+)
+from .slow_queries import SlowQueryRecorder, threshold_ms
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+class RetryOnPrimary(HttpResponse):
+    """Stands in for the response of a safe request whose replica failed."""
+
+    status_code = 503
+
+
+class AsyncCapableMiddleware:
+    """Runs ``__acall__`` instead of ``__call__`` in an async middleware chain."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.sync_call(request)
+
+
+def recording(recorder):
+    stack = ExitStack()
+    for connection in connections.all():
+        stack.enter_context(connection.execute_wrapper(recorder))
+    return stack
+
+
+class SlowQueryMiddleware(AsyncCapableMiddleware):
+    """Logs statements slower than ``SLOW_QUERY_THRESHOLD_MS`` per request."""
+
+    def sync_call(self, request):
+        if threshold_ms() is None:
+            return self.get_response(request)
+        request.slow_query_recorder = SlowQueryRecorder(request)
+        with recording(request.slow_query_recorder):
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        if threshold_ms() is None:
+            return await self.get_response(request)
+        request.slow_query_recorder = SlowQueryRecorder(request)
+        # Connections are per thread; wrap the ones of the thread that runs
+        # this request's sync_to_async calls.
+        stack = await sync_to_async(recording)(request.slow_query_recorder)
+        try:
+            return await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        recorder = getattr(request, "slow_query_recorder", None)
+        if recorder is None:
+            return None
+        view_class = getattr(view_func, "cls", None)
+        recorder.view = view_class.__name__ if view_class else view_func.__qualname__
+        actions = getattr(view_func, "actions", None) or {}
+        recorder.action = actions.get(request.method.lower())
+        return None
+
+
+def read_alias(request):
+    return None if is_pinned(request) else choose_replica()
+
+
+class ReplicaRoutingMiddleware(AsyncCapableMiddleware):
+    """Serves reads of safe requests from a healthy replica.
+
+    Clients that wrote recently stay on the primary; a safe request that
+    fails on the replica is retried once on the primary.
+    """
+
+    def sync_call(self, request):
+        if not replica_aliases():
+            return self.get_response(request)
+        if request.method not in SAFE_METHODS:
+            response = self.get_response(request)
+            pin(request, response)
+            return response
+
+        request.replica_alias = read_alias(request)
+        token = set_read_alias(request.replica_alias)
+        try:
+            response = self.get_response(request)
+        finally:
+            reset_read_alias(token)
+        if isinstance(response, RetryOnPrimary):
+            # The whole request runs again, through the middleware below and
+            # the view, with every read on the primary.
+            request.replica_alias = None
+            response = self.get_response(request)
+        return response
+
+    async def __acall__(self, request):
+        if not replica_aliases():
+            return await self.get_response(request)
+        if request.method not in SAFE_METHODS:
+            response = await self.get_response(request)
+            await sync_to_async(pin)(request, response)
+            return response
+
+        request.replica_alias = await sync_to_async(read_alias)(request)
+        token = set_read_alias(request.replica_alias)
+        try:
+            response = await self.get_response(request)
+        finally:
+            reset_read_alias(token)
+        if isinstance(response, RetryOnPrimary):
+            request.replica_alias = None
+            response = await self.get_response(request)
+        return response
+
+    def process_exception(self, request, exception):
+        alias = getattr(request, "replica_alias", None)
+        if alias is None or not isinstance(exception, OperationalError):
+            return None
+        mark_unhealthy(alias)
+        return RetryOnPrimary()
@@ -0,0 +1,75 @@
+import time
+from urllib.parse import urlencode
+
+from rest_framework.response import Response
+
+from .caches import SingleFlight, local_cache
+
+_flights = SingleFlight()
+
+
+class CachedViewMixin:
+    """Serves ``list`` and ``retrieve`` from the ``cache_name`` local cache.
+
+    Responses are fresh for ``cache_ttl`` seconds and may then be served
+    stale for ``cache_stale_ttl`` more seconds while a single request rebuilds
+    them. Requests that find nothing cached wait for the request already
+    rebuilding the same page instead of rebuilding it too. Writes evict the
+    cache through ``core.invalidation``, so stale pages are never served after
+    a write. Object permissions are only checked when a page is rebuilt, so
+    use it where every permitted user sees the same data.
+    """
+
+    cache_name = None
+    cache_ttl = 30
+    cache_stale_ttl = 300
+    cache_wait_timeout = 10
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(
+            lambda: super(CachedViewMixin, self).list(request, *args, **kwargs)
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            lambda: super(CachedViewMixin, self).retrieve(request, *args, **kwargs)
+        )
+
+    def get_cache_key(self):
+        request = self.request
+        # Page links in the payload are absolute, so the host is part of the key.
+        query = urlencode(sorted(request.query_params.lists()), doseq=True)
+        return (self.action, request.get_host(), request.path, query)
+
+    def cached_response(self, compute):
+        cache = local_cache(self.cache_name)
+        key = self.get_cache_key()
+        entry = cache.get(key)
+        if entry is not None:
+            fresh_until, data = entry
+            if fresh_until > time.monotonic():
+                return self.cache_hit(data, "HIT")
+            if _flights.running((cache.name, key)):
+                return self.cache_hit(data, "STALE")
+
+        generation = cache.generation
+
+        def rebuild():
+            response = compute()
+            if response.status_code == 200:
+                entry = (time.monotonic() + self.cache_ttl, response.data)
+                timeout = self.cache_ttl + self.cache_stale_ttl
+                cache.set(key, entry, generation, timeout=timeout)
+            return response.status_code, response.data
+
+        status, data = _flights.do(
+            (cache.name, key), rebuild, timeout=self.cache_wait_timeout
+        )
+        response = Response(data, status=status)
+        response["X-Cache"] = "MISS"
+        return response
+
+    def cache_hit(self, data, state):
+        response = Response(data)
+        response["X-Cache"] = state
+        return response
@@ -0,0 +1,57 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Job(models.Model):
+    """Call of a function registered with ``core.jobs.job``."""
+
+    class States(models.TextChoices):
+        QUEUED = "queued"
+        RUNNING = "running"
+        DONE = "done"
+        FAILED = "failed"
+
+    name = models.CharField(max_length=100)
+    kwargs = models.JSONField(default=dict)
+    state = models.CharField(
+        max_length=10, choices=States.choices, default=States.QUEUED
+    )
+    periodic = models.BooleanField(default=False)
+    attempts = models.PositiveIntegerField(default=0)
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(null=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True)
+
+    class Meta:
+        constraints = [
+            # At most one pending run of a periodic job, however many workers
+            # try to schedule it.
+            models.UniqueConstraint(
+                fields=["name"],
+                condition=models.Q(periodic=True, state__in=["queued", "running"]),
+                name="unique_pending_periodic_job",
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["run_at"],
+                condition=models.Q(state="queued"),
+                name="job_queued_run_at_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.state})"
+
+
+class ReplicaPin(models.Model):
+    """Token client kept on the primary until ``expires_at`` after a write."""
+
+    key = models.CharField(max_length=64, primary_key=True)
+    expires_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.key[:12]} until {self.expires_at}"
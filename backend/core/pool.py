@@ -0,0 +1,188 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+
+import psycopg2
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class PoolTimeout(psycopg2.OperationalError):
+    pass
+
+
+class ConnectionPool:
+    """Thread-safe pool of at most ``max_size`` open connections.
+
+    ``getconn`` waits up to ``timeout`` seconds for a free connection.
+    Connections idle longer than ``health_check_interval`` are pinged before
+    being handed out, and ones idle longer than ``max_idle`` are closed.
+    """
+
+    def __init__(
+        self, connect, max_size=10, timeout=30, max_idle=300, health_check_interval=30
+    ):
+        self.connect = connect
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.health_check_interval = health_check_interval
+        self._idle = deque()
+        self._size = 0
+        self._checked_out = 0
+        self._condition = threading.Condition()
+        self._counters = {
+            "checkouts": 0,
+            "waits": 0,
+            "wait_time_total": 0.0,
+            "wait_time_max": 0.0,
+            "timeouts": 0,
+            "opened": 0,
+            "discarded": 0,
+        }
+
+    def getconn(self):
+        start = time.monotonic()
+        while True:
+            connection, returned_at = self._reserve(start)
+            if connection is None:
+                try:
+                    connection = self.connect()
+                except Exception:
+                    self._release_slot()
+                    raise
+                with self._condition:
+                    self._counters["opened"] += 1
+                break
+            if self._healthy(connection, returned_at):
+                break
+            self._discard(connection)
+
+        waited = time.monotonic() - start
+        with self._condition:
+            self._counters["checkouts"] += 1
+            self._counters["wait_time_total"] += waited
+            self._counters["wait_time_max"] = max(
+                self._counters["wait_time_max"], waited
+            )
+        return connection
+
+    def putconn(self, connection):
+        if not connection.closed:
+            try:
+                if connection.get_transaction_status() != TRANSACTION_STATUS_IDLE:
+                    connection.rollback()
+            except psycopg2.Error:
+                connection.close()
+        if connection.closed:
+            self._discard(connection)
+            return
+        with self._condition:
+            self._checked_out -= 1
+            self._idle.append((connection, time.monotonic()))
+            self._condition.notify()
+
+    def close_all(self):
+        with self._condition:
+            idle = list(self._idle)
+            self._idle.clear()
+            self._size -= len(idle)
+            self._condition.notify_all()
+        for connection, _ in idle:
+            connection.close()
+
+    def stats(self):
+        with self._condition:
+            return {
+                "max_size": self.max_size,
+                "size": self._size,
+                "idle": len(self._idle),
+                "checked_out": self._checked_out,
+                **self._counters,
+            }
+
+    def _reserve(self, start):
+        """Take an idle connection, or a slot to open one (``None``)."""
+        with self._condition:
+            waited = False
+            while True:
+                if self._idle:
+                    self._checked_out += 1
+                    # Most recently used first keeps the rest idle long enough
+                    # to be closed when load drops.
+                    return self._idle.pop()
+                if self._size < self.max_size:
+                    self._size += 1
+                    self._checked_out += 1
+                    return None, None
+                remaining = self.timeout - (time.monotonic() - start)
+                if remaining <= 0:
+                    self._counters["timeouts"] += 1
+                    raise PoolTimeout(
+                        f"No connection available within {self.timeout}s "
+                        f"({self.max_size} checked out)."
+                    )
+                if not waited:
+                    self._counters["waits"] += 1
+                    waited = True
+                self._condition.wait(remaining)
+
+    def _healthy(self, connection, returned_at):
+        if connection.closed:
+            return False
+        idle_for = time.monotonic() - returned_at
+        if idle_for > self.max_idle:
+            return False
+        if idle_for > self.health_check_interval:
+            try:
+                with connection.cursor() as cursor:
+                    cursor.execute("SELECT 1")
+            except psycopg2.Error:
+                return False
+        return True
+
+    def _discard(self, connection):
+        if not connection.closed:
+            connection.close()
+        with self._condition:
+            self._counters["discarded"] += 1
+        self._release_slot()
+
+    def _release_slot(self):
+        with self._condition:
+            self._size -= 1
+            self._checked_out -= 1
+            self._condition.notify()
+
+
+def get_pool(alias, conn_params, connect, options):
+    """Return this process's pool for ``alias`` and its connection parameters."""
+    key = (
+        os.getpid(),
+        alias,
+        json.dumps(conn_params, sort_keys=True, default=str),
+    )
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = ConnectionPool(connect, **options)
+        return _pools[key]
+
+
+def pool_stats():
+    pid = os.getpid()
+    with _pools_lock:
+        pools = [
+            (alias, pool) for (owner, alias, _), pool in _pools.items() if owner == pid
+        ]
+    return {alias: pool.stats() for alias, pool in pools}
+
+
+def close_pools():
+    with _pools_lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        pool.close_all()
@@ -0,0 +1,153 @@
+"""Opt-in caching of queryset result rows, invalidated by table generations.
+
+Every table has a generation token in the ``table-generations`` local cache.
+Writes seen by ``track_writes`` evict the token of their table (on every node
+through ``core.invalidation``), so the next read draws a new one. Cached rows
+are keyed by their SQL, parameters and the generations of every table the
+statement reads, which makes entries of a written table unreachable.
+
+Only querysets marked with ``cached()`` switch to ``CachedQuery``; every
+other query of a ``CachedQuerySet`` runs as usual.
+"""
+
+import itertools
+import re
+
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models.sql import Query
+from django.db.models.sql.constants import MULTI
+
+from .caches import local_cache
+from .invalidation import invalidate
+
+GENERATIONS = "table-generations"
+ROWS = "querysets"
+
+READ_TABLES_RE = re.compile(r'\b(?:FROM|JOIN)\s+"(\w+)"', re.IGNORECASE)
+# Targets anywhere in the statement, so the data-modifying CTEs of a
+# ``WITH ... AS (DELETE ...) INSERT ...`` are caught too. UPDATE is not a
+# target in ``FOR UPDATE OF``, ``FOR UPDATE SKIP LOCKED`` or ``DO UPDATE SET``.
+WRITTEN_TABLES_RE = re.compile(
+    r"(?:\bINSERT\s+INTO|\bDELETE\s+FROM|^\s*TRUNCATE(?:\s+TABLE)?"
+    r"|\bUPDATE(?!\s+(?:SET|OF|SKIP|NOWAIT)\b))"
+    r'\s+(?:ONLY\s+)?"?(\w+)"?',
+    re.IGNORECASE,
+)
+WHITESPACE_RE = re.compile(r"\s+")
+
+_tokens = itertools.count(1)
+
+
+def generations():
+    return local_cache(GENERATIONS, timeout=24 * 60 * 60)
+
+
+def rows_cache():
+    return local_cache(
+        ROWS,
+        timeout=getattr(settings, "QUERYSET_CACHE_TIMEOUT", 300),
+        max_entries=getattr(settings, "QUERYSET_CACHE_MAX_ENTRIES", 1000),
+    )
+
+
+def table_generation(table):
+    return generations().get_or_set(table, lambda: next(_tokens))
+
+
+def bump(tables, using):
+    invalidate(GENERATIONS, tables, using=using)
+
+
+def track_writes(connection):
+    """``execute_wrapper`` that bumps the generation of written tables.
+
+    Tables written inside a transaction are collected and bumped together
+    once it commits; nothing else can read their new rows before that.
+    """
+    written = set()
+
+    def bump_written():
+        tables = sorted(written)
+        written.clear()
+        bump(tables, connection.alias)
+
+    def wrapper(execute, sql, params, many, context):
+        result = execute(sql, params, many, context)
+        tables = set(WRITTEN_TABLES_RE.findall(sql))
+        if not tables:
+            return result
+        if not connection.in_atomic_block:
+            bump(sorted(tables), connection.alias)
+            return result
+        # A rolled back transaction or savepoint drops the callback; the
+        # tables collected for it were rolled back with it.
+        if not any(entry[1] is bump_written for entry in connection.run_on_commit):
+            written.clear()
+            transaction.on_commit(bump_written, using=connection.alias)
+        written.update(tables)
+        return result
+
+    wrapper.tracks_writes = True
+    return wrapper
+
+
+def install_write_tracking(sender, connection, **kwargs):
+    """``connection_created`` receiver adding ``track_writes`` once."""
+    wrappers = connection.execute_wrappers
+    if not any(getattr(wrapper, "tracks_writes", False) for wrapper in wrappers):
+        # Connections open lazily inside execute_wrapper() blocks, which pop
+        # the last wrapper on exit; keep this one out of their way.
+        wrappers.insert(0, track_writes(connection))
+
+
+def execute_cached(compiler, execute, result_type=MULTI, **kwargs):
+    # Rows read inside a transaction may include its uncommitted writes.
+    if (
+        result_type != MULTI
+        or kwargs.get("chunked_fetch")
+        or compiler.connection.in_atomic_block
+    ):
+        return execute(result_type, **kwargs)
+    sql, params = compiler.as_sql()
+    key = (
+        compiler.using,
+        WHITESPACE_RE.sub(" ", sql),
+        repr(params),
+        tuple(
+            (table, table_generation(table))
+            for table in sorted(set(READ_TABLES_RE.findall(sql)))
+        ),
+    )
+    cache = rows_cache()
+    rows = cache.get(key)
+    if rows is None:
+        generation = cache.generation
+        rows = [row for chunk in execute(result_type, **kwargs) for row in chunk]
+        cache.set(key, rows, generation, timeout=compiler.query.cache_timeout)
+    return iter([rows])
+
+
+class CachedQuery(Query):
+    cache_timeout = None
+
+    def get_compiler(self, *args, **kwargs):
+        compiler = super().get_compiler(*args, **kwargs)
+        execute = compiler.execute_sql
+
+        def execute_sql(result_type=MULTI, **kwargs):
+            return execute_cached(compiler, execute, result_type, **kwargs)
+
+        compiler.execute_sql = execute_sql
+        return compiler
+
+
+class CachedQuerySet(models.QuerySet):
+    """QuerySet whose ``cached()`` clones serve their rows from memory."""
+
+    def cached(self, timeout=None):
+        clone = self._chain()
+        # Chained clones keep the query class.
+        clone.query = clone.query.chain(klass=CachedQuery)
+        clone.query.cache_timeout = timeout
+        return clone
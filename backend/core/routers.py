@@ -0,0 +1,129 @@
+import contextvars
+import hashlib
+import random
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from django.utils import timezone
+
+from .models import ReplicaPin
+
+HEALTH_CHECK_INTERVAL = 5
+PIN_COOKIE = "pin_primary"
+
+_read_alias = contextvars.ContextVar("read_alias", default=None)
+_health = {}
+
+
+def replica_aliases():
+    return getattr(settings, "DATABASE_REPLICAS", [])
+
+
+def replica_lag(alias):
+    """Seconds the replica is behind; 0 for a server that is not in recovery."""
+    with connections[alias].cursor() as cursor:
+        cursor.execute(
+            "SELECT CASE WHEN pg_is_in_recovery() THEN coalesce(extract(epoch FROM "
+            "now() - pg_last_xact_replay_timestamp()), 0) ELSE 0 END"
+        )
+        return float(cursor.fetchone()[0])
+
+
+def is_healthy(alias):
+    """Whether the replica answers and lags less than the allowed maximum.
+
+    Results are cached for a few seconds so the check is not paid per request.
+    """
+    checked_at, healthy = _health.get(alias, (None, True))
+    if checked_at is not None and time.monotonic() - checked_at < HEALTH_CHECK_INTERVAL:
+        return healthy
+    try:
+        healthy = replica_lag(alias) <= settings.REPLICA_MAX_LAG_SECONDS
+    except DatabaseError:
+        healthy = False
+    _health[alias] = (time.monotonic(), healthy)
+    return healthy
+
+
+def mark_unhealthy(alias):
+    _health[alias] = (time.monotonic(), False)
+
+
+def choose_replica():
+    healthy = [alias for alias in replica_aliases() if is_healthy(alias)]
+    return random.choice(healthy) if healthy else None
+
+
+def set_read_alias(alias):
+    return _read_alias.set(alias)
+
+
+def reset_read_alias(token):
+    _read_alias.reset(token)
+
+
+def _pin_key(request):
+    authorization = request.META.get("HTTP_AUTHORIZATION")
+    if not authorization:
+        return None
+    return hashlib.sha256(authorization.encode()).hexdigest()
+
+
+def is_pinned(request):
+    if PIN_COOKIE in request.COOKIES:
+        return True
+    key = _pin_key(request)
+    if key is None:
+        return False
+    # Pins are read from the primary, a replica may not have the latest yet.
+    return (
+        ReplicaPin.objects.using(DEFAULT_DB_ALIAS)
+        .filter(key=key, expires_at__gt=timezone.now())
+        .exists()
+    )
+
+
+def pin(request, response):
+    """Keep the client on the primary for a while so it reads its own writes.
+
+    Only successful writes pin. Browsers carry the cookie; token clients are
+    pinned in the primary database, which every process shares.
+    """
+    if not 200 <= response.status_code < 400:
+        return
+    seconds = settings.REPLICA_PIN_SECONDS
+    response.set_cookie(PIN_COOKIE, "1", max_age=seconds, httponly=True, samesite="Lax")
+    key = _pin_key(request)
+    if key is not None:
+        expires_at = timezone.now() + timedelta(seconds=seconds)
+        ReplicaPin.objects.using(DEFAULT_DB_ALIAS).bulk_create(
+            [ReplicaPin(key=key, expires_at=expires_at)],
+            update_conflicts=True,
+            unique_fields=["key"],
+            update_fields=["expires_at"],
+        )
+
+
+class ReplicaRouter:
+    """Sends reads to the replica picked for the current request, if any."""
+
+    def db_for_read(self, model, **hints):
+        alias = _read_alias.get()
+        # Reads inside a transaction must see its writes.
+        if alias is None or connections["default"].in_atomic_block:
+            return None
+        return alias
+
+    def db_for_write(self, model, **hints):
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in replica_aliases():
+            return False
+        return None
@@ -0,0 +1,133 @@
+import json
+import random
+import re
+import threading
+import time
+from collections import deque
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+
+REDACTED = "<redacted>"
+
+EXPLAINABLE = {"SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "VALUES"}
+LOCKING_CLAUSE = re.compile(r"\bFOR\s+(?:NO\s+KEY\s+|KEY\s+)?(?:UPDATE|SHARE)\b", re.I)
+SIDE_EFFECTS = re.compile(
+    r"\b(?:pg_notify|pg_(?:try_)?advisory_\w+|nextval|setval)\s*\(", re.I
+)
+
+_entries = deque(maxlen=200)
+_lock = threading.Lock()
+
+
+def threshold_ms():
+    return getattr(settings, "SLOW_QUERY_THRESHOLD_MS", None)
+
+
+def redact(param):
+    """Keep numbers, dates and NULLs; strings may hold user data or secrets."""
+    if param is None or isinstance(param, (bool, int, float, Decimal, date, datetime)):
+        return param
+    if isinstance(param, (list, tuple)):
+        return [redact(item) for item in param]
+    return REDACTED
+
+
+def plain_read(sql):
+    """Whether ``sql`` can run a second time without side effects.
+
+    Reads that take row or advisory locks, notify or bump sequences do not
+    count.
+    """
+    return (
+        sql.lstrip()[:6].upper() == "SELECT"
+        and not LOCKING_CLAUSE.search(sql)
+        and not SIDE_EFFECTS.search(sql)
+    )
+
+
+def record(entry):
+    global _entries
+    size = getattr(settings, "SLOW_QUERY_LOG_SIZE", 200)
+    path = getattr(settings, "SLOW_QUERY_LOG_FILE", None)
+    with _lock:
+        if _entries.maxlen != size:
+            _entries = deque(_entries, maxlen=size)
+        _entries.append(entry)
+        if path:
+            with open(path, "a") as log_file:
+                log_file.write(json.dumps(entry, cls=DjangoJSONEncoder) + "\n")
+
+
+def recent():
+    """Logged slow queries of this process, newest first."""
+    with _lock:
+        return list(reversed(_entries))
+
+
+def clear():
+    with _lock:
+        _entries.clear()
+
+
+class SlowQueryRecorder:
+    """``execute_wrapper`` that logs statements slower than the threshold.
+
+    ``view`` and ``action`` are filled in by the middleware once the URL is
+    resolved.
+    """
+
+    def __init__(self, request):
+        self.request = request
+        self.view = None
+        self.action = None
+        self.explaining = False
+
+    def __call__(self, execute, sql, params, many, context):
+        if self.explaining:
+            return execute(sql, params, many, context)
+        start = time.perf_counter()
+        result = execute(sql, params, many, context)
+        duration = (time.perf_counter() - start) * 1000
+        threshold = threshold_ms()
+        if threshold is not None and duration >= threshold and not many:
+            record(
+                {
+                    "logged_at": timezone.now(),
+                    "database": context["connection"].alias,
+                    "sql": sql,
+                    "params": redact(list(params or [])),
+                    "duration_ms": round(duration, 3),
+                    "method": self.request.method,
+                    "path": self.request.path,
+                    "view": self.view,
+                    "action": self.action,
+                    "plan": self.explain(context["connection"], sql, params),
+                }
+            )
+        return result
+
+    def explain(self, connection, sql, params):
+        rate = getattr(settings, "SLOW_QUERY_EXPLAIN_SAMPLE_RATE", 0.1)
+        statement = sql.split(None, 1)[0].upper() if sql.strip() else ""
+        if statement not in EXPLAINABLE or random.random() >= rate:
+            return None
+        # ANALYZE runs the statement again; anything but a plain read only
+        # gets its estimated plan.
+        options = "(ANALYZE, BUFFERS) " if plain_read(sql) else ""
+        self.explaining = True
+        try:
+            # The savepoint keeps a failing EXPLAIN from aborting the request's
+            # transaction.
+            with transaction.atomic(using=connection.alias):
+                with connection.cursor() as cursor:
+                    cursor.execute(f"EXPLAIN {options}{sql}", params)
+                    return "\n".join(row[0] for row in cursor.fetchall())
+        except DatabaseError:
+            return None
+        finally:
+            self.explaining = False
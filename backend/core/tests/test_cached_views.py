@@ -0,0 +1,140 @@
+import threading
+from unittest import mock
+
+from django.test import SimpleTestCase
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient, APITestCase
+
+from accounts.factories import CustomUserFactory
+from blogs.factories import CategoryFactory
+from blogs.views import CategoryViewSet
+from core import mixins
+from core.caches import SingleFlight, local_cache
+
+
+class SingleFlightTestCase(SimpleTestCase):
+    def run_concurrently(self, flight, compute, callers=5):
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(flight.do("key", compute)))
+            for _ in range(callers)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_concurrent_callers_share_one_call(self):
+        flight = SingleFlight()
+        release = threading.Event()
+        calls = []
+
+        def compute():
+            calls.append(1)
+            release.wait(5)
+            return "value"
+
+        threading.Timer(0.2, release.set).start()
+        self.assertEqual(self.run_concurrently(flight, compute), ["value"] * 5)
+        self.assertEqual(len(calls), 1)
+        self.assertFalse(flight.running("key"))
+
+    def test_waiters_get_the_error(self):
+        flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+
+        def fail():
+            started.set()
+            release.wait(5)
+            raise ValueError("boom")
+
+        leader = threading.Thread(
+            target=lambda: self.assertRaises(ValueError, flight.do, "key", fail)
+        )
+        leader.start()
+        started.wait(5)
+        threading.Timer(0.1, release.set).start()
+        with self.assertRaises(ValueError):
+            flight.do("key", lambda: "unused")
+        leader.join()
+
+    def test_waiter_computes_itself_after_timeout(self):
+        flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow():
+            started.set()
+            release.wait(5)
+            return "slow"
+
+        leader = threading.Thread(target=flight.do, args=("key", slow))
+        leader.start()
+        started.wait(5)
+        self.assertEqual(flight.do("key", lambda: "own", timeout=0.05), "own")
+        release.set()
+        leader.join()
+
+
+class CachedCategoryViewTestCase(APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = CustomUserFactory.create()
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token}")
+        self.categories = CategoryFactory.create_batch(3)
+        self.url = reverse("category-list")
+        self.cache = local_cache("categories")
+        self.addCleanup(self.cache.clear)
+
+    def test_repeated_requests_are_served_from_cache(self):
+        first = self.client.get(self.url)
+        self.assertEqual(first["X-Cache"], "MISS")
+        with self.assertNumQueries(0):
+            second = self.client.get(self.url)
+        self.assertEqual(second["X-Cache"], "HIT")
+        self.assertEqual(second.data, first.data)
+
+    def test_query_parameters_are_part_of_the_key(self):
+        self.client.get(self.url)
+        response = self.client.get(self.url, {"ordering": "-id"})
+        self.assertEqual(response["X-Cache"], "MISS")
+
+    def test_writes_evict_the_cache(self):
+        self.client.get(self.url)
+        CategoryFactory.create(name="New category")
+        response = self.client.get(self.url)
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.data["count"], 4)
+
+    def test_renaming_a_user_evicts_the_cache(self):
+        self.client.get(self.url)
+        self.user.username = "renamed"
+        self.user.save()
+        self.assertEqual(self.client.get(self.url)["X-Cache"], "MISS")
+        self.user.save(update_fields=["last_login"])
+        self.assertEqual(self.client.get(self.url)["X-Cache"], "HIT")
+        self.user.delete()
+        self.assertEqual(len(self.cache), 0)
+
+    def test_stale_page_is_served_while_another_request_rebuilds_it(self):
+        with mock.patch.object(CategoryViewSet, "cache_ttl", -1):
+            self.client.get(self.url)
+        with mock.patch.object(mixins._flights, "running", return_value=True):
+            with self.assertNumQueries(0):
+                response = self.client.get(self.url)
+        self.assertEqual(response["X-Cache"], "STALE")
+
+    def test_stale_page_is_rebuilt(self):
+        with mock.patch.object(CategoryViewSet, "cache_ttl", -1):
+            self.client.get(self.url)
+        response = self.client.get(self.url)
+        self.assertEqual(response["X-Cache"], "MISS")
+
+    def test_missing_object_is_not_cached(self):
+        url = reverse("category-detail", kwargs={"pk": 0})
+        self.assertEqual(self.client.get(url).status_code, 404)
+        self.assertEqual(len(self.cache), 0)
@@ -0,0 +1,119 @@
+import asyncio
+import json
+import time
+from functools import partial
+from unittest import mock
+
+from django.db import connection
+from django.test import (
+    SimpleTestCase,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+
+from core.events import (
+    OVERFLOW,
+    Broker,
+    NotifyListener,
+    dispatch,
+    format_event,
+    publish,
+)
+
+
+class BrokerTestCase(SimpleTestCase):
+    async def test_publish_reaches_every_subscriber_of_the_topic(self):
+        events = Broker()
+        first = events.subscribe("blog:1", maxsize=10)
+        second = events.subscribe("blog:1", maxsize=10)
+        other = events.subscribe("blog:2", maxsize=10)
+        events.publish("blog:1", {"type": "comment"})
+        await asyncio.sleep(0)
+        self.assertEqual(await first.get(), {"type": "comment"})
+        self.assertEqual(await second.get(), {"type": "comment"})
+        self.assertTrue(other.queue.empty())
+
+    async def test_slow_subscriber_overflows(self):
+        events = Broker()
+        subscription = events.subscribe("blog:1", maxsize=2)
+        for n in range(5):
+            events.publish("blog:1", {"n": n})
+        await asyncio.sleep(0)
+        self.assertTrue(subscription.overflowed)
+        self.assertEqual(subscription.queue.qsize(), 1)
+        self.assertIs(await subscription.get(), OVERFLOW)
+
+    async def test_unsubscribe(self):
+        events = Broker()
+        subscription = events.subscribe("blog:1", maxsize=2)
+        events.unsubscribe(subscription)
+        self.assertEqual(events.subscriber_count(), 0)
+
+    def test_format_event(self):
+        self.assertEqual(
+            format_event({"type": "comment", "id": 1}),
+            b'event: comment\ndata: {"type": "comment", "id": 1}\n\n',
+        )
+
+
+class PublishTestCase(TestCase):
+    @mock.patch("core.events.broker.publish")
+    def test_publishes_in_process_after_commit(self, broker_publish):
+        with self.captureOnCommitCallbacks(execute=True):
+            publish("blog:1", {"type": "comment"})
+            broker_publish.assert_not_called()
+        broker_publish.assert_called_once_with("blog:1", {"type": "comment"})
+
+
+@override_settings(EVENTS_NOTIFY_CHANNEL="test_events")
+class NotifyListenerTestCase(TransactionTestCase):
+    def setUp(self):
+        self.received = []
+        self.listener = NotifyListener("test_events", partial(dispatch, broker=self))
+        self.listener.poll_interval = 0.05
+        self.listener.start()
+        self.addCleanup(self.listener.join)
+        self.addCleanup(self.listener.stop)
+        self.wait_for(self.listening)
+
+    def publish(self, topic, event):
+        self.received.append((topic, event))
+
+    def listening(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT count(*) FROM pg_stat_activity WHERE query LIKE 'LISTEN%%'"
+            )
+            return cursor.fetchone()[0] > 0
+
+    def wait_for(self, condition, timeout=5):
+        deadline = time.monotonic() + timeout
+        while not condition():
+            if time.monotonic() > deadline:
+                self.fail("Timed out")
+            time.sleep(0.02)
+
+    def test_notifications_are_published_to_the_broker(self):
+        publish("blog:1", {"type": "comment", "id": 1})
+        self.wait_for(lambda: self.received)
+        self.assertEqual(self.received, [("blog:1", {"type": "comment", "id": 1})])
+
+    def test_large_events_are_truncated(self):
+        publish("blog:1", {"type": "comment", "id": 1, "text": "x" * 10000})
+        self.wait_for(lambda: self.received)
+        self.assertEqual(
+            self.received,
+            [("blog:1", {"type": "comment", "id": 1, "truncated": True})],
+        )
+
+    def test_malformed_notifications_are_ignored(self):
+        with self.assertLogs("core.events", "WARNING"):
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT pg_notify('test_events', 'not json')")
+                cursor.execute(
+                    "SELECT pg_notify('test_events', %s)",
+                    [json.dumps({"topic": "blog:2", "event": {"type": "reply"}})],
+                )
+            self.wait_for(lambda: self.received)
+        self.assertEqual(self.received, [("blog:2", {"type": "reply"})])
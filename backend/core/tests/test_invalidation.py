@@ -0,0 +1,160 @@
+import json
+import time
+from unittest import mock
+
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from accounts.factories import CustomUserFactory
+from blogs.factories import CategoryFactory
+from core import events, invalidation
+from core.caches import LocalCache, local_cache
+
+
+class LocalCacheTestCase(SimpleTestCase):
+    def test_get_or_set(self):
+        cache = LocalCache("test")
+        compute = mock.Mock(return_value=1)
+        self.assertEqual(cache.get_or_set("key", compute), 1)
+        self.assertEqual(cache.get_or_set("key", compute), 1)
+        compute.assert_called_once()
+
+    def test_entries_expire(self):
+        cache = LocalCache("test", timeout=0)
+        cache.set("key", 1)
+        self.assertIsNone(cache.get("key"))
+
+    def test_value_computed_before_an_eviction_is_not_stored(self):
+        cache = LocalCache("test")
+
+        def compute():
+            cache.delete_many(["key"])
+            return "stale"
+
+        self.assertEqual(cache.get_or_set("key", compute), "stale")
+        self.assertIsNone(cache.get("key"))
+
+    def test_oldest_entry_is_dropped_when_full(self):
+        cache = LocalCache("test", max_entries=2)
+        for key in "abc":
+            cache.set(key, key)
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get("a"))
+
+
+class InvalidateTestCase(TestCase):
+    def setUp(self):
+        self.cache = local_cache("test-invalidation")
+        self.cache.set("a", 1)
+        self.cache.set("b", 2)
+        self.addCleanup(self.cache.clear)
+
+    def test_evicts_before_and_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            invalidation.invalidate("test-invalidation", ["a"])
+            self.assertIsNone(self.cache.get("a"))
+            self.cache.set("a", "read before commit")
+        self.assertIsNone(self.cache.get("a"))
+        self.assertEqual(self.cache.get("b"), 2)
+
+    def message(self, sequence, keys=None, node="other"):
+        return json.dumps(
+            {"n": node, "s": sequence, "c": "test-invalidation", "k": keys}
+        )
+
+    def test_messages_of_other_nodes_evict_keys(self):
+        invalidation.handle(self.message(1, ["a"]))
+        self.assertIsNone(self.cache.get("a"))
+        self.assertEqual(self.cache.get("b"), 2)
+
+    def test_none_keys_clear_the_cache(self):
+        invalidation.handle(self.message(1))
+        self.assertEqual(len(self.cache), 0)
+
+    def test_own_messages_are_ignored(self):
+        invalidation.handle(self.message(1, ["a"], node=invalidation.NODE_ID))
+        self.assertEqual(self.cache.get("a"), 1)
+
+    def test_missed_message_flushes_all_caches(self):
+        invalidation.handle(self.message(1, ["a"]))
+        invalidation.handle(self.message(3, ["x"]))
+        self.assertEqual(len(self.cache), 0)
+
+    def test_malformed_message_flushes_all_caches(self):
+        invalidation.handle("not json")
+        self.assertEqual(len(self.cache), 0)
+
+    def tearDown(self):
+        invalidation._last_seen.clear()
+
+
+@override_settings(CACHE_INVALIDATION_CHANNEL="test_invalidation")
+class InvalidationBusTestCase(TransactionTestCase):
+    def setUp(self):
+        self.cache = local_cache("categories")
+        self.addCleanup(self.cache.clear)
+        self.listener = events.start_listener(
+            "test_invalidation", invalidation.handle, invalidation.connected
+        )
+        self.listener.poll_interval = 0.05
+        self.addCleanup(events._listeners.pop, "test_invalidation")
+        self.addCleanup(self.listener.join)
+        self.addCleanup(self.listener.stop)
+        self.wait_for(self.listening)
+
+    def listening(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT count(*) FROM pg_stat_activity WHERE query LIKE 'LISTEN%%'"
+            )
+            return cursor.fetchone()[0] > 0
+
+    def wait_for(self, condition, timeout=5):
+        deadline = time.monotonic() + timeout
+        while not condition():
+            if time.monotonic() > deadline:
+                self.fail("Timed out")
+            time.sleep(0.02)
+
+    def test_writes_on_another_node_evict_local_entries(self):
+        self.cache.set("page-1", "cached")
+        # Pretend the write happened on another node.
+        with mock.patch.object(invalidation, "NODE_ID", "other"):
+            CategoryFactory.create()
+        self.wait_for(lambda: self.cache.get("page-1") is None)
+
+
+class CachedTokenAuthenticationTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = CustomUserFactory.create()
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token}")
+        self.url = reverse("category-list")
+
+    def token_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return [query for query in queries if "authtoken_token" in query["sql"]]
+
+    def test_token_is_looked_up_once(self):
+        self.assertEqual(len(self.token_queries()), 1)
+        self.assertEqual(len(self.token_queries()), 0)
+
+    def test_user_changes_evict_the_token(self):
+        self.token_queries()
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 401)
+
+    def test_deleted_token_is_rejected(self):
+        self.token_queries()
+        self.token.delete()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 401)
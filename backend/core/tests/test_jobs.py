@@ -0,0 +1,153 @@
+import threading
+import time
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import OperationalError
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from core.jobs import REGISTRY, claim, enqueue, job, requeue_stale, run, work
+from core.models import Job
+
+calls = []
+calls_lock = threading.Lock()
+
+
+@job("tests.record")
+def record(value):
+    with calls_lock:
+        calls.append(value)
+
+
+@job("tests.fail", max_attempts=2)
+def fail():
+    raise RuntimeError("boom")
+
+
+@job("tests.tick", every=60)
+def tick():
+    calls.append("tick")
+
+
+@job("tests.outlive_lock")
+def outlive_lock():
+    # Runs past the lock timeout; the heartbeat keeps the job locked.
+    Job.objects.filter(name="tests.outlive_lock").update(
+        locked_at=timezone.now() - timedelta(minutes=5)
+    )
+    time.sleep(0.5)
+    calls.append(requeue_stale())
+
+
+# Keeps the periodic jobs of the apps from running in these tests.
+ONLY_TEST_SCHEDULES = {name: None for name in REGISTRY if name != "tests.tick"}
+
+
+@override_settings(JOBS_SCHEDULE=ONLY_TEST_SCHEDULES)
+class JobTestCase(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def work(self):
+        work(threading.Event(), once=True)
+
+    def test_queued_job_runs_once(self):
+        queued = enqueue("tests.record", value=1)
+        later = enqueue("tests.record", delay=60, value=2)
+        self.work()
+        self.assertEqual(calls, [1, "tick"])
+        queued.refresh_from_db()
+        self.assertEqual(queued.state, Job.States.DONE)
+        self.assertEqual(queued.attempts, 1)
+        self.assertIsNotNone(queued.finished_at)
+        later.refresh_from_db()
+        self.assertEqual(later.state, Job.States.QUEUED)
+
+    def test_unknown_job_is_rejected(self):
+        with self.assertRaisesMessage(ValueError, "Unknown job 'tests.missing'."):
+            enqueue("tests.missing")
+
+    @override_settings(JOBS_RETRY_BACKOFF_SECONDS=30)
+    def test_failures_are_retried_with_backoff(self):
+        failing = enqueue("tests.fail")
+        (claimed,) = claim("worker")
+        with self.assertLogs("core.jobs", "ERROR"):
+            run(claimed)
+        failing.refresh_from_db()
+        self.assertEqual(failing.state, Job.States.QUEUED)
+        self.assertIn("RuntimeError: boom", failing.last_error)
+        self.assertGreater(failing.run_at, timezone.now() + timedelta(seconds=25))
+
+        Job.objects.filter(pk=failing.pk).update(run_at=timezone.now())
+        (claimed,) = claim("worker")
+        with self.assertLogs("core.jobs", "ERROR"):
+            run(claimed)
+        failing.refresh_from_db()
+        self.assertEqual(failing.state, Job.States.FAILED)
+        self.assertEqual(failing.attempts, 2)
+
+    def test_periodic_job_queues_its_next_run(self):
+        self.work()
+        self.work()
+        self.assertEqual(calls, ["tick"])
+        self.assertEqual(
+            Job.objects.filter(name="tests.tick", state=Job.States.QUEUED).count(), 1
+        )
+        pending = Job.objects.get(name="tests.tick", state=Job.States.QUEUED)
+        self.assertGreater(pending.run_at, timezone.now() + timedelta(seconds=55))
+
+    @override_settings(JOBS_LOCK_TIMEOUT_SECONDS=60)
+    def test_jobs_of_stopped_workers_are_requeued(self):
+        stale = enqueue("tests.record", value=3)
+        claim("gone")
+        self.assertEqual(requeue_stale(), 0)
+        Job.objects.filter(pk=stale.pk).update(
+            locked_at=timezone.now() - timedelta(minutes=2)
+        )
+        self.assertEqual(requeue_stale(), 1)
+        (claimed,) = claim("worker")
+        self.assertEqual(claimed.attempts, 2)
+
+    def test_worker_survives_failing_iterations(self):
+        stop = threading.Event()
+        attempts = []
+
+        def flaky_claim(worker, using):
+            attempts.append(worker)
+            if len(attempts) == 1:
+                raise OperationalError("server closed the connection unexpectedly")
+            if len(attempts) == 3:
+                stop.set()
+            return claim(worker, using=using)
+
+        with mock.patch("core.jobs.claim", side_effect=flaky_claim):
+            with self.assertLogs("core.jobs", "ERROR") as logs:
+                work(stop, interval=0.01)
+        self.assertIn("failed, retrying", logs.output[0])
+        self.assertEqual(calls, ["tick"])
+
+
+@override_settings(JOBS_SCHEDULE={name: None for name in REGISTRY})
+class ConcurrentWorkersTestCase(TransactionTestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_every_job_runs_exactly_once(self):
+        for value in range(30):
+            enqueue("tests.record", value=value)
+        call_command("run_jobs", "--concurrency", "4", "--once", stdout=StringIO())
+        self.assertEqual(sorted(calls), list(range(30)))
+        self.assertEqual(Job.objects.filter(state=Job.States.DONE).count(), 30)
+
+    @override_settings(JOBS_HEARTBEAT_SECONDS=0.05, JOBS_LOCK_TIMEOUT_SECONDS=60)
+    def test_heartbeat_keeps_long_jobs_locked(self):
+        long_job = enqueue("tests.outlive_lock")
+        call_command("run_jobs", "--once", stdout=StringIO())
+        self.assertEqual(calls, [0])
+        long_job.refresh_from_db()
+        self.assertEqual(long_job.state, Job.States.DONE)
+        self.assertEqual(long_job.attempts, 1)
@@ -0,0 +1,110 @@
+import threading
+from functools import partial
+
+from django.db import connections
+from django.db.utils import load_backend
+from django.test import SimpleTestCase
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+from accounts.factories import CustomUserFactory
+from core.backends.postgresql_pool.base import connect
+from core.pool import ConnectionPool, PoolTimeout, close_pools
+
+
+class ConnectionPoolTestCase(SimpleTestCase):
+    databases = {"default"}
+
+    def setUp(self):
+        conn_params = connections["default"].get_connection_params()
+        self.pool = ConnectionPool(partial(connect, conn_params), max_size=1, timeout=1)
+        self.addCleanup(self.pool.close_all)
+
+    def test_connections_are_reused(self):
+        connection = self.pool.getconn()
+        self.pool.putconn(connection)
+        self.assertIs(self.pool.getconn(), connection)
+        stats = self.pool.stats()
+        self.assertEqual(stats["opened"], 1)
+        self.assertEqual(stats["checkouts"], 2)
+        self.assertEqual(stats["checked_out"], 1)
+        self.pool.putconn(connection)
+
+    def test_open_transaction_is_rolled_back_on_return(self):
+        connection = self.pool.getconn()
+        connection.cursor().execute("SELECT 1")
+        self.pool.putconn(connection)
+        self.assertEqual(connection.get_transaction_status(), 0)
+
+    def test_checkout_waits_for_a_free_connection(self):
+        connection = self.pool.getconn()
+        timer = threading.Timer(0.05, self.pool.putconn, [connection])
+        timer.start()
+        self.assertIs(self.pool.getconn(), connection)
+        timer.join()
+        stats = self.pool.stats()
+        self.assertEqual(stats["waits"], 1)
+        self.assertGreater(stats["wait_time_max"], 0)
+        self.pool.putconn(connection)
+
+    def test_checkout_times_out_when_pool_is_exhausted(self):
+        self.pool.timeout = 0.01
+        connection = self.pool.getconn()
+        with self.assertRaises(PoolTimeout):
+            self.pool.getconn()
+        self.assertEqual(self.pool.stats()["timeouts"], 1)
+        self.pool.putconn(connection)
+
+    def test_broken_connections_are_replaced(self):
+        connection = self.pool.getconn()
+        self.pool.putconn(connection)
+        connection.close()
+        replacement = self.pool.getconn()
+        self.assertIsNot(replacement, connection)
+        self.assertEqual(self.pool.stats()["discarded"], 1)
+        self.pool.putconn(replacement)
+
+
+class PooledBackendTestCase(SimpleTestCase):
+    databases = {"default"}
+
+    def setUp(self):
+        self.addCleanup(close_pools)
+        self.settings_dict = {
+            **connections["default"].settings_dict,
+            "ENGINE": "core.backends.postgresql_pool",
+            "OPTIONS": {"pool": {"max_size": 2}},
+        }
+
+    def backend_pid(self):
+        backend = load_backend(self.settings_dict["ENGINE"])
+        wrapper = backend.DatabaseWrapper(self.settings_dict, "pooled")
+        try:
+            with wrapper.cursor() as cursor:
+                cursor.execute("SELECT pg_backend_pid()")
+                return cursor.fetchone()[0]
+        finally:
+            wrapper.close()
+
+    def test_closing_returns_the_connection_to_the_pool(self):
+        self.assertEqual(self.backend_pid(), self.backend_pid())
+
+
+class ConnectionPoolStatsViewTestCase(APITestCase):
+    def test_pool_stats_are_staff_only(self):
+        user = CustomUserFactory.create()
+        admin = CustomUserFactory.create(is_staff=True)
+        url = reverse("db-pools")
+
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Token {Token.objects.create(user=user)}"
+        )
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Token {Token.objects.create(user=admin)}"
+        )
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIsInstance(response.data, dict)
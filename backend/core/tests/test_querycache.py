@@ -0,0 +1,119 @@
+from unittest import mock
+
+from django.db import connection, transaction
+from django.test import TransactionTestCase
+
+from accounts.factories import CustomUserFactory
+from blogs.engagement import insert_likes
+from blogs.factories import BlogFactory, CategoryFactory
+from blogs.models import Blog, Category, Like
+from core import querycache
+from core.querycache import rows_cache
+
+
+class QuerysetCacheTestCase(TransactionTestCase):
+    def setUp(self):
+        self.user = CustomUserFactory.create()
+        self.category = CategoryFactory.create(name="Cached")
+        self.blog = BlogFactory.create(author=self.user, category=self.category)
+        self.addCleanup(rows_cache().clear)
+
+    def test_cached_queryset_is_read_once(self):
+        names = Category.objects.cached().values_list("name", flat=True)
+        self.assertEqual(list(Category.objects.cached()), [self.category])
+        self.assertEqual(list(names), ["Cached"])
+        with self.assertNumQueries(0):
+            self.assertEqual(list(Category.objects.cached()), [self.category])
+            self.assertEqual(list(names.all()), ["Cached"])
+
+    def test_querysets_are_cached_only_when_marked(self):
+        list(Category.objects.all())
+        with self.assertNumQueries(1):
+            list(Category.objects.all())
+
+    def test_parameters_are_part_of_the_key(self):
+        list(Category.objects.filter(name="Cached").cached())
+        with self.assertNumQueries(1):
+            self.assertEqual(list(Category.objects.filter(name="Other").cached()), [])
+
+    def test_model_writes_evict_rows(self):
+        list(Category.objects.cached())
+        CategoryFactory.create(name="New")
+        with self.assertNumQueries(1):
+            self.assertEqual(len(Category.objects.cached()), 2)
+
+    def test_queryset_updates_evict_rows(self):
+        list(Category.objects.cached())
+        Category.objects.update(name="Renamed")
+        self.assertEqual(Category.objects.cached().get().name, "Renamed")
+
+    def test_writes_to_joined_tables_evict_rows(self):
+        blogs = Blog.objects.select_related("category").cached()
+        list(blogs)
+        Category.objects.update(name="Renamed")
+        self.assertEqual(blogs.all()[0].category.name, "Renamed")
+
+    def test_raw_sql_writes_evict_rows(self):
+        likes = Like.objects.filter(blog=self.blog).cached()
+        self.assertEqual(list(likes), [])
+        insert_likes([(self.user.pk, self.blog.pk)])
+        self.assertEqual(len(likes.all()), 1)
+
+    def test_writes_in_data_modifying_ctes_evict_rows(self):
+        categories = Category.objects.cached()
+        blogs = Blog.objects.cached()
+        list(categories), list(blogs)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "WITH renamed AS ("
+                "UPDATE blogs_category SET name = 'Renamed' RETURNING id"
+                ") SELECT id FROM renamed"
+            )
+            cursor.execute(
+                "WITH moved AS (DELETE FROM blogs_blog RETURNING id) "
+                "SELECT count(*) FROM moved"
+            )
+        self.assertEqual(categories.all().get().name, "Renamed")
+        self.assertEqual(list(blogs.all()), [])
+
+    def test_locking_reads_do_not_bump(self):
+        with mock.patch("core.querycache.bump") as bump:
+            with transaction.atomic():
+                list(Blog.objects.select_for_update(of=("self",), skip_locked=True))
+        bump.assert_not_called()
+
+    def test_tables_written_in_a_transaction_are_bumped_on_commit(self):
+        list(Category.objects.cached())
+        with mock.patch("core.querycache.bump", wraps=querycache.bump) as bump:
+            with transaction.atomic():
+                CategoryFactory.create(name="New")
+                Category.objects.filter(name="New").update(name="Renamed")
+                Blog.objects.update(likes_count=0)
+                bump.assert_not_called()
+        bump.assert_called_once_with(["blogs_blog", "blogs_category"], "default")
+        self.assertEqual(len(Category.objects.cached()), 2)
+
+    def test_rolled_back_writes_are_not_bumped(self):
+        with mock.patch("core.querycache.bump") as bump:
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                CategoryFactory.create(name="New")
+                raise RuntimeError
+            with transaction.atomic():
+                Blog.objects.update(likes_count=0)
+        bump.assert_called_once_with(["blogs_blog"], "default")
+
+    def test_reads_inside_transactions_are_not_cached(self):
+        with transaction.atomic():
+            list(Category.objects.cached())
+            with self.assertNumQueries(1):
+                list(Category.objects.cached())
+
+    def test_write_tracking_is_installed_once(self):
+        connection.close()
+        list(Category.objects.all())
+        wrappers = [
+            wrapper
+            for wrapper in connection.execute_wrappers
+            if getattr(wrapper, "tracks_writes", False)
+        ]
+        self.assertEqual(len(wrappers), 1)
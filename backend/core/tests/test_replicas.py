@@ -0,0 +1,124 @@
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.db import OperationalError, connections, transaction
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from accounts.factories import CustomUserFactory
+from blogs.factories import BlogFactory, CategoryFactory
+from blogs.models import Blog
+from blogs.views import BlogViewSet
+from core import routers
+from core.models import ReplicaPin
+
+
+@override_settings(DATABASE_REPLICAS=["replica"])
+class ReplicaRoutingTestCase(TransactionTestCase):
+    databases = {"default", "replica"}
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = CustomUserFactory.create()
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token}")
+        self.category = CategoryFactory.create()
+        self.blog = BlogFactory.create(author=self.user, category=self.category)
+        routers._health.clear()
+        self.addCleanup(routers._health.clear)
+
+    def replica_queries(self, method, url, client=None, **kwargs):
+        with CaptureQueriesContext(connections["replica"]) as queries:
+            response = getattr(client or self.client, method)(url, **kwargs)
+        return response, len(queries)
+
+    def test_safe_requests_read_from_replica(self):
+        response, queries = self.replica_queries("get", reverse("blog-list"))
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(queries, 0)
+
+    def test_async_requests_read_from_replica(self):
+        get = async_to_sync(self.async_client.get)
+        with CaptureQueriesContext(connections["replica"]) as queries:
+            response = get(
+                reverse("async-blog-list"), AUTHORIZATION=f"Token {self.token}"
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(len(queries), 0)
+
+    @override_settings(BLOGS_SQL_RENDERING=True)
+    def test_sql_rendered_comments_read_from_replica(self):
+        url = f"{reverse('comment-list')}author/{self.user.username}/"
+        with CaptureQueriesContext(connections["replica"]) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(any("json_agg" in query["sql"] for query in queries))
+
+    def test_writes_go_to_primary_and_pin_the_client(self):
+        another_blog = BlogFactory.create(author=self.user, category=self.category)
+        response, queries = self.replica_queries(
+            "post", reverse("like-list"), data={"blog": another_blog.pk}
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(queries, 0)
+        self.assertIn(routers.PIN_COOKIE, response.cookies)
+
+        _, queries = self.replica_queries("get", reverse("blog-list"))
+        self.assertEqual(queries, 0)
+
+        # A token client without the cookie is pinned in the database.
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Token {self.token}")
+        _, queries = self.replica_queries("get", reverse("blog-list"), client=client)
+        self.assertEqual(queries, 0)
+
+    def test_failed_writes_do_not_pin(self):
+        response = self.client.post(reverse("like-list"), data={"blog": 999999})
+        self.assertEqual(response.status_code, 400)
+        self.assertNotIn(routers.PIN_COOKIE, response.cookies)
+        self.assertFalse(ReplicaPin.objects.exists())
+
+        _, queries = self.replica_queries("get", reverse("blog-list"))
+        self.assertGreater(queries, 0)
+
+    def test_lagging_replica_is_skipped(self):
+        with mock.patch("core.routers.replica_lag", return_value=60):
+            _, queries = self.replica_queries("get", reverse("blog-list"))
+        self.assertEqual(queries, 0)
+
+    def test_failing_replica_falls_back_to_primary(self):
+        def fail(*args, **kwargs):
+            raise OperationalError("replica is gone")
+
+        with mock.patch("core.routers.replica_lag", side_effect=fail):
+            response, queries = self.replica_queries("get", reverse("blog-list"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(queries, 0)
+
+    def test_request_failing_on_replica_is_retried_on_primary(self):
+        original_list = BlogViewSet.list
+        aliases = []
+
+        def flaky_list(view, request, *args, **kwargs):
+            aliases.append(Blog.objects.all().db)
+            if len(aliases) == 1:
+                raise OperationalError("connection lost")
+            return original_list(view, request, *args, **kwargs)
+
+        with mock.patch.object(BlogViewSet, "list", flaky_list):
+            response = self.client.get(reverse("blog-list"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(aliases, ["replica", "default"])
+        self.assertFalse(routers.is_healthy("replica"))
+
+    def test_reads_inside_transactions_use_primary(self):
+        token = routers.set_read_alias("replica")
+        try:
+            self.assertEqual(Blog.objects.all().db, "replica")
+            with transaction.atomic():
+                self.assertEqual(Blog.objects.all().db, "default")
+        finally:
+            routers.reset_read_alias(token)
@@ -0,0 +1,105 @@
+import json
+import os
+import tempfile
+
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient, APITestCase
+
+from accounts.factories import CustomUserFactory
+from blogs.factories import CategoryFactory
+from blogs.models import Category
+from core.slow_queries import REDACTED, clear, plain_read, recent, redact
+
+
+@override_settings(SLOW_QUERY_THRESHOLD_MS=0, SLOW_QUERY_EXPLAIN_SAMPLE_RATE=1.0)
+class SlowQueryLogTestCase(APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = CustomUserFactory.create(is_staff=True)
+        self.user = CustomUserFactory.create()
+        self.admin_token = Token.objects.create(user=self.admin)
+        self.user_token = Token.objects.create(user=self.user)
+        CategoryFactory.create_batch(2)
+        self.url = reverse("slow-queries")
+        clear()
+
+    def test_slow_queries_are_logged_with_view_and_plan(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.user_token}")
+        self.client.get(reverse("category-list"))
+
+        entries = recent()
+        category_query = next(
+            entry for entry in entries if "blogs_category" in entry["sql"]
+        )
+        self.assertEqual(category_query["view"], "CategoryViewSet")
+        self.assertEqual(category_query["action"], "list")
+        self.assertEqual(category_query["path"], reverse("category-list"))
+        self.assertIn("Execution Time", category_query["plan"])
+
+        token_query = next(
+            entry for entry in entries if "authtoken_token" in entry["sql"]
+        )
+        self.assertEqual(token_query["params"], [REDACTED])
+
+    async def test_async_views_are_logged(self):
+        response = await self.async_client.get(
+            reverse("async-category-list"),
+            AUTHORIZATION=f"Token {self.user_token}",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        category_query = next(
+            entry for entry in recent() if "blogs_category" in entry["sql"]
+        )
+        self.assertEqual(category_query["view"], "category_list")
+
+    def test_writes_are_not_analyzed(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.admin_token}")
+        self.client.post(reverse("category-list"), {"name": "Gardening"})
+        insert = next(entry for entry in recent() if entry["sql"].startswith("INSERT"))
+        self.assertIn("Insert on blogs_category", insert["plan"])
+        self.assertNotIn("Execution Time", insert["plan"])
+        self.assertEqual(Category.objects.filter(name="Gardening").count(), 1)
+
+    def test_only_plain_reads_are_analyzed(self):
+        self.assertTrue(plain_read("SELECT id FROM blogs_blog"))
+        self.assertFalse(plain_read("SELECT id FROM blogs_blog FOR UPDATE"))
+        self.assertFalse(plain_read("SELECT 1 FROM t FOR NO KEY UPDATE SKIP LOCKED"))
+        self.assertFalse(plain_read("SELECT pg_notify('blog', '1')"))
+        self.assertFalse(plain_read("SELECT pg_advisory_xact_lock(1)"))
+        self.assertFalse(plain_read("UPDATE blogs_blog SET likes_count = 0"))
+
+    @override_settings(SLOW_QUERY_THRESHOLD_MS=None)
+    def test_disabled_log_records_nothing(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.user_token}")
+        self.client.get(reverse("category-list"))
+        self.assertEqual(recent(), [])
+
+    def test_log_file_is_readable_by_the_index_advisor(self):
+        handle, path = tempfile.mkstemp(suffix=".jsonl")
+        os.close(handle)
+        self.addCleanup(os.remove, path)
+        with self.settings(SLOW_QUERY_LOG_FILE=path):
+            self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.user_token}")
+            self.client.get(reverse("category-list"))
+        with open(path) as log_file:
+            entries = [json.loads(line) for line in log_file]
+        self.assertTrue(entries)
+        self.assertTrue(all("sql" in entry and "params" in entry for entry in entries))
+
+    def test_redact_keeps_numbers(self):
+        self.assertEqual(
+            redact([1, "secret", None, [2, "x"]]), [1, REDACTED, None, [2, REDACTED]]
+        )
+
+    def test_log_endpoint_is_staff_only(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.user_token}")
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.admin_token}")
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data)
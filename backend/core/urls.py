@@ -0,0 +1,8 @@
+from django.urls import path
+
+from .views import ConnectionPoolStatsView, SlowQueryLogView
+
+urlpatterns = [
+    path("slow-queries/", SlowQueryLogView.as_view(), name="slow-queries"),
+    path("db-pools/", ConnectionPoolStatsView.as_view(), name="db-pools"),
+]